@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Historical ticket analytics: resolution-time percentiles and daily backlog curves
+Run with: python analytics.py --data-dir helpdesk_data [--workers 8] [--json report.json]
+          python analytics.py --file history.jsonl
+"""
+
+import argparse
+import json
+import math
+import os
+from array import array
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+from itertools import islice, repeat
+from operator import attrgetter, floordiv, mul, sub
+
+from ticket import AGENTS, PRIORITY_LEVELS, Status
+
+DAY = 24 * 60 * 60
+PERCENTILES = (50, 90, 95, 99)
+RELATIVE_ACCURACY = 0.01  # sketch percentiles are within 1% of the exact value
+CHUNK_SIZE = 50_000
+
+
+# Mergeable quantile sketch: log-spaced buckets with a fixed relative error (as in DDSketch).
+# Two sketches merge by adding bucket counts, so the merged result does not depend on chunking.
+class QuantileSketch:
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.inverse_log_gamma = 1 / math.log(self.gamma)
+        self.buckets = Counter()  # i -> count of values in (gamma^(i-1), gamma^i]
+        self.zeros = 0  # values <= 0 (closed the moment they were opened)
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.add_many((value,))
+
+    def add_many(self, values):
+        self.add_indexed(values, self.bucket_indexes(values))
+
+    def bucket_indexes(self, values):
+        # Bucket of each value (None for values <= 0), computed by map() in C when all are positive
+        if values and min(values) > 0:
+            return list(map(math.ceil, map(mul, map(math.log, values), repeat(self.inverse_log_gamma))))
+        return [math.ceil(math.log(value) * self.inverse_log_gamma) if value > 0 else None
+                for value in values]
+
+    def add_indexed(self, values, indexes):
+        # Values with their precomputed bucket_indexes(), so grouped callers take each log once
+        if not values:
+            return
+        counts = Counter(indexes)
+        self.zeros += counts.pop(None, 0)
+        self.buckets.update(counts)
+        self.count += len(values)
+        self.min = min(self.min, min(values))
+        self.max = max(self.max, max(values))
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracies")
+        self.buckets.update(other.buckets)
+        self.zeros += other.zeros
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        # Nearest-rank quantile for q in [0, 1]; None when empty
+        if not self.count:
+            return None
+        rank = max(0, math.ceil(q * self.count) - 1)
+        seen = self.zeros
+        if rank < seen:
+            return max(self.min, 0.0)
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def __len__(self):
+        return self.count
+
+
+# Partial aggregates of one chunk of history; merge() combines chunks in any order
+class TicketAggregates:
+    def __init__(self):
+        self.tickets = 0
+        self.resolution = {"all": {"all": QuantileSketch()}, "agent": {}, "priority": {}}
+        self.created_per_day = Counter()  # UTC day number -> tickets created
+        self.closed_per_day = Counter()  # UTC day number -> tickets closed
+
+    def add_resolutions(self, dimension, key, seconds, indexes):
+        sketches = self.resolution[dimension]
+        if key not in sketches:
+            sketches[key] = QuantileSketch()
+        sketches[key].add_indexed(seconds, indexes)
+
+    def merge(self, other):
+        self.tickets += other.tickets
+        self.created_per_day.update(other.created_per_day)
+        self.closed_per_day.update(other.closed_per_day)
+        for dimension, sketches in other.resolution.items():
+            mine = self.resolution[dimension]
+            for key, sketch in sketches.items():
+                if key in mine:
+                    mine[key].merge(sketch)
+                else:
+                    mine[key] = sketch
+        return self
+
+    def report(self):
+        return {
+            "tickets": self.tickets,
+            "resolution": {dimension: {key: _percentiles(sketch.quantile, len(sketch))
+                                       for key, sketch in sorted(sketches.items(), key=_key_order)
+                                       if len(sketch)}
+                           for dimension, sketches in self.resolution.items()},
+            "backlog": backlog_curve(self.created_per_day, self.closed_per_day),
+        }
+
+
+def _key_order(item):
+    # Priorities from low to critical, agents by name
+    key = item[0]
+    return PRIORITY_LEVELS.index(key) if key in PRIORITY_LEVELS else len(PRIORITY_LEVELS), key
+
+
+def _percentiles(quantile, count):
+    return {"count": count, **{f"p{p}": quantile(p / 100) for p in PERCENTILES}}
+
+
+def backlog_curve(created_per_day, closed_per_day):
+    # One row per UTC day from the first ticket to the last event: [date, created, closed, open at end]
+    days = set(created_per_day) | set(closed_per_day)
+    if not days:
+        return []
+    curve = []
+    backlog = 0
+    for day in range(min(days), max(days) + 1):
+        created, closed = created_per_day.get(day, 0), closed_per_day.get(day, 0)
+        backlog += created - closed
+        date = datetime.fromtimestamp(day * DAY, timezone.utc).date().isoformat()
+        curve.append([date, created, closed, backlog])
+    return curve
+
+
+def chunk_columns(tickets, chunk_size=CHUNK_SIZE):
+    # Tickets as compact column chunks, cheap to pickle to a worker process. This is the only
+    # serial step, so the columns are pulled out with attrgetter maps rather than a Python loop.
+    tickets = iter(tickets)
+    while True:
+        batch = list(islice(tickets, chunk_size))
+        if not batch:
+            return
+        yield (array("d", map(attrgetter("created_ts"), batch)),
+               array("d", map(attrgetter("updated_ts"), batch)),
+               bytes(map(attrgetter("status_code"), batch)),
+               bytes(map(attrgetter("priority_code"), batch)),
+               array("I", map(attrgetter("agent_id"), batch)),
+               list(AGENTS.names))
+
+
+def aggregate_chunk(chunk):
+    # Runs in a worker: agent names travel with the chunk, since the worker's AGENTS table is its own
+    created, updated, status, priority, agent, agent_names = chunk
+    aggregates = TicketAggregates()
+    aggregates.tickets = len(created)
+    aggregates.created_per_day.update(map(int, map(floordiv, created, repeat(DAY))))
+    closed = [i for i, code in enumerate(status) if code == Status.CLOSED]
+    # A closed ticket was last touched when it was closed, so updated_at is its close time
+    closed_at = [updated[i] for i in closed]
+    aggregates.closed_per_day.update(map(int, map(floordiv, closed_at, repeat(DAY))))
+    seconds = list(map(sub, closed_at, (created[i] for i in closed)))
+    indexes = aggregates.resolution["all"]["all"].bucket_indexes(seconds)
+    for dimension, codes, names in (("priority", priority, PRIORITY_LEVELS), ("agent", agent, agent_names)):
+        groups = {}
+        for i, value, index in zip(closed, seconds, indexes):
+            code = codes[i]
+            if code in groups:
+                group = groups[code]
+            else:
+                group = groups[code] = ([], [])
+            group[0].append(value)
+            group[1].append(index)
+        for code, (values, group_indexes) in groups.items():
+            aggregates.add_resolutions(dimension, names[code], values, group_indexes)
+    # Every closed ticket has exactly one priority, so the overall sketch is their merge
+    for sketch in aggregates.resolution["priority"].values():
+        aggregates.resolution["all"]["all"].merge(sketch)
+    return aggregates
+
+
+def analyze(tickets, workers=None, chunk_size=CHUNK_SIZE):
+    # Chunks are aggregated in a process pool (inline when workers == 1) and merged as they finish;
+    # at most two chunks per worker are in flight, so the history is never copied whole
+    workers = workers or os.cpu_count() or 1
+    total = TicketAggregates()
+    chunks = chunk_columns(tickets, chunk_size)
+    if workers == 1:
+        for chunk in chunks:
+            total.merge(aggregate_chunk(chunk))
+        return total.report()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in chunks:
+            pending.add(executor.submit(aggregate_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    total.merge(future.result())
+        for future in pending:
+            total.merge(future.result())
+    return total.report()
+
+
+def reference_report(tickets):
+    # Single-process exact version of analyze(): sorts every resolution time
+    tickets = list(tickets)
+    samples = {"all": {"all": []}, "agent": {}, "priority": {}}
+    created_per_day, closed_per_day = Counter(), Counter()
+    for ticket in tickets:
+        created_per_day[int(ticket.created_ts // DAY)] += 1
+        if ticket.status != "closed":
+            continue
+        closed_per_day[int(ticket.updated_ts // DAY)] += 1
+        seconds = ticket.updated_ts - ticket.created_ts
+        samples["all"]["all"].append(seconds)
+        samples["agent"].setdefault(ticket.assigned_agent, []).append(seconds)
+        samples["priority"].setdefault(ticket.priority, []).append(seconds)
+
+    def exact(values):
+        values = sorted(values)
+        return lambda q: values[max(0, math.ceil(q * len(values)) - 1)]
+
+    return {
+        "tickets": len(tickets),
+        "resolution": {dimension: {key: _percentiles(exact(values), len(values))
+                                   for key, values in sorted(groups.items(), key=_key_order) if values}
+                       for dimension, groups in samples.items()},
+        "backlog": backlog_curve(created_per_day, closed_per_day),
+    }
+
+
+def live_history(helpdesk):
+    # History without the tickets whose create was undone: they stay "open" there forever,
+    # but are no longer in the store (ids are never reused)
+    return (ticket for ticket in helpdesk.history if ticket.ticket_id in helpdesk.tickets)
+
+
+def print_report(report):
+    print(f" Analytics over {report['tickets']:,} tickets")
+    for dimension, groups in report["resolution"].items():
+        print(f"\n Resolution time by {dimension} (hours)")
+        for key, stats in groups.items():
+            row = "  ".join(f"{name} {stats[name] / 3600:8.2f}" for name in stats if name != "count")
+            print(f"   {key:<14} n={stats['count']:>9,}  {row}")
+    backlog = report["backlog"]
+    if backlog:
+        print(f"\n Daily backlog: {backlog[0][0]} to {backlog[-1][0]}, "
+              f"peak {max(row[3] for row in backlog):,} open, now {backlog[-1][3]:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolution-time percentiles and daily backlog curves")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--data-dir", help="directory of the persisted help desk")
+    source.add_argument("--file", help="a .csv or .jsonl export (see bulk.py)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--json", help="also write the full report, including the backlog curve, here")
+    args = parser.parse_args()
+
+    if args.file:
+        from bulk import parse_tickets, read_records
+        tickets = parse_tickets(read_records(args.file))
+    else:
+        from persistence import Persistence
+        persistence = Persistence(args.data_dir)
+        tickets = live_history(persistence.load())
+        persistence.close()
+    report = analyze(tickets, args.workers, args.chunk_size)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
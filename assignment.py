@@ -0,0 +1,123 @@
+import heapq
+from itertools import count
+
+ANY_SKILL = None  # heap key that holds every agent
+
+
+# An agent the engine can hand tickets to
+class Agent:
+    __slots__ = ("name", "skills", "capacity", "load", "entries")
+
+    def __init__(self, name, skills=(), capacity=None):
+        self.name = name
+        self.skills = frozenset(skills)
+        self.capacity = capacity  # most open tickets at once; None for no limit
+        self.load = 0  # open tickets currently assigned
+        self.entries = []  # this agent's live heap entries, one per skill heap
+
+    def is_full(self):
+        return self.capacity is not None and self.load >= self.capacity
+
+    def __repr__(self):
+        return f"Agent({self.name}, load={self.load}, capacity={self.capacity})"
+
+
+# Workload-aware assignment: per-skill min-heaps of agents keyed by open load
+class AssignmentEngine:
+    def __init__(self, store=None):
+        self.store = store
+        self.agents = {}  # name -> Agent
+        self.heaps = {ANY_SKILL: []}  # skill -> heap of [load, seq, agent]
+        self.stale = 0  # invalidated entries still sitting in the heaps
+        self.order = count()
+        if store is not None:
+            store.subscribe(self.on_store_event)
+
+    def add_agent(self, name, skills=(), capacity=None):
+        if not name:
+            raise ValueError("Agent name cannot be empty.")
+        if name in self.agents:
+            raise ValueError(f"Agent {name} is already registered")
+        if capacity is not None and capacity < 1:
+            raise ValueError(f"Capacity must be at least 1, got {capacity}")
+        agent = Agent(name, skills, capacity)
+        if self.store is not None:
+            agent.load = sum(1 for ticket in self.store.by_agent(name) if ticket.status == "open")
+        self.agents[name] = agent
+        for skill in agent.skills:
+            self.heaps.setdefault(skill, [])
+        self._push(agent)
+        return agent
+
+    def remove_agent(self, name):
+        agent = self.agents.pop(name, None)
+        if agent is not None:
+            self._invalidate(agent)
+        return agent
+
+    def pick(self, skill=ANY_SKILL):
+        # Least-loaded agent with the skill and room to spare, or None; O(log agents)
+        heap = self.heaps.get(skill)
+        if not heap:
+            return None
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+            self.stale -= 1
+        return heap[0][2].name if heap else None
+
+    def loads(self):
+        return {name: agent.load for name, agent in self.agents.items()}
+
+    def on_store_event(self, event, ticket, old_value):
+        # Loads follow the store: assignments, reassignments, closes, reopens and removals
+        if event == "create":
+            if ticket.status == "open":
+                self._adjust(ticket.assigned_agent, 1)
+        elif event == "remove":
+            if ticket.status == "open":
+                self._adjust(ticket.assigned_agent, -1)
+        elif event == "assign":
+            if ticket.status == "open":
+                self._adjust(old_value, -1)
+                self._adjust(ticket.assigned_agent, 1)
+        elif event == "status":
+            if ticket.status == "closed" and old_value == "open":
+                self._adjust(ticket.assigned_agent, -1)
+            elif ticket.status == "open" and old_value == "closed":
+                self._adjust(ticket.assigned_agent, 1)
+
+    def _adjust(self, name, delta):
+        agent = self.agents.get(name)
+        if agent is None:
+            return
+        agent.load += delta
+        self._invalidate(agent)
+        self._push(agent)
+
+    def _push(self, agent):
+        # Full agents stay out of the heaps until a close brings them back under capacity
+        if agent.is_full():
+            return
+        seq = next(self.order)
+        for skill in (ANY_SKILL, *agent.skills):
+            entry = [agent.load, seq, agent]
+            agent.entries.append(entry)
+            heapq.heappush(self.heaps[skill], entry)
+
+    def _invalidate(self, agent):
+        for entry in agent.entries:
+            entry[2] = None
+        self.stale += len(agent.entries)
+        agent.entries = []
+        if self.stale > 64 and self.stale > 2 * len(self.agents) * len(self.heaps):
+            self._compact()
+
+    def _compact(self):
+        # Drop invalidated entries so the heaps stay proportional to the number of agents
+        for skill, heap in self.heaps.items():
+            self.heaps[skill] = [entry for entry in heap if entry[2] is not None]
+            heapq.heapify(self.heaps[skill])
+        self.stale = 0
+
+    def __len__(self):
+        return len(self.agents)
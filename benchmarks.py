@@ -0,0 +1,710 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Help Desk Ticket System data structures
+Run with: python benchmarks.py [name ...]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from ticket import Ticket
+from data_structures import LinkedList, Queue, PriorityQueue, TimerWheel
+from store import TicketStore
+from persistence import WriteAheadLog
+from columnar import ColumnarTicketTable, np
+from dispatcher import Dispatcher, WorkerPool
+from assignment import AssignmentEngine
+from search import SearchIndex
+from duplicates import DuplicateDetector
+from dashboard import generate_dashboard
+from metrics import METRICS
+from analytics import analyze, reference_report
+from sharding import ShardedHelpDesk
+from bulk import import_tickets, export_tickets, parse_tickets, read_records, write_records, ImportReport
+
+
+def bench_queue(sizes=(250_000, 500_000, 1_000_000)):
+    """Queue: n enqueues followed by n dequeues should scale linearly"""
+    print(" Queue enqueue/dequeue")
+    print("=" * 50)
+
+    previous = None
+    for n in sizes:
+        tickets = [Ticket(i, "Bench") for i in range(n)]
+        queue = Queue()
+
+        start = time.perf_counter()
+        for ticket in tickets:
+            queue.enqueue(ticket)
+        while not queue.is_empty():
+            queue.dequeue()
+        elapsed = time.perf_counter() - start
+
+        per_op = elapsed / (2 * n) * 1e9
+        growth = f"  x{elapsed / previous:.2f} time" if previous else ""
+        print(f"   n={n:>9,}: {elapsed:.3f}s ({per_op:.0f} ns/op){growth}")
+        previous = elapsed
+
+    print("   Linear scaling: doubling n should roughly double the time")
+    print()
+
+
+def bench_store(sizes=(10, 10_000, 500_000), lookups=100_000):
+    """TicketStore: close/assign cost should not depend on store size"""
+    print(" TicketStore lookup + update")
+    print("=" * 50)
+
+    for n in sizes:
+        store = TicketStore(Ticket(i, "Bench") for i in range(n))
+
+        start = time.perf_counter()
+        for i in range(lookups):
+            ticket = store.get(i % n)
+            ticket.assign_agent("Agent")
+            ticket.update_status("closed")
+            ticket.update_status("open")
+        elapsed = time.perf_counter() - start
+
+        print(f"   store={n:>9,}: {elapsed / lookups * 1e9:.0f} ns per get+assign+close+reopen")
+    print()
+
+
+def bench_wal(batch_sizes=(1, 8, 64, 512), records=20_000):
+    """Write-ahead log: append throughput for different fsync batch sizes"""
+    print(" Write-ahead log group commit")
+    print("=" * 50)
+
+    record = Ticket(1, "Bench", "Write-ahead log benchmark").to_record()
+    for batch in batch_sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            wal = WriteAheadLog(os.path.join(directory, "wal.jsonl"), sync_every=batch)
+            count = records if batch > 1 else records // 10
+            start = time.perf_counter()
+            for lsn in range(count):
+                wal.append({"lsn": lsn, "op": "create", "ticket": record})
+            wal.close()
+            elapsed = time.perf_counter() - start
+        print(f"   fsync every {batch:>4} records: {count / elapsed:>10,.0f} records/s")
+    print()
+
+
+# The original dict-based Ticket, kept for memory comparisons
+class LegacyTicket:
+    def __init__(self, ticket_id, title, description="", priority="normal", parent=None, assigned_agent="Unassigned"):
+        self.ticket_id = ticket_id
+        self.title = title
+        self.description = description
+        self.priority = priority
+        self.status = "open"
+        self.parent = parent
+        self.assigned_agent = assigned_agent
+        self.created_at = datetime.now()
+        self.updated_at = datetime.now()
+
+
+def bench_ticket_memory(n=100_000):
+    """Ticket: tracemalloc bytes per ticket, dict-based vs slotted"""
+    print(" Ticket memory footprint")
+    print("=" * 50)
+
+    for label, cls in (("dict + datetime (before)", LegacyTicket), ("slots + codes (after)", Ticket)):
+        # 50 agent names, each built at runtime per ticket (a new str object), as user input would be
+        tracemalloc.start()
+        tickets = [cls(i, "Bench", "", "high", None, f"Agent {i % 50}") for i in range(n)]
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"   {label:<26}: {current / n:>6.0f} bytes/ticket")
+        del tickets
+    print()
+
+
+def list_of_lists_dashboard(tickets):
+    # The original generate_dashboard counting path, without printing
+    data = [[t.status, t.priority, t.assigned_agent] for t in tickets]
+    open_count = sum(1 for row in data if row[0] == "open")
+    closed_count = sum(1 for row in data if row[0] == "closed")
+    high_priority = sum(1 for row in data if row[1] == "high")
+    normal_priority = sum(1 for row in data if row[1] == "normal")
+    agent_stats = {}
+    for row in data:
+        stats = agent_stats.setdefault(row[2], {"open": 0, "closed": 0})
+        stats["open" if row[0] == "open" else "closed"] += 1
+    recent = sorted(tickets, key=lambda x: x.updated_at, reverse=True)[:5]
+    return open_count, closed_count, high_priority, normal_priority, agent_stats, recent
+
+
+def bench_columnar(object_sizes=(100_000, 1_000_000), column_sizes=(1_000_000, 10_000_000)):
+    """Dashboard statistics: list-of-lists over Tickets vs NumPy columns"""
+    print(" Dashboard statistics: list-of-lists vs columnar")
+    print("=" * 50)
+    if np is None:
+        print("   NumPy not installed, skipping")
+        print()
+        return
+
+    for n in object_sizes:
+        tickets = [Ticket(i, "Bench", "", "high" if i % 3 else "normal") for i in range(n)]
+        start = time.perf_counter()
+        list_of_lists_dashboard(tickets)
+        print(f"   list-of-lists  n={n:>10,}: {(time.perf_counter() - start) * 1000:>9.1f} ms")
+        del tickets
+
+    rng = np.random.default_rng(0)
+    for n in column_sizes:
+        table = ColumnarTicketTable(capacity=n)
+        now = time.time()
+        table.load_columns(
+            status=rng.integers(0, 2, n, dtype=np.int8),
+            priority=rng.integers(0, 4, n, dtype=np.int8),
+            agent=rng.integers(0, 1, n, dtype=np.int32),
+            created=np.full(n, now),
+            updated=now + rng.random(n),
+        )
+        start = time.perf_counter()
+        table.snapshot()
+        print(f"   columnar       n={n:>10,}: {(time.perf_counter() - start) * 1000:>9.1f} ms")
+        del table
+    print()
+
+
+def bench_dispatcher(tickets=50_000, worker_counts=(1, 2, 4, 8, 16)):
+    """Dispatcher: claim/complete throughput as the worker pool grows"""
+    print(" Dispatcher claim/complete throughput")
+    print("=" * 50)
+
+    levels = ["low", "normal", "high", "critical"]
+    for workers in worker_counts:
+        dispatcher = Dispatcher()
+        for i in range(tickets):
+            dispatcher.submit(Ticket(i, "Bench", "", levels[i % 4]))
+        pool = WorkerPool(dispatcher, lambda ticket: None, workers=workers)
+
+        start = time.perf_counter()
+        pool.start()
+        dispatcher.close()
+        pool.join()
+        elapsed = time.perf_counter() - start
+        print(f"   workers={workers:>3}: {pool.completed / elapsed:>10,.0f} tickets/s")
+
+    print("   Claims are serialised by one lock; extra workers only help when handlers do real work")
+    print()
+
+
+def bench_assignment(agent_counts=(10, 1_000, 100_000), tickets=100_000):
+    """AssignmentEngine: pick + assign + close cost should grow with log(agents)"""
+    print(" Auto-assignment: pick least-loaded agent, assign, close")
+    print("=" * 50)
+
+    for agents in agent_counts:
+        store = TicketStore(Ticket(i, "Bench") for i in range(tickets))
+        engine = AssignmentEngine(store)
+        for n in range(agents):
+            engine.add_agent(f"agent-{n}", skills=["network"] if n % 2 else ())
+
+        start = time.perf_counter()
+        for i, ticket in enumerate(store):
+            ticket.assign_agent(engine.pick("network" if i % 2 else None))
+            if i % 3 == 0:
+                ticket.update_status("closed")
+        elapsed = time.perf_counter() - start
+        print(f"   agents={agents:>7,}: {tickets / elapsed:>10,.0f} tickets/s"
+              f" ({elapsed / tickets * 1e6:.1f} us/ticket)")
+    print()
+
+
+def bench_search(sizes=(100_000, 1_000_000), vocabulary=20_000, queries=200):
+    """SearchIndex: indexing throughput and BM25 query latency"""
+    import random
+
+    print(" Full-text search: indexing and BM25 queries")
+    print("=" * 50)
+
+    rng = random.Random(0)
+    # Zipf-like word frequencies, like real ticket text
+    words = [f"w{n}" for n in range(vocabulary)]
+    weights = [1 / (rank + 1) for rank in range(vocabulary)]
+    for n in sizes:
+        texts = rng.choices(words, weights, k=n * 16)
+        tickets = [Ticket(i, " ".join(texts[i * 16:i * 16 + 4]), " ".join(texts[i * 16 + 4:i * 16 + 16]))
+                   for i in range(n)]
+        del texts
+        index = SearchIndex()
+        start = time.perf_counter()
+        for ticket in tickets:
+            index.add(ticket)
+        elapsed = time.perf_counter() - start
+        print(f"   n={n:>9,}: indexed {n / elapsed:>8,.0f} tickets/s")
+
+        for label, pool in (("rare terms", words[-5000:]), ("mid terms", words[500:2000]),
+                            ("prefix", [word + "*" for word in words[2000:4000]])):
+            timings = []
+            for _ in range(queries):
+                query = " ".join(rng.sample(pool, 2))
+                start = time.perf_counter()
+                index.search(query, status="open", limit=10)
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            print(f"      {label:<11} p50 {timings[len(timings) // 2] * 1000:7.2f} ms"
+                  f"   p99 {timings[int(len(timings) * 0.99)] * 1000:7.2f} ms")
+        del tickets, index
+    print("   Query cost grows with the postings of the terms matched; very common words cost the most")
+    print()
+
+
+def bench_duplicates(sizes=(1_000, 10_000, 100_000), checks=2_000):
+    """DuplicateDetector: per-ticket check cost should stay flat as open tickets grow"""
+    import random
+
+    print(" Duplicate detection (MinHash + LSH) per new ticket")
+    print("=" * 50)
+
+    rng = random.Random(0)
+    words = [f"word{n}" for n in range(5_000)]
+    for n in sizes:
+        store = TicketStore(Ticket(i, " ".join(rng.sample(words, 3)), " ".join(rng.sample(words, 8)))
+                            for i in range(n))
+        detector = DuplicateDetector(store)
+        probes = [(ticket.title, ticket.description) for ticket in rng.sample(list(store), min(checks, n))]
+
+        start = time.perf_counter()
+        found = sum(1 for title, description in probes if detector.find(title, description))
+        elapsed = time.perf_counter() - start
+        print(f"   open={n:>8,}: {elapsed / len(probes) * 1e6:>7.1f} us/check,"
+              f" {found}/{len(probes)} exact copies found")
+    print("   A linear scan would grow 10x per row; LSH only compares tickets sharing a bucket")
+    print()
+
+
+def bench_timer_wheel(sizes=(100_000, 1_000_000, 3_000_000), horizon=30 * 24 * 3600):
+    """TimerWheel: schedule/cancel cost per timer should not depend on how many are pending"""
+    import random
+
+    print(" SLA timer wheel: schedule, cancel and expire")
+    print("=" * 50)
+
+    rng = random.Random(0)
+    for n in sizes:
+        deadlines = [rng.uniform(0, horizon) for _ in range(n)]
+        wheel = TimerWheel(tick=1.0, start=0)
+
+        start = time.perf_counter()
+        timers = [wheel.schedule(when, None) for when in deadlines]
+        scheduled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for timer in timers[::2]:
+            timer.cancel()
+        cancelled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fired = 0
+        for hour in range(1, horizon // 3600 + 1):
+            fired += len(wheel.advance(hour * 3600))
+        expired = time.perf_counter() - start
+        print(f"   n={n:>9,}: schedule {scheduled / n * 1e9:>5.0f} ns, cancel {cancelled / (n // 2) * 1e9:>4.0f} ns,"
+              f" expire {expired / n * 1e9:>5.0f} ns per timer ({fired:,} fired)")
+        del timers, wheel
+    print("   Expiry includes walking every 1 s tick of the 30-day horizon, so it shrinks per timer as n grows")
+    print()
+
+
+def bench_bulk(stream_sizes=(1_000_000, 5_000_000), helpdesk_size=100_000):
+    """Bulk pipeline: streaming CSV -> validated Tickets -> JSON lines in flat memory"""
+    import resource
+    from helpdesk import HelpDesk
+
+    print(" Bulk import/export pipeline")
+    print("=" * 50)
+    levels = ["low", "normal", "high", "critical"]
+
+    def rows(n):
+        for i in range(1, n + 1):
+            yield {"ticket_id": i, "title": f"Imported ticket {i}", "description": "Bulk load",
+                   "priority": levels[i % 4], "status": "open", "parent": i - 1 if i % 10 == 0 else None,
+                   "assigned_agent": "Unassigned", "created_at": 1.7e9 + i, "updated_at": 1.7e9 + i}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for n in stream_sizes:
+            source = os.path.join(directory, f"tickets_{n}.csv")
+            target = os.path.join(directory, f"tickets_{n}.jsonl")
+            write_records(rows(n), source)
+            report = ImportReport()
+            start = time.perf_counter()
+            export_tickets(parse_tickets(read_records(source), report=report), target)
+            elapsed = time.perf_counter() - start
+            peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(f"   stream n={n:>9,}: {n / elapsed:>9,.0f} tickets/s, peak RSS {peak_mb:,.0f} MB")
+            os.remove(source)
+            os.remove(target)
+
+        source = os.path.join(directory, "helpdesk.csv")
+        write_records(rows(helpdesk_size), source)
+        report = import_tickets(HelpDesk(), source)
+        print(f"   into HelpDesk n={helpdesk_size:,}: {report.rate:,.0f} tickets/s"
+              " (store, indexes, search, duplicates, SLA timers, scheduler)")
+    print("   Peak RSS should stay flat between stream sizes: nothing is held per row")
+    print()
+
+
+def bench_metrics(queue_ops=500_000, creates=20_000):
+    """Instrumentation overhead: hot paths with metrics disabled vs enabled"""
+    from helpdesk import HelpDesk
+
+    print(" Metrics overhead")
+    print("=" * 50)
+    levels = ["low", "normal", "high", "critical"]
+    tickets = [Ticket(i, "Bench", priority=levels[i % 4]) for i in range(queue_ops)]
+    for enabled in (False, True):
+        METRICS.reset()
+        METRICS.enabled = enabled
+        queue = PriorityQueue()
+        start = time.perf_counter()
+        for ticket in tickets:
+            queue.enqueue(ticket)
+        while not queue.is_empty():
+            queue.dequeue()
+        queue_ns = (time.perf_counter() - start) / (2 * queue_ops) * 1e9
+
+        helpdesk = HelpDesk()
+        start = time.perf_counter()
+        for i in range(creates):
+            helpdesk.create_ticket(f"Printer {i} jammed", "Paper stuck in tray", levels[i % 4])
+        create_us = (time.perf_counter() - start) / creates * 1e6
+        label = "enabled " if enabled else "disabled"
+        print(f"   {label}: queue {queue_ns:,.0f} ns/op, create_ticket {create_us:,.1f} us")
+    METRICS.reset()
+    METRICS.enabled = False
+    print()
+
+
+def bench_analytics(n=1_000_000, worker_counts=(1, 2, 4, 8)):
+    """Analytics: chunked process-pool aggregation should scale with cores and match the reference"""
+    import random
+
+    print(" Parallel analytics (resolution percentiles, daily backlog)")
+    print("=" * 50)
+    rng = random.Random(1)
+    levels = ["low", "normal", "high", "critical"]
+    agents = [f"Agent {i}" for i in range(50)]
+    start = 1.6e9
+    tickets = []
+    for i in range(n):
+        ticket = Ticket(i + 1, "Bench", priority=levels[i % 4], assigned_agent=agents[i % 50])
+        ticket.created_ts = ticket.updated_ts = start + i * 60
+        if i % 10:
+            ticket.status = "closed"
+            ticket.updated_ts += rng.expovariate(1 / 36_000)
+        tickets.append(ticket)
+
+    began = time.perf_counter()
+    reference = reference_report(tickets)
+    print(f"   single-process reference (exact): {time.perf_counter() - began:.2f}s")
+    cores = os.cpu_count() or 1
+    baseline = None
+    for workers in worker_counts:
+        began = time.perf_counter()
+        report = analyze(tickets, workers)
+        elapsed = time.perf_counter() - began
+        baseline = baseline or elapsed
+        exact = report["backlog"] == reference["backlog"]
+        p99 = report["resolution"]["all"]["all"]["p99"] / reference["resolution"]["all"]["all"]["p99"] - 1
+        note = "" if workers <= cores else f" (only {cores} cores)"
+        print(f"   workers={workers}: {elapsed:.2f}s  x{baseline / elapsed:.2f} speedup{note}"
+              f"  backlog exact: {exact}  p99 error {p99:+.2%}")
+    print()
+
+
+def bench_sharding(tickets=20_000, shard_counts=(1, 2, 4)):
+    """Sharded store: routed operations per second, and how many tickets move when a shard is added"""
+    print(" Sharded store (consistent hashing over worker processes)")
+    print("=" * 50)
+    levels = ["low", "normal", "high", "critical"]
+    for shards in shard_counts:
+        with ShardedHelpDesk(shards) as desk:
+            start = time.perf_counter()
+            for i in range(tickets):
+                desk.create_ticket(f"Ticket {i}", "", levels[i % 4], parent=i if i % 10 == 0 and i else None)
+            create_rate = tickets / (time.perf_counter() - start)
+            start = time.perf_counter()
+            for ticket_id in range(1, tickets + 1, 10):
+                desk.get_ticket(ticket_id)
+            get_rate = (tickets // 10) / (time.perf_counter() - start)
+            start = time.perf_counter()
+            desk.snapshot()
+            dashboard_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            moved = desk.add_shard()
+            rebalance = time.perf_counter() - start
+            print(f"   shards={shards}: create {create_rate:,.0f}/s, get {get_rate:,.0f}/s,"
+                  f" dashboard {dashboard_ms:.1f} ms; +1 shard moved {moved / tickets:.0%}"
+                  f" (ideal {1 / (shards + 1):.0%}) in {rebalance:.2f}s")
+    print()
+
+
+def bench_cli(store_sizes=(0, 1_000, 10_000, 100_000), batch_ops=100_000):
+    """CLI: single-command time by store size (absolute and over a bare interpreter), batch throughput"""
+    from persistence import Persistence
+    print(" CLI startup and batch mode")
+    print("=" * 50)
+    cli = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+
+    def best_of(argv, runs=7, stdin=None):
+        best = None
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, *argv], input=stdin, capture_output=True, check=True)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    interpreter = best_of(["-c", "pass"])
+    print(f"   bare interpreter start: {interpreter * 1000:.1f} ms")
+    print(f"   --help (nothing loaded): {best_of([cli, '--help']) * 1000:.1f} ms")
+    levels = ["low", "normal", "high", "critical"]
+    for tickets in store_sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            persistence = Persistence(data_dir)
+            helpdesk = persistence.load()
+            helpdesk.import_batch([Ticket(i, f"Ticket {i}", "", levels[i % 4], i - 1 if i % 10 else None)
+                                   for i in range(1, tickets + 1)])
+            persistence.close(helpdesk)
+            for command in (["history", "--latest", "--limit", "5"], ["create", "Bench"], ["process-next"]):
+                elapsed = best_of([cli, "--data-dir", data_dir, *command], runs=7 if tickets <= 10_000 else 1)
+                print(f"   {tickets:>9,} tickets  {command[0]:<12} {elapsed * 1000:7.1f} ms"
+                      f" ({(elapsed - interpreter) * 1000:+.1f} over the interpreter)")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        lines = []
+        for i in range(batch_ops // 4):
+            ticket_id = i + 1
+            lines += [f"create 'Ticket {i}' --priority {levels[i % 4]}", f"assign {ticket_id} Alice",
+                      "process-next", f"close {ticket_id}"]
+        elapsed = best_of([cli, "--data-dir", data_dir, "batch"], runs=1, stdin="\n".join(lines).encode())
+        print(f"   batch of {len(lines):,} commands in one process: {elapsed:.2f}s"
+              f" ({len(lines) / elapsed:,.0f} commands/s, startup included)")
+    print()
+
+
+# Scaling harness: each case builds its input for n tickets and returns the timed operation
+# and how many operations it performs. Setup is excluded from both time and peak memory.
+SCALING_SIZES = (1_000, 100_000, 1_000_000)
+REGRESSION_TOLERANCE = 0.25  # flag a case more than 25% slower (or bigger) than the baseline
+_LEVELS = ("low", "normal", "high", "critical")
+
+
+def _linked_list_append(n):
+    tickets = [Ticket(i, "Bench") for i in range(n)]
+    history = LinkedList()
+
+    def run():
+        for ticket in tickets:
+            history.append(ticket)
+    return run, n
+
+
+def _linked_list_get(n):
+    history = LinkedList()
+    for i in range(n):
+        history.append(Ticket(i, "Bench"))
+
+    def run():
+        for i in range(n):
+            history.get_ticket_by_id(i)
+    return run, n
+
+
+def _queue(n):
+    tickets = [Ticket(i, "Bench") for i in range(n)]
+    queue = Queue()
+
+    def run():
+        for ticket in tickets:
+            queue.enqueue(ticket)
+        while not queue.is_empty():
+            queue.dequeue()
+    return run, 2 * n
+
+
+def _priority_queue(n):
+    tickets = [Ticket(i, "Bench", priority=_LEVELS[i % 4]) for i in range(n)]
+    queue = PriorityQueue()
+
+    def run():
+        for ticket in tickets:
+            queue.enqueue(ticket)
+        while not queue.is_empty():
+            queue.dequeue()
+    return run, 2 * n
+
+
+def _check_dependency(n):
+    # One chain n tickets deep with every ancestor closed, so the whole chain is walked
+    from main import check_dependency
+    store = TicketStore()
+    for i in range(1, n + 1):
+        ticket = Ticket(i, "Bench", parent=i - 1 if i > 1 else None)
+        if i < n:
+            ticket.update_status("closed")
+        store.add(ticket)
+    leaf = store.get(n)
+
+    def run():
+        assert check_dependency(leaf, store)
+    return run, n
+
+
+def _dashboard(n):
+    tickets = [Ticket(i, "Bench", priority=_LEVELS[i % 4]) for i in range(n)]
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_dashboard(tickets)
+    return run, n
+
+
+SCALING_CASES = {
+    "linked_list_append": _linked_list_append,
+    "linked_list_get": _linked_list_get,
+    "queue": _queue,
+    "priority_queue": _priority_queue,
+    "check_dependency": _check_dependency,
+    "dashboard": _dashboard,
+}
+
+
+def measure(case, n, repeats=None):
+    # Best time of a few runs (fewer for big n), then one traced run for peak memory.
+    # The collector is paused while timing, as timeit does, so setup garbage is not billed to the case.
+    repeats = repeats or max(1, min(5, 1_000_000 // n))
+    best = None
+    for _ in range(repeats):
+        run, operations = case(n)
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    run, operations = case(n)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        baseline_bytes = tracemalloc.get_traced_memory()[0]
+        run()
+        peak_bytes = tracemalloc.get_traced_memory()[1] - baseline_bytes
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "ns_per_op": best / operations * 1e9, "peak_bytes": peak_bytes}
+
+
+def run_scaling(sizes=SCALING_SIZES, cases=None):
+    # {"meta": ..., "results": {"case@n": {"seconds", "ns_per_op", "peak_bytes"}}}
+    results = {}
+    for name in cases or SCALING_CASES:
+        for n in sizes:
+            results[f"{name}@{n}"] = measure(SCALING_CASES[name], n)
+    return {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "date": datetime.now().isoformat(timespec="seconds")},
+        "results": results,
+    }
+
+
+def find_regressions(current, baseline, tolerance=REGRESSION_TOLERANCE):
+    # Cases slower per operation, or using more peak memory, than the baseline allows:
+    # [(key, metric, baseline value, current value)]. Cases missing from either side are skipped.
+    regressions = []
+    for key, result in current["results"].items():
+        previous = baseline["results"].get(key)
+        if previous is None:
+            continue
+        for metric in ("ns_per_op", "peak_bytes"):
+            # Small absolute slack so near-zero measurements do not flag on noise
+            slack = 50 if metric == "ns_per_op" else 64 * 1024
+            if result[metric] > previous[metric] * (1 + tolerance) + slack:
+                regressions.append((key, metric, previous[metric], result[metric]))
+    return regressions
+
+
+def bench_scaling(sizes=SCALING_SIZES, output=None, baseline=None, tolerance=REGRESSION_TOLERANCE):
+    """Scaling harness: time and peak memory per case and size, compared with a stored baseline"""
+    print(" Scaling harness")
+    print("=" * 50)
+    current = run_scaling(sizes)
+    for key, result in current["results"].items():
+        print(f"   {key:<28} {result['seconds']:>9.4f}s {result['ns_per_op']:>9,.0f} ns/op"
+              f" {result['peak_bytes'] / 2**20:>9,.1f} MB peak")
+    if output:
+        with open(output, "w") as results_file:
+            json.dump(current, results_file, indent=2)
+        print(f"   Results written to {output}")
+
+    regressions = []
+    if baseline and os.path.exists(baseline):
+        with open(baseline) as baseline_file:
+            regressions = find_regressions(current, json.load(baseline_file), tolerance)
+        for key, metric, before, after in regressions:
+            print(f"    REGRESSION {key} {metric}: {before:,.0f} -> {after:,.0f} ({after / before - 1:+.0%})")
+        if not regressions:
+            print(f"   No regressions against {baseline} (tolerance {tolerance:.0%})")
+    elif baseline:
+        with open(baseline, "w") as baseline_file:
+            json.dump(current, baseline_file, indent=2)
+        print(f"   No baseline yet; saved these results as {baseline}")
+    print()
+    return regressions
+
+
+BENCHMARKS = {
+    "queue": bench_queue,
+    "store": bench_store,
+    "wal": bench_wal,
+    "memory": bench_ticket_memory,
+    "columnar": bench_columnar,
+    "dispatcher": bench_dispatcher,
+    "assignment": bench_assignment,
+    "search": bench_search,
+    "duplicates": bench_duplicates,
+    "timers": bench_timer_wheel,
+    "bulk": bench_bulk,
+    "metrics": bench_metrics,
+    "analytics": bench_analytics,
+    "sharding": bench_sharding,
+    "cli": bench_cli,
+    "scaling": bench_scaling,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Help desk benchmarks")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SCALING_SIZES, help="scaling: ticket counts")
+    parser.add_argument("--json", help="scaling: write results to this file")
+    parser.add_argument("--baseline", help="scaling: compare with this results file (created if missing)")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args()
+
+    regressed = False
+    for name in args.names or list(BENCHMARKS):
+        if name not in BENCHMARKS:
+            print(f" Unknown benchmark '{name}'. Choose from: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        if name == "scaling":
+            regressed |= bool(bench_scaling(args.sizes, args.json, args.baseline, args.tolerance))
+        else:
+            BENCHMARKS[name]()
+    sys.exit(1 if regressed else 0)
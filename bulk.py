@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Streaming bulk import/export of tickets as CSV or JSON lines
+Run with: python bulk.py import tickets.csv --data-dir helpdesk_data
+          python bulk.py export history history.jsonl --data-dir helpdesk_data
+"""
+
+import argparse
+import csv
+import json
+import time
+from itertools import islice
+
+from ticket import Ticket
+
+EXPORT_FIELDS = ("ticket_id", "title", "description", "priority", "status", "parent",
+                 "assigned_agent", "created_at", "updated_at")
+BATCH_SIZE = 10_000
+MAX_REPORTED_ERRORS = 100
+
+
+# Counts and first few errors of an import
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []  # "row N: reason", capped at MAX_REPORTED_ERRORS
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    def reject(self, row, reason):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"row {row}: {reason}")
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self.started
+        return self
+
+    @property
+    def rate(self):
+        return self.imported / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return (f"{self.imported:,} imported, {self.rejected:,} rejected"
+                f" in {self.seconds:.2f}s ({self.rate:,.0f} tickets/s)")
+
+
+# Ticket ids seen so far in a stream, one bit each, so parent checks stay small for huge files.
+# Bits live in fixed-size pages created on first use, so memory follows the ids actually seen:
+# a dense range costs one bit per id, and a single huge id (e.g. epoch milliseconds) one page.
+class _IdBitmap:
+    PAGE_BITS = 16  # 65,536 ids (8 KB) per page
+
+    def __init__(self):
+        self.pages = {}  # ticket_id >> PAGE_BITS -> bytearray
+
+    def add(self, ticket_id):
+        page = self.pages.get(ticket_id >> self.PAGE_BITS)
+        if page is None:
+            page = self.pages[ticket_id >> self.PAGE_BITS] = bytearray(1 << (self.PAGE_BITS - 3))
+        offset = ticket_id & ((1 << self.PAGE_BITS) - 1)
+        page[offset >> 3] |= 1 << (offset & 7)
+
+    def __contains__(self, ticket_id):
+        page = self.pages.get(ticket_id >> self.PAGE_BITS)
+        if page is None:
+            return False
+        offset = ticket_id & ((1 << self.PAGE_BITS) - 1)
+        return bool(page[offset >> 3] >> (offset & 7) & 1)
+
+
+def read_records(path):
+    # One raw record at a time from a CSV (header row) or JSON-lines file; None for a malformed line
+    with open(path, newline="", encoding="utf-8") as dump:
+        if path.endswith(".csv"):
+            yield from csv.DictReader(dump)
+            return
+        for line in dump:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+def parse_tickets(records, known=(), report=None, next_id=1):
+    # Validated Tickets from raw records; bad rows are counted in `report` and skipped.
+    # Parents must be in `known` (e.g. a TicketStore) or earlier in the stream, so no cycles
+    # can be imported. Ids below `next_id` count as used; records without one get the next free id.
+    report = report or ImportReport()
+    seen = _IdBitmap()
+    highest = next_id - 1
+    for row, record in enumerate(records, 1):
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("malformed line")
+            ticket = _ticket(record, highest + 1)
+            if ticket.ticket_id < 1:
+                raise ValueError(f"invalid ticket id {ticket.ticket_id}")
+            if ticket.ticket_id < next_id or ticket.ticket_id in seen or ticket.ticket_id in known:
+                raise ValueError(f"ticket id {ticket.ticket_id} is already used")
+            if ticket.parent is not None and ticket.parent not in seen and ticket.parent not in known:
+                raise ValueError(f"parent {ticket.parent} does not exist")
+        except (ValueError, TypeError) as error:
+            report.reject(row, error)
+            continue
+        seen.add(ticket.ticket_id)
+        highest = max(highest, ticket.ticket_id)
+        report.imported += 1
+        yield ticket
+
+
+def _ticket(record, default_id):
+    # CSV gives strings for every column; empty cells mean "not given"
+    title = (record.get("title") or "").strip()
+    if not title:
+        raise ValueError("missing title")
+    fields = {key: value for key, value in record.items() if value not in (None, "")}
+    fields["ticket_id"] = int(fields.get("ticket_id", default_id))
+    fields["title"] = title
+    if "parent" in fields:
+        fields["parent"] = int(fields["parent"])
+    priority = fields.get("priority", "normal")
+    fields["priority"] = priority.strip().lower() if isinstance(priority, str) else priority
+    return Ticket.from_record(fields)
+
+
+def batched(iterable, size=BATCH_SIZE):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_tickets(helpdesk, path, batch_size=BATCH_SIZE):
+    # Stream a dump into a HelpDesk; open tickets are queued one batch at a time
+    report = ImportReport()
+    tickets = parse_tickets(read_records(path), helpdesk.tickets, report, helpdesk.ticket_counter)
+    for batch in batched(tickets, batch_size):
+        helpdesk.import_batch(batch)
+    if helpdesk.journal is not None:
+        # Imports are not logged ticket by ticket; one snapshot makes them durable
+        helpdesk.journal.snapshot(helpdesk)
+    return report.finish()
+
+
+def write_records(records, path):
+    # Streams records to CSV or JSON lines; returns how many were written
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as dump:
+        if path.endswith(".csv"):
+            writer = csv.DictWriter(dump, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+            for record in records:
+                writer.writerow(record)
+                written += 1
+        else:
+            for record in records:
+                dump.write(json.dumps(record, separators=(",", ":")) + "\n")
+                written += 1
+    return written
+
+
+def export_tickets(tickets, path):
+    return write_records((ticket.to_record() for ticket in tickets), path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk ticket import/export (CSV or JSON lines)")
+    parser.add_argument("--data-dir", required=True, help="directory of the persisted help desk")
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="stream tickets from a .csv or .jsonl file")
+    importer.add_argument("path")
+    importer.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    exporter = commands.add_parser("export", help="stream the history or the current queue to a file")
+    exporter.add_argument("source", choices=("history", "queue"))
+    exporter.add_argument("path")
+    args = parser.parse_args()
+
+    from persistence import Persistence
+    persistence = Persistence(args.data_dir)
+    helpdesk = persistence.load()
+    try:
+        if args.command == "import":
+            report = import_tickets(helpdesk, args.path, args.batch_size)
+            print(f" Import: {report}")
+            for error in report.errors:
+                print(f"   {error}")
+        else:
+            tickets = helpdesk.history if args.source == "history" else helpdesk.dispatcher.iter_tickets()
+            print(f" Exported {export_tickets(tickets, args.path):,} tickets to {args.path}")
+    finally:
+        persistence.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Scriptable help desk commands on the persisted help desk that main.py, service.py,
+bulk.py and analytics.py use (the same --data-dir: snapshot + write-ahead log)
+Run with: python cli.py create "Printer jammed" --priority high [--parent 3]
+          python cli.py close 3 | assign 3 Alice | process-next | dashboard | history --latest
+          python cli.py batch < commands.txt   (one command per line, same syntax)
+"""
+
+import argparse
+import sys
+import time
+
+DEFAULT_DATA_DIR = "helpdesk_data"
+# A single command snapshots after this many logged operations, so the next start never
+# replays a long log; batch runs keep the usual interval and snapshot once at the end
+COMMAND_SNAPSHOT_EVERY = 256
+PRIORITIES = ("low", "normal", "high", "critical")  # ticket.PRIORITY_LEVELS, without importing it
+
+
+# Commands run through HelpDesk on the shared snapshot + log, so they follow the same rules as
+# main.py (blocked and held tickets, leases, SLA aging) and every other front-end sees them.
+# Loading grows with the store; batch pays for it once for any number of commands.
+def cmd_create(helpdesk, args):
+    ticket = helpdesk.create_ticket(args.title, args.description, args.priority, args.parent, args.hold)
+    print(f"created {ticket.ticket_id}")
+
+
+def cmd_close(helpdesk, args):
+    unblocked = helpdesk.close_ticket(args.ticket_id)
+    print(f"closed {args.ticket_id}" + (f" unblocked {' '.join(str(t.ticket_id) for t in unblocked)}"
+                                        if unblocked else ""))
+
+
+def cmd_assign(helpdesk, args):
+    helpdesk.assign_agent(args.ticket_id, args.agent)
+    print(f"assigned {args.ticket_id} {args.agent}")
+
+
+def cmd_process_next(helpdesk, args):
+    ticket = helpdesk.process_next(args.worker)
+    print(ticket if ticket else "queue empty")
+
+
+def cmd_dashboard(helpdesk, args):
+    from dashboard import render_dashboard
+    render_dashboard(helpdesk.dashboard.snapshot())
+
+
+def cmd_history(helpdesk, args):
+    for ticket in helpdesk.history.slice(args.offset, args.limit, reverse=args.latest):
+        print(ticket)
+
+
+def build_parser(parser_class=argparse.ArgumentParser):
+    parser = parser_class(prog="cli.py", description="Help desk commands (scriptable)")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR,
+                        help=f"directory of the persisted help desk (default: {DEFAULT_DATA_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True, parser_class=parser_class)
+
+    create = commands.add_parser("create", help="create a ticket")
+    create.add_argument("title")
+    create.add_argument("--description", default="")
+    create.add_argument("--priority", default="normal", choices=PRIORITIES)
+    create.add_argument("--parent", type=int)
+    create.add_argument("--hold", action="store_true", help="keep it out of the queue until the parent closes")
+    create.set_defaults(handler=cmd_create)
+
+    close = commands.add_parser("close", help="close a ticket")
+    close.add_argument("ticket_id", type=int)
+    close.set_defaults(handler=cmd_close)
+
+    assign = commands.add_parser("assign", help="assign a ticket to an agent")
+    assign.add_argument("ticket_id", type=int)
+    assign.add_argument("agent")
+    assign.set_defaults(handler=cmd_assign)
+
+    process_next = commands.add_parser("process-next", help="take the most urgent queued ticket")
+    process_next.add_argument("--worker", default="operator")
+    process_next.set_defaults(handler=cmd_process_next)
+
+    dashboard = commands.add_parser("dashboard", help="print the dashboard")
+    dashboard.set_defaults(handler=cmd_dashboard)
+
+    history = commands.add_parser("history", help="print a page of the ticket history")
+    history.add_argument("--offset", type=int, default=0)
+    history.add_argument("--limit", type=int, default=20)
+    history.add_argument("--latest", action="store_true", help="newest first")
+    history.set_defaults(handler=cmd_history)
+
+    commands.add_parser("batch", help="run one command per line from stdin in this process")
+    return parser
+
+
+class _ScriptError(Exception):
+    pass
+
+
+class _ScriptParser(argparse.ArgumentParser):
+    # A bad script line (or --help in one) is reported and skipped instead of ending the batch
+    def error(self, message):
+        raise _ScriptError(message)
+
+    def exit(self, status=0, message=None):
+        raise _ScriptError(message or "exited")
+
+
+def run_batch(helpdesk, lines, parser=None):
+    # Returns (commands run, commands failed); errors are reported with their line number
+    import shlex
+    parser = parser or build_parser(_ScriptParser)
+    run = failed = 0
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            args = parser.parse_args(shlex.split(line))
+            if args.command == "batch":
+                raise _ScriptError("batch cannot be nested")
+            args.handler(helpdesk, args)
+            run += 1
+        except (_ScriptError, ValueError) as error:
+            failed += 1
+            print(f"line {number}: {error}", file=sys.stderr)
+    return run, failed
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    # Imported only now, so --help and argument errors return without loading anything
+    from persistence import Persistence
+    batch = args.command == "batch"
+    if batch:
+        persistence = Persistence(args.data_dir)
+    else:
+        persistence = Persistence(args.data_dir, snapshot_every=COMMAND_SNAPSHOT_EVERY)
+    helpdesk = persistence.load()
+    failed = 0
+    try:
+        if batch:
+            start = time.perf_counter()
+            run, failed = run_batch(helpdesk, sys.stdin)
+            elapsed = time.perf_counter() - start
+            print(f"batch: {run:,} commands, {failed:,} failed in {elapsed:.2f}s"
+                  f" ({run / elapsed if elapsed else 0:,.0f}/s)", file=sys.stderr)
+        else:
+            try:
+                args.handler(helpdesk, args)
+            except ValueError as error:
+                print(f"error: {error}", file=sys.stderr)
+                failed = 1
+    finally:
+        # A batch ends with one snapshot; a single command only flushes its log record
+        persistence.close(helpdesk if batch else None)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
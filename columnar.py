@@ -0,0 +1,144 @@
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+from ticket import AGENTS, PRIORITY_LEVELS, STATUS_NAMES
+from store import TicketStore
+
+INITIAL_CAPACITY = 1024
+
+
+# Columnar ticket table: one NumPy array per field, one row per ticket
+class ColumnarTicketTable:
+    def __init__(self, tickets=(), capacity=INITIAL_CAPACITY):
+        if np is None:
+            raise ImportError("ColumnarTicketTable requires NumPy (pip install numpy)")
+        self.size = 0
+        self.rows = {}  # ticket_id -> row
+        self.ticket_ids = np.zeros(capacity, dtype=np.int64)
+        self.status = np.zeros(capacity, dtype=np.int8)
+        self.priority = np.zeros(capacity, dtype=np.int8)
+        self.agent = np.zeros(capacity, dtype=np.int32)
+        self.created = np.zeros(capacity, dtype=np.float64)
+        self.updated = np.zeros(capacity, dtype=np.float64)
+        self.live = np.zeros(capacity, dtype=bool)  # False once a ticket is removed
+        self.removed = 0
+        self.tickets = []  # row -> Ticket, for titles in recent activity
+        for ticket in tickets:
+            self.add(ticket)
+        if isinstance(tickets, TicketStore):
+            tickets.subscribe(self.on_store_event)
+
+    def on_store_event(self, event, ticket, old_value):
+        if event == "create":
+            self.add(ticket)
+        elif event == "remove":
+            self.live[self.rows.pop(ticket.ticket_id)] = False
+            self.removed += 1
+        else:
+            self.update(ticket)
+
+    def add(self, ticket):
+        if self.size == len(self.ticket_ids):
+            self._grow()
+        row = self.size
+        self.size += 1
+        self.rows[ticket.ticket_id] = row
+        self.tickets.append(ticket)
+        self.ticket_ids[row] = ticket.ticket_id
+        self.created[row] = ticket.created_ts
+        self.live[row] = True
+        self._write(row, ticket)
+
+    def update(self, ticket):
+        self._write(self.rows[ticket.ticket_id], ticket)
+
+    def load_columns(self, status, priority, agent, created, updated, ticket_ids=None):
+        # Bulk load already-coded columns (e.g. from an export) without Ticket objects
+        count = len(status)
+        if ticket_ids is None:
+            ticket_ids = np.arange(self.size + 1, self.size + count + 1)
+        while len(self.ticket_ids) < self.size + count:
+            self._grow()
+        rows = slice(self.size, self.size + count)
+        self.ticket_ids[rows] = ticket_ids
+        self.status[rows] = status
+        self.priority[rows] = priority
+        self.agent[rows] = agent
+        self.created[rows] = created
+        self.updated[rows] = updated
+        self.live[rows] = True
+        self.tickets.extend([None] * count)
+        self.size += count
+
+    def snapshot(self, recent_limit=5):
+        # Same shape as DashboardAggregator.snapshot(), from vectorised reductions
+        if self.removed:
+            rows = np.flatnonzero(self.live[:self.size])
+        else:
+            rows = slice(0, self.size)  # no removals: plain views, no copies
+        status = self.status[rows]
+        priority = self.priority[rows]
+        agent = self.agent[rows]
+
+        # A single bincount over (agent, priority, closed) keys; every count is a sum over it
+        levels = len(PRIORITY_LEVELS)
+        keys = agent * (levels * 2)
+        keys += priority * 2
+        keys += status != STATUS_NAMES.index("open")
+        counts = np.bincount(keys, minlength=len(AGENTS) * levels * 2).reshape(-1, levels, 2)
+        open_closed = counts.sum(axis=0).sum(axis=0)
+        priority_counts = counts.sum(axis=0).sum(axis=1)
+        by_agent = counts.sum(axis=1)
+
+        return {
+            "total": int(open_closed.sum()),
+            "status": {name: int(n) for name, n in zip(STATUS_NAMES, open_closed) if n},
+            "priority": {level: int(priority_counts[code]) for code, level in enumerate(PRIORITY_LEVELS)},
+            "agents": {
+                AGENTS.name(agent_id): {"open": int(by_agent[agent_id, 0]), "closed": int(by_agent[agent_id, 1])}
+                for agent_id in np.flatnonzero(by_agent.sum(axis=1))
+            },
+            "recent": self._recent(rows, recent_limit),
+        }
+
+    def _recent(self, rows, limit):
+        # argpartition finds the newest `limit` rows in O(n), then only those are sorted
+        updated = self.updated[rows]
+        if len(updated) > limit:
+            newest = np.argpartition(updated, len(updated) - limit)[-limit:]
+        else:
+            newest = np.arange(len(updated))
+        newest = newest[np.argsort(updated[newest])[::-1]]
+        if isinstance(rows, slice):
+            newest = newest + rows.start
+        else:
+            newest = rows[newest]
+        return [self.tickets[row] or _RowView(self, row) for row in newest]
+
+    def _write(self, row, ticket):
+        self.status[row] = ticket.status_code
+        self.priority[row] = ticket.priority_code
+        self.agent[row] = ticket.agent_id
+        self.updated[row] = ticket.updated_ts
+
+    def _grow(self):
+        capacity = max(INITIAL_CAPACITY, len(self.ticket_ids) * 2)
+        for name in ("ticket_ids", "status", "priority", "agent", "created", "updated", "live"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def __len__(self):
+        return self.size - self.removed
+
+
+# Read-only stand-in for rows bulk loaded without a Ticket object
+class _RowView:
+    def __init__(self, table, row):
+        self.ticket_id = int(table.ticket_ids[row])
+        self.title = f"Ticket {self.ticket_id}"
+        self.status = STATUS_NAMES[table.status[row]]
+        self.priority = PRIORITY_LEVELS[table.priority[row]]
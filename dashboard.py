@@ -1,57 +1,159 @@
+import heapq
+from collections import OrderedDict
+
+from ticket import PRIORITY_LEVELS
+from store import TicketStore
+from metrics import METRICS, OPERATION_SECONDS
+
+RECENT_ACTIVITY_LIMIT = 5
+
+
+# Running dashboard counters, updated from TicketStore events
+class DashboardAggregator:
+    def __init__(self, tickets=(), recent_limit=RECENT_ACTIVITY_LIMIT):
+        self.recent_limit = recent_limit
+        self.total = 0
+        self.status_counts = {}
+        self.priority_counts = {level: 0 for level in PRIORITY_LEVELS}
+        self.agent_stats = {}  # agent -> {"open": n, "closed": n}
+        # Most recently touched tickets, oldest first; a few spares cover undone creates
+        self.recent = OrderedDict()
+        self.recent_capacity = recent_limit * 4
+        self.sla = None  # SLAMonitor whose breach counts are shown, if attached
+
+        if not isinstance(tickets, TicketStore):
+            tickets = list(tickets)
+        for ticket in tickets:
+            self._count(ticket, 1)
+        newest = heapq.nlargest(self.recent_capacity, tickets, key=lambda t: t.updated_ts)
+        for ticket in reversed(newest):
+            self.recent[ticket.ticket_id] = ticket
+        if isinstance(tickets, TicketStore):
+            tickets.subscribe(self.on_store_event)
+
+    def on_store_event(self, event, ticket, old_value):
+        if event == "create":
+            self._count(ticket, 1)
+            self._touch(ticket)
+        elif event == "remove":
+            self._count(ticket, -1)
+            self.recent.pop(ticket.ticket_id, None)
+        elif event == "status":
+            self._bump(self.status_counts, old_value, -1)
+            self._bump(self.status_counts, ticket.status, 1)
+            self._bump_agent(ticket.assigned_agent, _bucket(old_value), -1)
+            self._bump_agent(ticket.assigned_agent, _bucket(ticket.status), 1)
+            self._touch(ticket)
+        elif event == "assign":
+            self._bump_agent(old_value, _bucket(ticket.status), -1)
+            self._bump_agent(ticket.assigned_agent, _bucket(ticket.status), 1)
+            self._touch(ticket)
+        elif event == "priority":
+            self.priority_counts[old_value] -= 1
+            self.priority_counts[ticket.priority] = self.priority_counts.get(ticket.priority, 0) + 1
+            self._touch(ticket)
+
+    def snapshot(self):
+        with METRICS.timer(OPERATION_SECONDS, "dashboard"):
+            return self._snapshot()
+
+    def _snapshot(self):
+        snapshot = {
+            "total": self.total,
+            "status": dict(self.status_counts),
+            "priority": dict(self.priority_counts),
+            "agents": {agent: dict(stats) for agent, stats in self.agent_stats.items()},
+            "recent": list(reversed(self.recent.values()))[:self.recent_limit],
+        }
+        if self.sla is not None:
+            snapshot["sla"] = self.sla.summary()
+        return snapshot
+
+    def _count(self, ticket, delta):
+        self.total += delta
+        self._bump(self.status_counts, ticket.status, delta)
+        self.priority_counts[ticket.priority] = self.priority_counts.get(ticket.priority, 0) + delta
+        self._bump_agent(ticket.assigned_agent, _bucket(ticket.status), delta)
+
+    def _touch(self, ticket):
+        self.recent[ticket.ticket_id] = ticket
+        self.recent.move_to_end(ticket.ticket_id)
+        if len(self.recent) > self.recent_capacity:
+            self.recent.popitem(last=False)
+
+    def _bump(self, counts, key, delta):
+        counts[key] = counts.get(key, 0) + delta
+        if counts[key] == 0:
+            del counts[key]
+
+    def _bump_agent(self, agent, bucket, delta):
+        stats = self.agent_stats.setdefault(agent, {"open": 0, "closed": 0})
+        stats[bucket] += delta
+        if stats["open"] == 0 and stats["closed"] == 0:
+            del self.agent_stats[agent]
+
+
+def _bucket(status):
+    # Anything that is not open counts towards the closed column
+    return "open" if status == "open" else "closed"
+
+
 def generate_dashboard(tickets):
-    if not tickets:
+    # Accepts anything with a snapshot() (DashboardAggregator, SQLiteTicketRepository)
+    # or any collection of tickets
+    if hasattr(tickets, "snapshot"):
+        snapshot = tickets.snapshot()
+    else:
+        snapshot = DashboardAggregator(tickets).snapshot()
+    render_dashboard(snapshot)
+
+
+def render_dashboard(snapshot):
+    total = snapshot["total"]
+    if not total:
         print("\n Ticket Dashboard")
         print("No tickets found.")
         return
-    
-    # 2D List: [[status, priority, assigned_agent]]
-    data = [[t.status, t.priority, t.assigned_agent] for t in tickets]
-
-    # Basic counts
-    open_count = sum(1 for row in data if row[0] == "open")
-    closed_count = sum(1 for row in data if row[0] == "closed")
-    high_priority = sum(1 for row in data if row[1] == "high")
-    normal_priority = sum(1 for row in data if row[1] == "normal")
-    
-    # Agent statistics
-    agent_stats = {}
-    for row in data:
-        agent = row[2]
-        if agent not in agent_stats:
-            agent_stats[agent] = {"open": 0, "closed": 0}
-        if row[0] == "open":
-            agent_stats[agent]["open"] += 1
-        else:
-            agent_stats[agent]["closed"] += 1
+
+    open_count = snapshot["status"].get("open", 0)
+    closed_count = total - open_count
 
     print("\n" + "="*50)
     print(" TICKET DASHBOARD")
     print("="*50)
-    
+
     # Overall statistics
     print(f"\n OVERALL STATISTICS:")
-    print(f"   Total Tickets: {len(tickets)}")
+    print(f"   Total Tickets: {total}")
     print(f"   Open Tickets: {open_count}")
     print(f"   Closed Tickets: {closed_count}")
-    print(f"   Resolution Rate: {(closed_count/len(tickets)*100):.1f}%" if tickets else "0%")
-    
+    print(f"   Resolution Rate: {(closed_count/total*100):.1f}%")
+
     # Priority breakdown
     print(f"\n PRIORITY BREAKDOWN:")
-    print(f"   High Priority: {high_priority}")
-    print(f"   Normal Priority: {normal_priority}")
-    
+    for level in reversed(PRIORITY_LEVELS):
+        print(f"   {level.capitalize()} Priority: {snapshot['priority'].get(level, 0)}")
+
     # Agent workload
     print(f"\n AGENT WORKLOAD:")
-    for agent, stats in agent_stats.items():
-        total = stats["open"] + stats["closed"]
-        print(f"   {agent}: {stats['open']} open, {stats['closed']} closed (Total: {total})")
-    
-    # Recent activity (last 5 tickets)
+    for agent, stats in snapshot["agents"].items():
+        total_for_agent = stats["open"] + stats["closed"]
+        print(f"   {agent}: {stats['open']} open, {stats['closed']} closed (Total: {total_for_agent})")
+
+    # SLA breaches, when an SLA monitor is attached
+    if "sla" in snapshot:
+        sla = snapshot["sla"]
+        print(f"\n SLA:")
+        print(f"   Deadlines Missed: {sla['breached']} (escalations: {sla['escalations']})")
+        for level in reversed(PRIORITY_LEVELS):
+            if sla["open_breached"].get(level):
+                print(f"   {level.capitalize()} open past deadline: {sla['open_breached'][level]}")
+
+    # Recent activity (most recently updated tickets)
     print(f"\n RECENT ACTIVITY:")
-    recent_tickets = sorted(tickets, key=lambda x: x.updated_at, reverse=True)[:5]
-    for ticket in recent_tickets:
+    for ticket in snapshot["recent"]:
         status_icon = "" if ticket.status == "open" else ""
         priority_icon = "" if ticket.priority == "high" else ""
         print(f" {status_icon} {priority_icon} [{ticket.ticket_id}] {ticket.title}")
-    
-    print("="*50)
\ No newline at end of file
+
+    print("="*50)
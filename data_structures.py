@@ -1,40 +1,74 @@
+import heapq
+import time
+from collections import deque
+from itertools import count, islice
+
+from ticket import PRIORITY_LEVELS
+from metrics import METRICS, QUEUE_ENQUEUED, QUEUE_DEQUEUED, QUEUE_WAIT_SECONDS
+
 # Linked List Node
 class Node:
+    __slots__ = ("ticket", "next", "prev")
+
     def __init__(self, ticket):
         self.ticket = ticket
         self.next = None
+        self.prev = None
 
 # Linked List for chronological history
 class LinkedList:
     def __init__(self):
         self.head = None
+        self.tail = None
+        self.length = 0
+        self.index = {}  # ticket_id -> ticket for O(1) lookup
 
     def append(self, ticket):
         new_node = Node(ticket)
+        self.index[ticket.ticket_id] = ticket
+        self.length += 1
         if not self.head:
-            self.head = new_node
+            self.head = self.tail = new_node
             return
-        temp = self.head
-        while temp.next:
-            temp = temp.next
-        temp.next = new_node
+        new_node.prev = self.tail
+        self.tail.next = new_node
+        self.tail = new_node
 
-    def display(self):
+    def nodes(self):
         temp = self.head
-        if not temp:
-            print("No tickets in history.")
-            return
         while temp:
-            print(temp.ticket)
+            yield temp
             temp = temp.next
+
+    def reverse_nodes(self):
+        # Latest entries first
+        temp = self.tail
+        while temp:
+            yield temp
+            temp = temp.prev
+
+    def slice(self, offset=0, limit=None, reverse=False):
+        nodes = self.reverse_nodes() if reverse else self.nodes()
+        stop = None if limit is None else offset + limit
+        return [node.ticket for node in islice(nodes, offset, stop)]
+
+    def display(self, offset=0, limit=None, reverse=False):
+        if not self.head:
+            print("No tickets in history.")
+            return 0
+        page = self.slice(offset, limit, reverse)
+        for ticket in page:
+            print(ticket)
+        return len(page)
+
+    def __iter__(self):
+        return (node.ticket for node in self.nodes())
+
+    def __len__(self):
+        return self.length
     
     def get_ticket_by_id(self, ticket_id):
-        temp = self.head
-        while temp:
-            if temp.ticket.ticket_id == ticket_id:
-                return temp.ticket
-            temp = temp.next
-        return None
+        return self.index.get(ticket_id)
 
 
 # Stack for undo feature
@@ -59,55 +93,324 @@ class Stack:
         return None
 
 
-# Queue for normal priority
+# Queue for normal priority (deque-backed, O(1) at both ends)
 class Queue:
     def __init__(self):
-        self.queue = []
+        self.queue = deque()
+        self.queued = {}  # ticket_id -> live entries in the queue
+        self.tombstones = {}  # ticket_id -> removed entries not yet skipped
+        self.removed = 0
 
     def enqueue(self, ticket):
         self.queue.append(ticket)
+        self.queued[ticket.ticket_id] = self.queued.get(ticket.ticket_id, 0) + 1
+
+    def enqueue_many(self, tickets):
+        for ticket in tickets:
+            self.enqueue(ticket)
 
     def dequeue(self):
+        self._skip_removed()
         if self.queue:
-            return self.queue.pop(0)
+            ticket = self.queue.popleft()
+            _decrement(self.queued, ticket.ticket_id)
+            return ticket
         return None
 
+    def dequeue_batch(self, n):
+        batch = []
+        while len(batch) < n:
+            ticket = self.dequeue()
+            if ticket is None:
+                break
+            batch.append(ticket)
+        return batch
+
+    def remove(self, ticket_id):
+        # Lazy removal: leave a tombstone and drop the ticket when it reaches the front
+        if not self.queued.get(ticket_id):
+            return False
+        _decrement(self.queued, ticket_id)
+        self.tombstones[ticket_id] = self.tombstones.get(ticket_id, 0) + 1
+        self.removed += 1
+        return True
+
+    def _skip_removed(self):
+        while self.removed and self.tombstones.get(self.queue[0].ticket_id):
+            ticket = self.queue.popleft()
+            _decrement(self.tombstones, ticket.ticket_id)
+            self.removed -= 1
+
     def is_empty(self):
-        return len(self.queue) == 0
+        return self.size() == 0
     
     def size(self):
-        return len(self.queue)
+        return len(self.queue) - self.removed
     
     def peek(self):
+        self._skip_removed()
         if self.queue:
             return self.queue[0]
         return None
 
 
-# Priority Queue for high-priority tickets
+def _decrement(counts, key):
+    if counts[key] == 1:
+        del counts[key]
+    else:
+        counts[key] -= 1
+
+
+# Priority Queue (binary heap) scheduling tickets across priority levels
 class PriorityQueue:
-    def __init__(self):
-        self.queue = []
+    def __init__(self, levels=PRIORITY_LEVELS):
+        # Higher index in `levels` means more urgent
+        self.levels = {name: rank for rank, name in enumerate(levels)}
+        self.names = list(levels)
+        self.queue = []  # heap of [-rank, sequence, ticket]; ticket is None once removed
+        self.entries = {}  # ticket_id -> heap entry
+        # (level, sequence) -> removed entry still in the heap, revived if that position is restored
+        self.tombstones = {}
+        self.counter = count()  # keeps FIFO order within a level
+        self.level_counts = {name: 0 for name in levels}
 
     def enqueue(self, ticket):
-        # High priority tickets go to the front
-        if ticket.priority == "high":
-            self.queue.insert(0, ticket)
-        else:
-            self.queue.append(ticket)
+        if ticket.priority not in self.levels:
+            raise ValueError(f"Unknown priority level: {ticket.priority}")
+        if ticket.ticket_id in self.entries:
+            raise ValueError(f"Ticket {ticket.ticket_id} is already queued")
+        entry = [-self.levels[ticket.priority], next(self.counter), ticket]
+        self.entries[ticket.ticket_id] = entry
+        heapq.heappush(self.queue, entry)
+        self.level_counts[ticket.priority] += 1
+        if METRICS.enabled:
+            QUEUE_ENQUEUED.inc(ticket.priority)
+
+    def enqueue_many(self, tickets):
+        # A batch larger than the heap is appended and re-heapified in O(n) instead of n pushes
+        tickets = list(tickets)
+        if len(tickets) <= len(self.queue):
+            for ticket in tickets:
+                self.enqueue(ticket)
+            return
+        for ticket in tickets:
+            if ticket.priority not in self.levels:
+                raise ValueError(f"Unknown priority level: {ticket.priority}")
+            if ticket.ticket_id in self.entries:
+                raise ValueError(f"Ticket {ticket.ticket_id} is already queued")
+        for ticket in tickets:
+            entry = [-self.levels[ticket.priority], next(self.counter), ticket]
+            self.entries[ticket.ticket_id] = entry
+            self.queue.append(entry)
+            self.level_counts[ticket.priority] += 1
+        heapq.heapify(self.queue)
+        if METRICS.enabled:
+            for ticket in tickets:
+                QUEUE_ENQUEUED.inc(ticket.priority)
 
     def dequeue(self):
+        entry = self.dequeue_entry()
+        return entry[2] if entry else None
+
+    def dequeue_entry(self):
+        # Like dequeue(), but keeps the (level, sequence) so restore() can undo it
+        self._skip_removed()
         if self.queue:
-            return self.queue.pop(0)
+            entry = heapq.heappop(self.queue)
+            del self.entries[entry[2].ticket_id]
+            self.level_counts[self.names[-entry[0]]] -= 1
+            if METRICS.enabled:
+                level = self.names[-entry[0]]
+                QUEUE_DEQUEUED.inc(level)
+                QUEUE_WAIT_SECONDS.observe(time.time() - entry[2].created_ts, level)
+            return entry
         return None
 
+    def restore(self, entry):
+        # Put a dequeued entry back at its original position
+        ticket = entry[2]
+        if ticket.ticket_id in self.entries:
+            raise ValueError(f"Ticket {ticket.ticket_id} is already queued")
+        stale = self.tombstones.pop((entry[0], entry[1]), None)
+        if stale is not None:
+            # Pushing a copy would tie with the blank entry and compare a ticket with None
+            stale[2] = ticket
+            entry = stale
+        else:
+            heapq.heappush(self.queue, entry)
+        self.entries[ticket.ticket_id] = entry
+        self.level_counts[self.names[-entry[0]]] += 1
+
+    def promote(self, ticket_id, level):
+        # Move a queued ticket up to `level`; it keeps its arrival order, so it goes ahead of later arrivals
+        entry = self.entries.get(ticket_id)
+        if entry is None or self.levels[level] <= -entry[0]:
+            return False
+        ticket = entry[2]
+        self.remove(ticket_id)
+        self.restore([-self.levels[level], entry[1], ticket])
+        return True
+
+    def take_entry(self, ticket_id):
+        # Remove one queued ticket, wherever it is, and return its entry for restore(); None if not queued
+        entry = self.entries.get(ticket_id)
+        if entry is None:
+            return None
+        taken = entry[:]
+        self.remove(ticket_id)
+        return taken
+
+    def level_of(self, ticket_id):
+        entry = self.entries.get(ticket_id)
+        return self.names[-entry[0]] if entry else None
+
+    def remove(self, ticket_id):
+        # Lazy removal: blank the heap entry and drop it when it reaches the top
+        entry = self.entries.pop(ticket_id, None)
+        if entry is None:
+            return False
+        self.level_counts[self.names[-entry[0]]] -= 1
+        entry[2] = None
+        self.tombstones[entry[0], entry[1]] = entry
+        return True
+
+    def _skip_removed(self):
+        while self.queue and self.queue[0][2] is None:
+            entry = heapq.heappop(self.queue)
+            del self.tombstones[entry[0], entry[1]]
+
     def is_empty(self):
-        return len(self.queue) == 0
+        return len(self.entries) == 0
     
     def size(self):
-        return len(self.queue)
+        return len(self.entries)
+
+    def tickets(self):
+        # Queued tickets in dispatch order
+        return [entry[2] for entry in sorted(self.entries.values())]
+
+    def iter_entries(self):
+        # Queued entries in dispatch order, walked lazily down the heap instead of sorting a copy:
+        # only the frontier of candidate children is held. The queue must not change meanwhile.
+        heap = self.queue
+        frontier = [(heap[0][0], heap[0][1], 0)] if heap else []
+        while frontier:
+            index = heapq.heappop(frontier)[2]
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child][0], heap[child][1], child))
+            if heap[index][2] is not None:
+                yield heap[index]
+
+    def size_by_level(self):
+        return dict(self.level_counts)
     
     def peek(self):
+        self._skip_removed()
         if self.queue:
-            return self.queue[0]
-        return None
\ No newline at end of file
+            return self.queue[0][2]
+        return None
+
+
+# A scheduled callback slot in a TimerWheel
+class Timer:
+    __slots__ = ("when", "item", "cancelled")
+
+    def __init__(self, when, item):
+        self.when = when
+        self.item = item
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+# Hierarchical timer wheel: O(1) schedule and cancel, expiry cost proportional to elapsed ticks
+class TimerWheel:
+    def __init__(self, tick=1.0, slots=64, levels=4, start=0.0):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        # wheels[level][slot]: timers due within slots ** (level + 1) ticks land in `level`
+        self.wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.overflow = []  # beyond the top wheel; re-placed once per top-wheel turn
+        self.due = []  # scheduled at or before the current tick
+        self.bottom = 0  # timers in the lowest wheel, so idle stretches can be skipped
+        self.current = int(start // tick)
+        self.pending = 0  # scheduled and not yet fired (cancelled timers included)
+
+    def schedule(self, when, item):
+        timer = Timer(when, item)
+        self._place(timer)
+        self.pending += 1
+        return timer
+
+    def advance(self, now):
+        # Items of the timers that expired up to `now`, oldest deadline first within a tick
+        fired = self._collect(self.due)
+        self.due = []
+        target = int(now // self.tick)
+        if not self.pending:
+            self.current = max(self.current, target)
+        while self.current < target and self.pending:
+            if not self.bottom:
+                # Nothing can fire before the next cascade
+                boundary = (self.current // self.slots + 1) * self.slots
+                if boundary > target:
+                    break
+                self.current = boundary - 1
+            self.current += 1
+            self._cascade()
+            slot = self.wheels[0][self.current % self.slots]
+            if self.due:  # cascaded timers that expire on this very tick
+                self.bottom += len(self.due)
+                slot.extend(self.due)
+                self.due = []
+            if slot:
+                self.wheels[0][self.current % self.slots] = []
+                self.bottom -= len(slot)
+                fired.extend(self._collect(slot))
+        self.current = max(self.current, target)
+        return fired
+
+    def _collect(self, timers):
+        self.pending -= len(timers)
+        timers.sort(key=lambda timer: timer.when)
+        return [timer.item for timer in timers if not timer.cancelled]
+
+    def _place(self, timer):
+        expires = int(timer.when // self.tick)
+        delta = expires - self.current
+        if delta <= 0:
+            self.due.append(timer)
+            return
+        span = self.slots
+        for level in range(self.levels):
+            if delta < span:
+                self.wheels[level][(expires // (span // self.slots)) % self.slots].append(timer)
+                if not level:
+                    self.bottom += 1
+                return
+            span *= self.slots
+        self.overflow.append(timer)
+
+    def _cascade(self):
+        # When a wheel completes a turn, the next slot of the wheel above is spread out below it
+        span = 1
+        for level in range(1, self.levels):
+            span *= self.slots
+            if self.current % span:
+                return
+            slot_index = (self.current // span) % self.slots
+            timers = self.wheels[level][slot_index]
+            if timers:
+                self.wheels[level][slot_index] = []
+                for timer in timers:
+                    self._place(timer)
+        if self.overflow and self.current % (span * self.slots) == 0:
+            timers, self.overflow = self.overflow, []
+            for timer in timers:
+                self._place(timer)
+
+    def __len__(self):
+        return self.pending
@@ -0,0 +1,111 @@
+from metrics import METRICS, OPERATION_SECONDS
+
+
+# Parent/child dependency graph over a TicketStore
+#
+# A ticket can be closed once every ticket on its parent chain is closed.
+# That answer is cached per ticket and dropped for the descendants of a
+# ticket whenever its status changes, so repeated checks stay O(1).
+class DependencyGraph:
+    def __init__(self, store):
+        self.store = store
+        self.parents = {}  # child_id -> parent_id
+        self.children = {}  # parent_id -> {child_id: None}, in creation order
+        self.chain_closed = {}  # ticket_id -> cached "all ancestors closed"
+        for ticket in store:
+            self.add(ticket)
+        store.subscribe(self.on_store_event)
+
+    def on_store_event(self, event, ticket, old_value):
+        if event == "create":
+            self.add(ticket)
+        elif event == "remove":
+            self.remove(ticket.ticket_id)
+        elif event == "status":
+            self.invalidate(ticket.ticket_id)
+
+    def check_parent(self, ticket_id, parent_id):
+        if parent_id is None:
+            return
+        if self.would_cycle(ticket_id, parent_id):
+            raise ValueError(f"Parent {parent_id} would create a dependency cycle for ticket {ticket_id}")
+
+    def would_cycle(self, ticket_id, parent_id):
+        # A ticket nobody depends on (e.g. a brand-new one) cannot close a cycle
+        if parent_id != ticket_id and ticket_id not in self.children:
+            return False
+        seen = set()
+        current = parent_id
+        while current is not None:
+            if current == ticket_id or current in seen:
+                return True
+            seen.add(current)
+            current = self.parents.get(current)
+        return False
+
+    def add(self, ticket):
+        if ticket.parent is None:
+            return
+        self.check_parent(ticket.ticket_id, ticket.parent)
+        self.parents[ticket.ticket_id] = ticket.parent
+        self.children.setdefault(ticket.parent, {})[ticket.ticket_id] = None
+
+    def remove(self, ticket_id):
+        self.invalidate(ticket_id)
+        self.chain_closed.pop(ticket_id, None)
+        parent_id = self.parents.pop(ticket_id, None)
+        if parent_id is not None:
+            siblings = self.children.get(parent_id)
+            if siblings is not None:
+                siblings.pop(ticket_id, None)
+                if not siblings:
+                    del self.children[parent_id]
+
+    def invalidate(self, ticket_id):
+        # A cached child always has a cached parent, so stop at uncached tickets
+        pending = list(self.children.get(ticket_id, ()))
+        while pending:
+            child_id = pending.pop()
+            if self.chain_closed.pop(child_id, None) is not None:
+                pending.extend(self.children.get(child_id, ()))
+
+    def ancestors_closed(self, ticket_id):
+        path = []
+        current = ticket_id
+        while True:
+            if current in self.chain_closed:
+                result = self.chain_closed[current]
+                break
+            path.append(current)
+            parent_id = self.parents.get(current)
+            parent = self.store.get(parent_id) if parent_id is not None else None
+            if parent is None:
+                result = True
+                break
+            if parent.status != "closed":
+                result = False
+                break
+            current = parent_id
+        for visited in path:
+            self.chain_closed[visited] = result
+        return result
+
+    def can_close(self, ticket):
+        with METRICS.timer(OPERATION_SECONDS, "check_dependency"):
+            return self.ancestors_closed(ticket.ticket_id)
+
+    def unblocked_by(self, ticket_id):
+        # Open descendants whose only unresolved ancestor is ticket_id
+        if not self.ancestors_closed(ticket_id):
+            return []
+        unblocked = []
+        pending = list(reversed(self.children.get(ticket_id, {})))
+        while pending:
+            child = self.store.get(pending.pop())
+            if child is None:
+                continue
+            if child.status == "closed":
+                pending.extend(reversed(self.children.get(child.ticket_id, {})))
+            else:
+                unblocked.append(child)
+        return unblocked
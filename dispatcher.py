@@ -0,0 +1,225 @@
+import heapq
+import threading
+import time
+from itertools import count
+
+from data_structures import PriorityQueue
+
+LEASE_TIMEOUT = 30 * 60  # seconds a claimed ticket stays with one worker
+
+
+# A worker's time-limited claim on a ticket
+class Lease:
+    __slots__ = ("entry", "worker", "expires_at")
+
+    def __init__(self, entry, worker, expires_at):
+        self.entry = entry  # scheduler entry, kept so the ticket can return to its place
+        self.worker = worker
+        self.expires_at = expires_at
+
+    @property
+    def ticket(self):
+        return self.entry[2]
+
+    def __repr__(self):
+        return f"Lease({self.ticket.ticket_id} -> {self.worker})"
+
+
+# Thread-safe dispatcher over the priority scheduler with ticket leasing
+class Dispatcher:
+    def __init__(self, queue=None, lease_timeout=LEASE_TIMEOUT, clock=time.monotonic):
+        self.queue = queue if queue is not None else PriorityQueue()
+        self.lease_timeout = lease_timeout
+        self.clock = clock
+        self.condition = threading.Condition()
+        self.leases = {}  # ticket_id -> Lease
+        self.expiries = []  # heap of (expires_at, order, lease); stale entries are skipped
+        self.order = count()
+        self.closed = False
+
+    def submit(self, ticket):
+        with self.condition:
+            self.queue.enqueue(ticket)
+            self.condition.notify()
+
+    def submit_many(self, tickets):
+        with self.condition:
+            self.queue.enqueue_many(tickets)
+            self.condition.notify_all()
+
+    def claim(self, worker, timeout=None):
+        # Blocks until a ticket is available, the timeout passes or the dispatcher closes
+        deadline = None if timeout is None else self.clock() + timeout
+        with self.condition:
+            while True:
+                now = self.clock()
+                self._expire_leases(now)
+                entry = self.queue.dequeue_entry()
+                if entry is not None:
+                    return self._lease(entry, worker, now)
+                if self.closed and not self.leases:
+                    return None
+
+                wait = self.expiries[0][0] - now if self.expiries else None
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        return None
+                    wait = remaining if wait is None else min(wait, remaining)
+                self.condition.wait(wait)
+
+    def claim_ticket(self, ticket_id, worker):
+        # Lease one given ticket, as an earlier claim() recorded it: nothing is chosen by level.
+        # A ticket already leased here had its first lease run out before it was claimed again.
+        with self.condition:
+            entry = self.queue.take_entry(ticket_id)
+            if entry is None:
+                lease = self.leases.pop(ticket_id, None)
+                if lease is None:
+                    raise ValueError(f"Ticket {ticket_id} is not queued")
+                entry = lease.entry
+            return self._lease(entry, worker, self.clock())
+
+    def renew(self, lease):
+        with self.condition:
+            if not self._holds(lease):
+                return False
+            lease.expires_at = self.clock() + self.lease_timeout
+            heapq.heappush(self.expiries, (lease.expires_at, next(self.order), lease))
+            return True
+
+    def complete(self, lease):
+        # False if the lease expired and the ticket went back to the queue
+        with self.condition:
+            if not self._holds(lease):
+                return False
+            del self.leases[lease.ticket.ticket_id]
+            self._notify_if_drained()
+            return True
+
+    def remove(self, ticket_id):
+        # Take a ticket out of the dispatcher entirely, queued or leased
+        with self.condition:
+            removed = self.queue.remove(ticket_id) or self.leases.pop(ticket_id, None) is not None
+            self._notify_if_drained()
+            return removed
+
+    def take(self, ticket_id):
+        # remove() that hands back where the ticket was, for restore(): (entry, worker), with
+        # worker None if it was queued; None if it was in neither
+        with self.condition:
+            entry = self.queue.take_entry(ticket_id)
+            if entry is not None:
+                return entry, None
+            lease = self.leases.pop(ticket_id, None)
+            if lease is None:
+                return None
+            self._notify_if_drained()
+            return lease.entry, lease.worker
+
+    def restore(self, entry, worker=None):
+        # Requeue a taken entry at its old position, or lease it to `worker` again with a fresh timeout
+        with self.condition:
+            if worker is None:
+                self.queue.restore(entry)
+                self.condition.notify()
+                return
+            ticket_id = entry[2].ticket_id
+            if ticket_id in self.leases or ticket_id in self.queue.entries:
+                raise ValueError(f"Ticket {ticket_id} is already dispatched")
+            self._lease(entry, worker, self.clock())
+
+    def promote(self, ticket_id, level):
+        # Raise a queued ticket's level (SLA aging); leased tickets are left alone
+        with self.condition:
+            return self.queue.promote(ticket_id, level)
+
+    def level_of(self, ticket_id):
+        with self.condition:
+            return self.queue.level_of(ticket_id)
+
+    def close(self):
+        # Workers finish the queue and any outstanding leases, then claim() returns None
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def in_progress(self):
+        with self.condition:
+            return len(self.leases)
+
+    def tickets(self):
+        # Leased and queued tickets in their original dispatch order
+        with self.condition:
+            entries = [lease.entry for lease in self.leases.values()]
+            entries.extend(self.queue.entries.values())
+            return [entry[2] for entry in sorted(entries)]
+
+    def iter_tickets(self):
+        # tickets() without building and sorting the whole queue: leases (a few per worker) are
+        # merged into the lazy heap walk. Holds the lock until the iterator is exhausted or closed.
+        with self.condition:
+            leased = sorted(lease.entry for lease in self.leases.values())
+            for entry in heapq.merge(leased, self.queue.iter_entries()):
+                yield entry[2]
+
+    def __contains__(self, ticket_id):
+        # Queued or leased
+        with self.condition:
+            return ticket_id in self.queue.entries or ticket_id in self.leases
+
+    def _lease(self, entry, worker, now):
+        lease = Lease(entry, worker, now + self.lease_timeout)
+        self.leases[lease.ticket.ticket_id] = lease
+        heapq.heappush(self.expiries, (lease.expires_at, next(self.order), lease))
+        return lease
+
+    def _notify_if_drained(self):
+        if self.closed and not self.leases:
+            self.condition.notify_all()
+
+    def _holds(self, lease):
+        return (self.leases.get(lease.ticket.ticket_id) is lease
+                and lease.expires_at > self.clock())
+
+    def _expire_leases(self, now):
+        returned = False
+        while self.expiries and self.expiries[0][0] <= now:
+            _, _, lease = heapq.heappop(self.expiries)
+            ticket_id = lease.ticket.ticket_id
+            if self.leases.get(ticket_id) is lease and lease.expires_at <= now:
+                del self.leases[ticket_id]
+                self.queue.restore(lease.entry)
+                returned = True
+        if returned:
+            self.condition.notify_all()
+
+
+# Pool of worker threads that claim, handle and complete tickets
+class WorkerPool:
+    def __init__(self, dispatcher, handler, workers=4):
+        self.dispatcher = dispatcher
+        self.handler = handler  # handler(ticket); return False to abandon the lease
+        self.threads = [threading.Thread(target=self._run, args=(f"worker-{n}",), daemon=True)
+                        for n in range(workers)]
+        self.completed = 0
+        self.lock = threading.Lock()
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+
+    def _run(self, worker):
+        while True:
+            lease = self.dispatcher.claim(worker)
+            if lease is None:
+                return
+            if self.handler(lease.ticket) is False:
+                continue
+            if self.dispatcher.complete(lease):
+                with self.lock:
+                    self.completed += 1
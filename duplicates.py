@@ -0,0 +1,121 @@
+from array import array
+from zlib import crc32
+
+from search import tokenize
+from store import TicketStore
+
+SHINGLE_SIZE = 2  # words per shingle; common words alone would make every ticket look alike
+SIGNATURE_BINS = 64
+BANDS = 16  # 16 bands x 4 rows: pairs above ~50% similarity usually share a bucket
+DUPLICATE_THRESHOLD = 0.6  # estimated Jaccard similarity to call two tickets duplicates
+_EMPTY = 0xFFFFFFFF
+
+
+def minhash(text, bins=SIGNATURE_BINS):
+    # One-permutation MinHash: each shingle is hashed once and kept as the minimum of its bin,
+    # so a signature costs O(shingles) instead of O(shingles x bins)
+    words = tokenize(text)
+    if not words:
+        return None
+    signature = [_EMPTY] * bins
+    for start in range(max(1, len(words) - SHINGLE_SIZE + 1)):
+        value = crc32(" ".join(words[start:start + SHINGLE_SIZE]).encode())
+        slot = value % bins
+        value //= bins
+        if value < signature[slot]:
+            signature[slot] = value
+    # Short texts leave bins empty; fill each from the next non-empty bin (rotation densification)
+    if _EMPTY in signature:
+        filled = list(signature)
+        donor = None
+        distance = 0
+        # Two right-to-left sweeps around the ring carry the nearest filled bin leftwards
+        for step in range(2 * bins - 1, -1, -1):
+            slot = step % bins
+            if signature[slot] != _EMPTY:
+                donor, distance = signature[slot], 0
+                continue
+            distance += 1
+            if donor is not None and filled[slot] == _EMPTY:
+                filled[slot] = (donor + distance * 0x9E3779B1) & 0xFFFFFFFF
+        signature = filled
+    return array("I", signature)
+
+
+def similarity(first, second):
+    # Fraction of matching bins estimates the Jaccard similarity of the shingle sets
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+
+# Near-duplicate detector: MinHash signatures bucketed by locality-sensitive hashing
+class DuplicateDetector:
+    def __init__(self, tickets=(), threshold=DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self.rows = SIGNATURE_BINS // BANDS
+        self.buckets = [{} for _ in range(BANDS)]  # per band: band values -> set of ticket ids
+        self.signatures = {}  # ticket_id -> signature, open tickets only
+        self.tickets = {}  # ticket_id -> Ticket
+        for ticket in tickets:
+            if ticket.status == "open":
+                self.add(ticket)
+        if isinstance(tickets, TicketStore):
+            tickets.subscribe(self.on_store_event)
+
+    def on_store_event(self, event, ticket, old_value):
+        # Only open tickets can be duplicated; closed ones leave the index
+        if event == "create" and ticket.status == "open":
+            self.add(ticket)
+        elif event == "remove":
+            self.discard(ticket.ticket_id)
+        elif event == "status":
+            if ticket.status == "open":
+                self.add(ticket)
+            else:
+                self.discard(ticket.ticket_id)
+
+    def add(self, ticket):
+        signature = minhash(f"{ticket.title} {ticket.description}")
+        if signature is None or ticket.ticket_id in self.signatures:
+            return
+        self.signatures[ticket.ticket_id] = signature
+        self.tickets[ticket.ticket_id] = ticket
+        for band, key in enumerate(self._bands(signature)):
+            self.buckets[band].setdefault(key, set()).add(ticket.ticket_id)
+
+    def discard(self, ticket_id):
+        signature = self.signatures.pop(ticket_id, None)
+        if signature is None:
+            return
+        del self.tickets[ticket_id]
+        for band, key in enumerate(self._bands(signature)):
+            bucket = self.buckets[band][key]
+            bucket.discard(ticket_id)
+            if not bucket:
+                del self.buckets[band][key]
+
+    def find(self, title, description="", limit=3):
+        # Open tickets similar to the text, most similar (then oldest) first: [(ticket, similarity)]
+        signature = minhash(f"{title} {description}")
+        if signature is None:
+            return []
+        candidates = set()
+        for band, key in enumerate(self._bands(signature)):
+            candidates.update(self.buckets[band].get(key, ()))
+        matches = []
+        for ticket_id in candidates:
+            score = similarity(signature, self.signatures[ticket_id])
+            if score >= self.threshold:
+                matches.append((-score, ticket_id))
+        matches.sort()
+        return [(self.tickets[ticket_id], -score) for score, ticket_id in matches[:limit]]
+
+    def best_match(self, title, description=""):
+        matches = self.find(title, description, limit=1)
+        return matches[0][0] if matches else None
+
+    def _bands(self, signature):
+        rows = self.rows
+        return [tuple(signature[start:start + rows]) for start in range(0, len(signature), rows)]
+
+    def __len__(self):
+        return len(self.signatures)
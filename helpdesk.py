@@ -0,0 +1,209 @@
+import threading
+
+from ticket import Ticket
+from data_structures import LinkedList, PriorityQueue
+from dashboard import DashboardAggregator
+from store import TicketStore
+from dependencies import DependencyGraph
+from dispatcher import Dispatcher
+from assignment import AssignmentEngine
+from sla import SLAMonitor
+from undo import UNDO_CAPACITY, UndoHistory, CreateCommand, CloseCommand, AssignCommand
+from metrics import (METRICS, OPERATION_SECONDS, TICKETS_CREATED, TICKETS_CLOSED, UNDO_OPERATIONS,
+                     QUEUE_DEPTH, TICKETS_IN_PROGRESS, OPEN_TICKETS)
+
+
+# Help desk state and the operations the menu (and the write-ahead log) drive
+class HelpDesk:
+    def __init__(self, undo_capacity=UNDO_CAPACITY):
+        self.tickets = TicketStore()
+        self.dependencies = DependencyGraph(self.tickets)
+        self.dashboard = DashboardAggregator(self.tickets)
+        # Text indexes are built from the store on first use, so commands that never search
+        # do not pay for indexing every ticket when a saved help desk is loaded
+        self._search_index = None
+        self._duplicates = None
+        self.link_duplicates = False  # file near-duplicates as held children of the open original
+        self.history = LinkedList()
+        self.undo_history = UndoHistory(undo_capacity)
+        self.priority_queue = PriorityQueue()
+        # Processed tickets stay leased to the operator until closed or the lease runs out
+        self.dispatcher = Dispatcher(self.priority_queue)
+        self.sla = SLAMonitor(self.tickets, self.dispatcher)
+        self.dashboard.sla = self.sla
+        self.assigner = AssignmentEngine(self.tickets)
+        self.auto_assign = False  # hand new and dequeued tickets to the least-loaded agent
+        self.ticket_counter = 1
+        self.journal = None  # Persistence that records each operation, if attached
+        # Held by every state-changing operation and by collect_metrics, so a metrics scrape
+        # from the HTTP server thread never reads the aggregates halfway through an update
+        self.lock = threading.RLock()
+
+    @property
+    def search_index(self):
+        if self._search_index is None:
+            from search import SearchIndex
+            self._search_index = SearchIndex(self.tickets)
+        return self._search_index
+
+    @property
+    def duplicates(self):
+        if self._duplicates is None:
+            from duplicates import DuplicateDetector
+            self._duplicates = DuplicateDetector(self.tickets)
+        return self._duplicates
+
+    def create_ticket(self, title, description="", priority="normal", parent=None, hold=False):
+        with self.lock:
+            with METRICS.timer(OPERATION_SECONDS, "create"):
+                ticket = self._create_ticket(title, description, priority, parent, hold)
+            if METRICS.enabled:
+                TICKETS_CREATED.inc(ticket.priority)
+            return ticket
+
+    def _create_ticket(self, title, description, priority, parent, hold):
+        # A held ticket stays out of the queue until its parent is closed
+        if parent is None and self.link_duplicates:
+            original = self.duplicates.best_match(title, description)
+            if original is not None:
+                parent, hold = original.ticket_id, True
+        if parent and parent not in self.tickets:
+            raise ValueError(f"Parent ticket {parent} does not exist.")
+        if hold and not parent:
+            raise ValueError("Only a ticket with a parent can be held.")
+        self.dependencies.check_parent(self.ticket_counter, parent)
+
+        ticket = Ticket(self.ticket_counter, title, description, priority, parent)
+        self.tickets.add(ticket)
+        self.history.append(ticket)
+        if not hold:
+            self.dispatcher.submit(ticket)
+        self.undo_history.push(CreateCommand(ticket, queued=not hold))
+        self.ticket_counter += 1
+        if hold:
+            self._record("create", ticket=ticket.to_record(), hold=True)
+        else:
+            self._record("create", ticket=ticket.to_record())
+        if self.auto_assign:
+            self.assign_least_loaded(ticket.ticket_id)
+        return ticket
+
+    def import_batch(self, tickets, queued=True):
+        # Bulk path for already-validated tickets: no undo entries or per-ticket log records.
+        # With queued=False the caller dispatches them itself.
+        with self.lock:
+            for ticket in tickets:
+                self.tickets.add(ticket)
+                self.history.append(ticket)
+                self.ticket_counter = max(self.ticket_counter, ticket.ticket_id + 1)
+            if queued:
+                self.dispatcher.submit_many(ticket for ticket in tickets if ticket.status == "open")
+
+    def process_next(self, worker="operator"):
+        with self.lock:
+            with METRICS.timer(OPERATION_SECONDS, "process_next"):
+                return self._process_next(worker)
+
+    def _process_next(self, worker):
+        self.sla.poll()  # age waiting tickets before picking one
+        lease = self.dispatcher.claim(worker, timeout=0)
+        if lease is None:
+            return None
+        self._record("process", ticket_id=lease.ticket.ticket_id, worker=worker)
+        if self.auto_assign and lease.ticket.assigned_agent == "Unassigned":
+            self.assign_least_loaded(lease.ticket.ticket_id)
+        return lease.ticket
+
+    def close_ticket(self, ticket_id):
+        # Returns the tickets this close unblocks
+        with self.lock:
+            ticket = self.get_ticket(ticket_id)
+            if ticket.status == "closed":
+                raise ValueError(f"Ticket {ticket_id} is already closed.")
+            if not self.dependencies.can_close(ticket):
+                raise ValueError("Cannot close ticket until parent is resolved.")
+            ticket.update_status("closed")
+            # Out of the dispatcher whether it was still queued or leased by process_next
+            entry, worker = self.dispatcher.take(ticket_id) or (None, None)
+            unblocked = self.dependencies.unblocked_by(ticket_id)
+            # Held duplicates are worked once their original is resolved
+            released = [t for t in unblocked if t.ticket_id not in self.dispatcher]
+            for held in released:
+                self.dispatcher.submit(held)
+            self.undo_history.push(CloseCommand(ticket, [t.ticket_id for t in released],
+                                                entry[:2] if entry else None, worker))
+            self._record("close", ticket_id=ticket_id, at=ticket.updated_ts)
+            if METRICS.enabled:
+                TICKETS_CLOSED.inc(ticket.assigned_agent)
+            return unblocked
+
+    def assign_agent(self, ticket_id, agent):
+        with self.lock:
+            ticket = self.get_ticket(ticket_id)
+            if ticket.status == "closed":
+                raise ValueError(f"Cannot assign agent to closed ticket {ticket_id}.")
+            if not agent:
+                raise ValueError("Agent name cannot be empty.")
+            previous_agent = ticket.assigned_agent
+            ticket.assign_agent(agent)
+            self.undo_history.push(AssignCommand(ticket, previous_agent, agent))
+            self._record("assign", ticket_id=ticket_id, agent=agent, at=ticket.updated_ts)
+            return ticket
+
+    def assign_least_loaded(self, ticket_id, skill=None):
+        # Returns the ticket, or None if no registered agent has the skill and spare capacity
+        with self.lock:
+            agent = self.assigner.pick(skill)
+            if agent is None:
+                return None
+            return self.assign_agent(ticket_id, agent)
+
+    def undo(self):
+        # Returns the undone command, or None if there was nothing to undo
+        with self.lock:
+            with METRICS.timer(OPERATION_SECONDS, "undo"):
+                command = self.undo_history.undo(self)
+            if command is not None:
+                self._record("undo")
+                if METRICS.enabled:
+                    UNDO_OPERATIONS.inc("undo", command.name)
+            return command
+
+    def redo(self):
+        # Returns the re-applied command, or None if there was nothing to redo
+        with self.lock:
+            with METRICS.timer(OPERATION_SECONDS, "redo"):
+                command = self.undo_history.redo(self)
+            if command is not None:
+                self._record("redo")
+                if METRICS.enabled:
+                    UNDO_OPERATIONS.inc("redo", command.name)
+            return command
+
+    def find_duplicates(self, title, description="", limit=3):
+        # Open tickets that look like the same issue: [(ticket, similarity)]
+        return self.duplicates.find(title, description, limit)
+
+    def search(self, query, status=None, priority=None, agent=None, limit=10):
+        return self.search_index.search(query, status, priority, agent, limit)
+
+    def collect_metrics(self):
+        # Refresh the point-in-time gauges; registered with METRICS.add_collector when exporting
+        with self.lock:
+            for level, depth in self.priority_queue.size_by_level().items():
+                QUEUE_DEPTH.set(depth, level)
+            TICKETS_IN_PROGRESS.set(self.dispatcher.in_progress())
+            OPEN_TICKETS.clear()
+            for agent, stats in self.dashboard.agent_stats.items():
+                if stats["open"]:
+                    OPEN_TICKETS.set(stats["open"], agent)
+
+    def get_ticket(self, ticket_id):
+        ticket = self.tickets.get(ticket_id)
+        if ticket is None:
+            raise ValueError(f"Ticket {ticket_id} does not exist.")
+        return ticket
+
+    def _record(self, op, **fields):
+        if self.journal is not None:
+            self.journal.record(self, op, **fields)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Load generator for the Help Desk JSON service
+Each simulated agent creates a ticket, claims the next one and closes it.
+Run with: python loadgen.py --embedded   (or --host/--port for a running service)
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from ticket import PRIORITY_LEVELS
+from service import HelpDeskService, http_request
+
+
+async def agent(host, port, operations, latencies, claimed):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(operations):
+            start = time.perf_counter()
+            status, _ = await http_request(reader, writer, "POST", "/tickets", {
+                "title": f"Load ticket {i}", "description": "Generated by loadgen",
+                "priority": random.choice(PRIORITY_LEVELS)})
+            latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            status, ticket = await http_request(reader, writer, "POST", "/tickets/next")
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                continue
+            claimed.append(ticket["ticket_id"])
+
+            start = time.perf_counter()
+            await http_request(reader, writer, "POST", f"/tickets/{ticket['ticket_id']}/close")
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, clients, operations):
+    latencies = []
+    claimed = []
+    start = time.perf_counter()
+    await asyncio.gather(*(agent(host, port, operations, latencies, claimed) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "claimed": len(claimed),
+        "duplicate_claims": len(claimed) - len(set(claimed)),
+    }
+
+
+async def main(args):
+    service = None
+    host, port = args.host, args.port
+    if args.embedded:
+        service = HelpDeskService()
+        host, port = await service.start(host, 0)
+    try:
+        report = await run_load(host, port, args.clients, args.operations)
+    finally:
+        if service:
+            await service.stop()
+
+    print(" Help Desk service load test")
+    print("=" * 50)
+    print(f"   Clients: {args.clients}, operations per client: {args.operations}")
+    print(f"   Requests: {report['requests']:,} in {report['seconds']:.2f}s")
+    print(f"   Throughput: {report['rps']:,.0f} requests/s")
+    print(f"   Latency p50: {report['p50_ms']:.2f} ms, p99: {report['p99_ms']:.2f} ms")
+    print(f"   Tickets claimed: {report['claimed']:,} (duplicates: {report['duplicate_claims']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load generator for the Help Desk JSON service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--operations", type=int, default=200, help="create/claim/close rounds per client")
+    parser.add_argument("--embedded", action="store_true", help="start an in-process service on a free port")
+    asyncio.run(main(parser.parse_args()))
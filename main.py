@@ -1,24 +1,44 @@
-from ticket import Ticket
-from data_structures import LinkedList, Stack, Queue, PriorityQueue
+import argparse
+from itertools import islice
+
+from ticket import PRIORITY_LEVELS
 from dashboard import generate_dashboard
+from store import TicketStore
+from helpdesk import HelpDesk
+from persistence import Persistence
+from metrics import METRICS, OPERATION_SECONDS, start_http_server
+
+HISTORY_PAGE_SIZE = 20
 
-# Week 2: Recursive function for dependency check
+# Week 2: Dependency check - walks the parent chain iteratively
+# (the running system uses the cached DependencyGraph instead)
 def check_dependency(ticket, all_tickets):
-    if not ticket.parent:
-        return ticket.status == "closed"
-    parent_ticket = next((t for t in all_tickets if t.ticket_id == ticket.parent), None)
-    if not parent_ticket:
-        return True
-    if parent_ticket.status != "closed":
-        return False
-    return check_dependency(parent_ticket, all_tickets)
+    with METRICS.timer(OPERATION_SECONDS, "check_dependency"):
+        return _walk_parents(ticket, all_tickets)
+
+def _walk_parents(ticket, all_tickets):
+    seen = {ticket.ticket_id}
+    while ticket.parent:
+        parent_ticket = find_ticket(all_tickets, ticket.parent)
+        if not parent_ticket:
+            return True
+        if parent_ticket.status != "closed" or parent_ticket.ticket_id in seen:
+            return False
+        seen.add(parent_ticket.ticket_id)
+        ticket = parent_ticket
+    return True
+
+def find_ticket(tickets, ticket_id):
+    if isinstance(tickets, TicketStore):
+        return tickets.get(ticket_id)
+    return next((t for t in tickets if t.ticket_id == ticket_id), None)
 
 def get_valid_priority():
     while True:
-        priority = input("Priority (normal/high): ").lower().strip()
-        if priority in ["normal", "high"]:
+        priority = input(f"Priority ({'/'.join(PRIORITY_LEVELS)}): ").lower().strip()
+        if priority in PRIORITY_LEVELS:
             return priority
-        print(" Invalid priority. Please enter 'normal' or 'high'.")
+        print(f" Invalid priority. Please enter one of: {', '.join(PRIORITY_LEVELS)}.")
 
 def get_valid_parent_id():
     while True:
@@ -33,25 +53,51 @@ def get_valid_ticket_id(tickets):
     while True:
         try:
             ticket_id = int(input("Enter ticket ID: "))
-            if any(t.ticket_id == ticket_id for t in tickets):
+            if ticket_id in tickets:
                 return ticket_id
             print(" Ticket ID not found. Please try again.")
         except ValueError:
             print(" Invalid input. Please enter a number.")
 
-def main():
-    tickets = []
-    history = LinkedList()
-    undo_stack = Stack()
-    normal_queue = Queue()
-    priority_queue = PriorityQueue()
+def parse_agent(spec):
+    # "name[:capacity[:skill,skill...]]", e.g. "alice:10:network,database"
+    name, _, rest = spec.partition(":")
+    capacity, _, skills = rest.partition(":")
+    try:
+        capacity = int(capacity) if capacity else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid capacity in agent '{spec}'")
+    return name.strip(), capacity, [skill.strip() for skill in skills.split(",") if skill.strip()]
 
-    ticket_counter = 1
+def main(data_dir=None, agents=(), link_duplicates=False, metrics_file=None, metrics_port=None):
+    persistence = None
+    if data_dir:
+        persistence = Persistence(data_dir)
+        helpdesk = persistence.load()
+    else:
+        helpdesk = HelpDesk()
+    for name, capacity, skills in agents:
+        helpdesk.assigner.add_agent(name, skills, capacity)
+    helpdesk.auto_assign = bool(agents)
+    helpdesk.link_duplicates = link_duplicates
+    tickets = helpdesk.tickets
+    history = helpdesk.history
+    undo_history = helpdesk.undo_history
+    priority_queue = helpdesk.priority_queue
+    if metrics_file or metrics_port:
+        METRICS.enabled = True
+        METRICS.add_collector(helpdesk.collect_metrics)
+    if metrics_port:
+        start_http_server(metrics_port)
 
     print(" Welcome to the Help Desk Ticket System!")
     print("This system demonstrates various data structures and algorithms.")
+    if persistence:
+        print(f" Restored {len(tickets)} tickets from {data_dir}")
 
     while True:
+        if metrics_file:
+            METRICS.write(metrics_file)
         print("\n" + "="*50)
         print(" HELP DESK TICKET SYSTEM")
         print("="*50)
@@ -63,10 +109,12 @@ def main():
         print("6. Show History (Linked List)")
         print("7. Assign Agent to Ticket")
         print("8. Show Queue Status")
+        print("9. Redo Last Undone Action")
+        print("10. Search Tickets")
         print("0. Exit")
         print("="*50)
 
-        choice = input("Enter your choice (0-8): ").strip()
+        choice = input("Enter your choice (0-10): ").strip()
 
         if choice == "1":
             print("\n CREATING NEW TICKET")
@@ -79,44 +127,43 @@ def main():
                 
             description = input("Enter ticket description: ").strip()
             priority = get_valid_priority()
-            parent = get_valid_parent_id()
+            parent = None
+            hold = False
+            if not helpdesk.link_duplicates:
+                for original, score in helpdesk.find_duplicates(title, description):
+                    print(f" Possible duplicate ({score:.0%} similar): {original}")
+                    link = input(f"File as a duplicate of ticket {original.ticket_id}? (y/n): ").lower().strip()
+                    if link == 'y':
+                        parent, hold = original.ticket_id, True
+                        break
+            if parent is None:
+                parent = get_valid_parent_id()
             
-            # Check if parent ticket exists
-            if parent and not any(t.ticket_id == parent for t in tickets):
-                print(f" Parent ticket {parent} does not exist.")
+            try:
+                ticket = helpdesk.create_ticket(title, description, priority, parent, hold)
+            except ValueError as error:
+                print(f" {error}")
                 continue
 
-            ticket = Ticket(ticket_counter, title, description, priority, parent)
-            tickets.append(ticket)
-            history.append(ticket)
-
-            if priority == "high":
-                priority_queue.enqueue(ticket)
-                print(f" High priority ticket added to priority queue")
+            parent = ticket.parent
+            if ticket.ticket_id in helpdesk.dispatcher:
+                print(f" {priority.capitalize()} priority ticket added to priority queue")
             else:
-                normal_queue.enqueue(ticket)
-                print(f" Normal priority ticket added to standard queue")
-
-            undo_stack.push(("create", ticket))
-            print(f" Ticket {ticket_counter} created successfully!")
+                print(f" Filed as a duplicate of ticket {parent}; it will be queued once that ticket is closed")
+            print(f" Ticket {ticket.ticket_id} created successfully!")
             print(f"   Title: {title}")
             print(f"   Priority: {priority}")
             print(f"   Parent: {parent if parent else 'None'}")
-            ticket_counter += 1
 
         elif choice == "2":
             print("\n⚡ PROCESSING NEXT TICKET")
             print("-" * 30)
             
-            if not priority_queue.is_empty():
-                t = priority_queue.dequeue()
-                print(f" Processing HIGH PRIORITY ticket:")
-            elif not normal_queue.is_empty():
-                t = normal_queue.dequeue()
-                print(f" Processing NORMAL PRIORITY ticket:")
-            else:
+            t = helpdesk.process_next()
+            if t is None:
                 print(" No tickets to process.")
                 continue
+            print(f" Processing {t.priority.upper()} PRIORITY ticket:")
                 
             print(f"   ID: {t.ticket_id}")
             print(f"   Title: {t.title}")
@@ -126,7 +173,7 @@ def main():
             
             # Check dependencies
             if t.parent:
-                parent_ticket = next((pt for pt in tickets if pt.ticket_id == t.parent), None)
+                parent_ticket = tickets.get(t.parent)
                 if parent_ticket and parent_ticket.status != "closed":
                     print(f"  Warning: Parent ticket {t.parent} is still open")
 
@@ -139,64 +186,65 @@ def main():
                 continue
                 
             ticket_id = get_valid_ticket_id(tickets)
-            ticket = next((t for t in tickets if t.ticket_id == ticket_id), None)
-            
-            if ticket.status == "closed":
-                print(f" Ticket {ticket_id} is already closed.")
-                continue
-                
-            if check_dependency(ticket, tickets):
-                ticket.update_status("closed")
-                undo_stack.push(("close", ticket))
-                print(f" Ticket {ticket_id} closed successfully!")
-            else:
-                print(" Cannot close ticket until parent is resolved.")
-                parent_ticket = next((t for t in tickets if t.ticket_id == ticket.parent), None)
-                if parent_ticket:
+            ticket = tickets.get(ticket_id)
+
+            try:
+                unblocked = helpdesk.close_ticket(ticket_id)
+            except ValueError as error:
+                print(f" {error}")
+                parent_ticket = tickets.get(ticket.parent)
+                if ticket.status != "closed" and parent_ticket:
                     print(f"   Parent ticket {ticket.parent} status: {parent_ticket.status}")
+                continue
+
+            print(f" Ticket {ticket_id} closed successfully!")
+            if unblocked:
+                print(f"   Unblocked tickets: {', '.join(str(t.ticket_id) for t in unblocked)}")
 
         elif choice == "4":  # Undo feature
             print("\n UNDO LAST ACTION")
             print("-" * 30)
             
-            if undo_stack.is_empty():
+            if undo_history.is_empty():
                 print(" Nothing to undo.")
                 continue
                 
-            action = undo_stack.peek()
-            print(f"Last action: {action[0]} ticket {action[1].ticket_id}")
+            print(f"Last action: {undo_history.peek()}")
             
             confirm = input("Undo this action? (y/n): ").lower().strip()
             if confirm == 'y':
-                action = undo_stack.pop()
-                act, ticket = action
-                if act == "create":
-                    tickets.remove(ticket)
-                    # Remove from appropriate queue
-                    if ticket.priority == "high":
-                        try:
-                            priority_queue.queue.remove(ticket)
-                        except ValueError:
-                            pass
-                    else:
-                        try:
-                            normal_queue.queue.remove(ticket)
-                        except ValueError:
-                            pass
+                command = helpdesk.undo()
+                ticket = command.ticket
+                if command.name == "create":
                     print(f" Undo: Removed Ticket {ticket.ticket_id}")
-                elif act == "close":
-                    ticket.update_status("open")
+                elif command.name == "close":
                     print(f" Undo: Reopened Ticket {ticket.ticket_id}")
+                elif command.name == "assign_agent":
+                    print(f" Undo: Ticket {ticket.ticket_id} assigned back to {ticket.assigned_agent}")
             else:
                 print("Undo cancelled.")
 
         elif choice == "5":
-            generate_dashboard(tickets)
+            generate_dashboard(helpdesk.dashboard)
 
         elif choice == "6":
             print("\n TICKET HISTORY (Linked List)")
             print("-" * 40)
-            history.display()
+            if not len(history):
+                print("No tickets in history.")
+                continue
+            # Stream one page at a time instead of printing the whole list
+            entries = iter(history)
+            shown = 0
+            while True:
+                for ticket in islice(entries, HISTORY_PAGE_SIZE):
+                    print(ticket)
+                    shown += 1
+                if shown >= len(history):
+                    break
+                more = input(f"Showing {shown}/{len(history)}. Show more? (y/n): ").lower().strip()
+                if more != 'y':
+                    break
 
         elif choice == "7":
             print("\n ASSIGN AGENT TO TICKET")
@@ -207,31 +255,63 @@ def main():
                 continue
                 
             ticket_id = get_valid_ticket_id(tickets)
-            ticket = next((t for t in tickets if t.ticket_id == ticket_id), None)
             
-            if ticket.status == "closed":
+            if tickets.get(ticket_id).status == "closed":
                 print(f" Cannot assign agent to closed ticket {ticket_id}.")
                 continue
                 
-            agent = input("Enter agent name: ").strip()
-            if agent:
-                ticket.assign_agent(agent)
-                undo_stack.push(("assign_agent", ticket, ticket.assigned_agent))
-                print(f" Agent '{agent}' assigned to ticket {ticket_id}")
+            if helpdesk.assigner:
+                agent = input("Enter agent name (or press Enter for the least-loaded agent): ").strip()
             else:
-                print(" Agent name cannot be empty.")
+                agent = input("Enter agent name: ").strip()
+            try:
+                if agent or not helpdesk.assigner:
+                    helpdesk.assign_agent(ticket_id, agent)
+                elif helpdesk.assign_least_loaded(ticket_id) is None:
+                    print(" Every agent is at capacity.")
+                    continue
+                else:
+                    agent = tickets.get(ticket_id).assigned_agent
+            except ValueError as error:
+                print(f" {error}")
+                continue
+            print(f" Agent '{agent}' assigned to ticket {ticket_id}")
 
         elif choice == "8":
             print("\n QUEUE STATUS")
             print("-" * 20)
             print(f" Priority Queue: {priority_queue.size()} tickets")
-            print(f" Normal Queue: {normal_queue.size()} tickets")
-            print(f" Undo Stack: {len(undo_stack.stack)} actions")
+            for level, waiting in reversed(list(priority_queue.size_by_level().items())):
+                print(f"   {level.capitalize()}: {waiting} tickets")
+            print(f" In Progress: {helpdesk.dispatcher.in_progress()} tickets")
+            print(f" Undo Stack: {len(undo_history)} actions ({len(undo_history.redo_stack)} to redo)")
             
             if not priority_queue.is_empty():
-                print(f"\nNext high priority: {priority_queue.peek()}")
-            if not normal_queue.is_empty():
-                print(f"Next normal priority: {normal_queue.peek()}")
+                print(f"\nNext ticket: {priority_queue.peek()}")
+
+        elif choice == "9":
+            print("\n REDO LAST UNDONE ACTION")
+            print("-" * 30)
+            command = helpdesk.redo()
+            if command is None:
+                print(" Nothing to redo.")
+            else:
+                print(f" Redo: {command}")
+
+        elif choice == "10":
+            print("\n SEARCH TICKETS")
+            print("-" * 30)
+            query = input("Search for (end a word with * to match prefixes): ").strip()
+            if not query:
+                print(" Search query cannot be empty.")
+                continue
+            status = input("Status filter (open/closed, press Enter for any): ").lower().strip() or None
+            priority = input(f"Priority filter ({'/'.join(PRIORITY_LEVELS)}, press Enter for any): ").lower().strip() or None
+            results = helpdesk.search(query, status=status, priority=priority)
+            if not results:
+                print(" No matching tickets.")
+            for ticket, score in results:
+                print(f"  {score:5.2f}  {ticket}")
 
         elif choice == "0":
             print("\n Thank you for using the Help Desk Ticket System!")
@@ -241,9 +321,23 @@ def main():
             print("   • Functions & Loops (Week 3)")
             print("   • Linked Lists (Week 4)")
             print("   • Stacks & Queues (Week 5)")
+            if persistence:
+                persistence.close(helpdesk)
+            if metrics_file:
+                METRICS.write(metrics_file)
             break
         else:
-            print(" Invalid choice. Please enter a number between 0-8.")
+            print(" Invalid choice. Please enter a number between 0-10.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Interactive Help Desk Ticket System")
+    parser.add_argument("--data-dir", help="directory for the snapshot and write-ahead log (in-memory if omitted)")
+    parser.add_argument("--agent", dest="agents", action="append", type=parse_agent, default=[],
+                        metavar="NAME[:CAPACITY[:SKILLS]]",
+                        help="register an agent for automatic least-loaded assignment (repeatable)")
+    parser.add_argument("--link-duplicates", action="store_true",
+                        help="file near-duplicate tickets under the open original instead of asking")
+    parser.add_argument("--metrics-file", help="write Prometheus metrics to this file after every action")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    args = parser.parse_args()
+    main(args.data_dir, args.agents, args.link_duplicates, args.metrics_file, args.metrics_port)
\ No newline at end of file
@@ -0,0 +1,232 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds (seconds) of histogram buckets; +Inf is always added
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+WAIT_BUCKETS = (1, 10, 60, 300, 900, 3600, 4 * 3600, 24 * 3600, 72 * 3600, 7 * 24 * 3600)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# Monotonic count per label combination
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.values = {}  # label values tuple -> number
+
+    def inc(self, *label_values, amount=1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        # sorted() copies the dict in one step, so a writer adding a label set cannot break the loop
+        for label_values, value in sorted(self.values.items()):
+            yield self.name, _labels(self.labels, label_values), value
+
+
+# Value that can go up and down, e.g. queue depth
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, *label_values):
+        self.values[label_values] = value
+
+    def clear(self):
+        self.values.clear()
+
+
+# Distribution of observed values in cumulative buckets
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self.values = {}  # label values tuple -> [per-bucket counts (+Inf last), sum]
+
+    def observe(self, value, *label_values):
+        state = self.values.get(label_values)
+        if state is None:
+            state = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def time(self, *label_values):
+        return _Timer(self, label_values)
+
+    def samples(self):
+        for label_values, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float("inf"),), list(counts)):
+                cumulative += bucket
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                yield (f"{self.name}_bucket", _labels(self.labels + ("le",), label_values + (le,)),
+                       cumulative)
+            labels = _labels(self.labels, label_values)
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class _Timer:
+    __slots__ = ("histogram", "label_values", "start")
+
+    def __init__(self, histogram, label_values):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, *self.label_values)
+        return False
+
+
+# Shared do-nothing timer handed out while metrics are disabled
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+# Named metrics plus collectors that refresh gauges right before an export.
+# Instrumented code checks `enabled` first, so a disabled registry costs one attribute read.
+class MetricsRegistry:
+    def __init__(self):
+        self.enabled = False
+        self.metrics = {}  # name -> Counter / Gauge / Histogram, in registration order
+        self.collectors = []  # callables run before each render()
+        # One render at a time: scrapes come from server threads, file writes from the main loop.
+        # Collectors take the lock of the state they read (e.g. HelpDesk.lock).
+        self.lock = threading.Lock()
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, labels=()):
+        return self._register(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram, name, help_text, labels, buckets)
+
+    def timer(self, histogram, *label_values):
+        # `with METRICS.timer(OPERATION_SECONDS, "create"):` - free when disabled
+        return histogram.time(*label_values) if self.enabled else _NULL_TIMER
+
+    def add_collector(self, collect):
+        self.collectors.append(collect)
+
+    def reset(self):
+        # Forget every recorded value (tests, or a fresh process-wide start)
+        for metric in self.metrics.values():
+            metric.values.clear()
+        self.collectors.clear()
+
+    def render(self):
+        # Prometheus text exposition format
+        with self.lock:
+            for collect in self.collectors:
+                collect()
+            lines = []
+            for metric in self.metrics.values():
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                for name, labels, value in metric.samples():
+                    lines.append(f"{name}{labels} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        # Atomic replace, so a node_exporter textfile collector never reads half a file
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(self.render())
+        os.replace(temporary, path)
+
+    def _register(self, kind, name, help_text, labels, *args):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = kind(name, help_text, labels, *args)
+        elif type(metric) is not kind or metric.labels != tuple(labels):
+            raise ValueError(f"Metric {name} is already registered as a different {metric.kind}")
+        return metric
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def start_http_server(port, registry=None, host="127.0.0.1"):
+    # Serve GET /metrics from a daemon thread; returns the server (shutdown() stops it).
+    # http.server is imported here, as it is slow to import and most runs never serve metrics.
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    registry = registry or METRICS
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+METRICS = MetricsRegistry()
+
+# Help desk instruments; recorded only while METRICS.enabled is set
+OPERATION_SECONDS = METRICS.histogram(
+    "helpdesk_operation_seconds", "Time spent in help desk operations", ("operation",))
+TICKETS_CREATED = METRICS.counter(
+    "helpdesk_tickets_created_total", "Tickets created", ("priority",))
+TICKETS_CLOSED = METRICS.counter(
+    "helpdesk_tickets_closed_total", "Tickets closed, by assigned agent (throughput per agent)", ("agent",))
+UNDO_OPERATIONS = METRICS.counter(
+    "helpdesk_undo_operations_total", "Undo and redo operations applied", ("operation", "command"))
+QUEUE_ENQUEUED = METRICS.counter(
+    "helpdesk_queue_enqueued_total", "Tickets added to the scheduler", ("priority",))
+QUEUE_DEQUEUED = METRICS.counter(
+    "helpdesk_queue_dequeued_total", "Tickets taken from the scheduler", ("priority",))
+QUEUE_WAIT_SECONDS = METRICS.histogram(
+    "helpdesk_queue_wait_seconds", "Time from ticket creation to dequeue", ("priority",), WAIT_BUCKETS)
+QUEUE_DEPTH = METRICS.gauge(
+    "helpdesk_queue_depth", "Tickets waiting in the scheduler", ("priority",))
+TICKETS_IN_PROGRESS = METRICS.gauge(
+    "helpdesk_tickets_in_progress", "Tickets leased to a worker and not yet closed")
+OPEN_TICKETS = METRICS.gauge(
+    "helpdesk_open_tickets", "Open tickets, by assigned agent", ("agent",))
@@ -0,0 +1,194 @@
+import json
+import os
+from itertools import count
+
+from ticket import Ticket
+from helpdesk import HelpDesk
+from undo import command_from_record
+
+SNAPSHOT_FILE = "snapshot.json"
+WAL_FILE = "wal.jsonl"
+
+
+# Append-only JSON-lines log with group commit (one fsync per `sync_every` records)
+class WriteAheadLog:
+    def __init__(self, path, sync_every=64):
+        self.path = path
+        self.sync_every = sync_every
+        self.file = open(path, "a", encoding="utf-8")
+        self.pending = 0
+
+    def append(self, record):
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.pending += 1
+        if self.pending >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+
+    def truncate(self):
+        self.file.flush()
+        self.file.truncate(0)
+        self.sync()
+
+    def close(self):
+        self.sync()
+        self.file.close()
+
+
+def read_wal(path):
+    # Yields logged records, cutting off a torn last line left by a crash
+    if not os.path.exists(path):
+        return
+    good_end = 0
+    with open(path, "rb") as wal:
+        for line in wal:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            good_end += len(line)
+            yield record
+    if good_end < os.path.getsize(path):
+        with open(path, "r+b") as wal:
+            wal.truncate(good_end)
+
+
+# Snapshot + write-ahead log persistence for a HelpDesk
+class Persistence:
+    def __init__(self, directory, sync_every=64, snapshot_every=10000):
+        os.makedirs(directory, exist_ok=True)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.wal_path = os.path.join(directory, WAL_FILE)
+        self.sync_every = sync_every
+        self.snapshot_every = snapshot_every
+        self.lsn = 0  # sequence number of the last logged operation
+        self.since_snapshot = 0
+        self.wal = None
+
+    def load(self, helpdesk=None):
+        # Latest snapshot first, then only the log records written after it
+        helpdesk = helpdesk or HelpDesk()
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding="utf-8") as snapshot_file:
+                snapshot = json.load(snapshot_file)
+            restore_snapshot(helpdesk, snapshot)
+            self.lsn = snapshot["lsn"]
+
+        # Automatic assignments and duplicate links are already in the log, so replay them verbatim
+        auto_assign, helpdesk.auto_assign = helpdesk.auto_assign, False
+        link_duplicates, helpdesk.link_duplicates = helpdesk.link_duplicates, False
+        for record in read_wal(self.wal_path):
+            if record["lsn"] <= self.lsn:
+                continue
+            apply_record(helpdesk, record)
+            self.lsn = record["lsn"]
+            self.since_snapshot += 1
+        helpdesk.auto_assign = auto_assign
+        helpdesk.link_duplicates = link_duplicates
+
+        self.wal = WriteAheadLog(self.wal_path, self.sync_every)
+        helpdesk.journal = self
+        return helpdesk
+
+    def record(self, helpdesk, op, **fields):
+        self.lsn += 1
+        self.wal.append({"lsn": self.lsn, "op": op, **fields})
+        self.since_snapshot += 1
+        if self.snapshot_every and self.since_snapshot >= self.snapshot_every:
+            self.snapshot(helpdesk)
+
+    def snapshot(self, helpdesk):
+        self.wal.sync()
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as snapshot_file:
+            json.dump(take_snapshot(helpdesk, self.lsn), snapshot_file, separators=(",", ":"))
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        # Records up to self.lsn now live in the snapshot
+        self.wal.truncate()
+        self.since_snapshot = 0
+
+    def close(self, helpdesk=None):
+        if helpdesk is not None:
+            self.snapshot(helpdesk)
+        self.wal.close()
+
+
+def take_snapshot(helpdesk, lsn):
+    return {
+        "lsn": lsn,
+        "ticket_counter": helpdesk.ticket_counter,
+        # Every ticket ever created (undone ones stay in history), oldest first
+        "history": [ticket.to_record() for ticket in helpdesk.history],
+        "tickets": [ticket.ticket_id for ticket in helpdesk.tickets],
+        # Queued and leased tickets keep their level (aging included) and sequence, so the restored
+        # dispatcher hands out the same tickets in the same order; lease timeouts start over
+        "queue": [[entry[2].ticket_id, entry[0], entry[1]] for entry in helpdesk.priority_queue.entries.values()],
+        "leases": [[lease.ticket.ticket_id, lease.entry[0], lease.entry[1], lease.worker]
+                   for lease in helpdesk.dispatcher.leases.values()],
+        "sequence": next(helpdesk.priority_queue.counter),  # skipping one number is harmless
+        "undo": [command.to_record() for command in helpdesk.undo_history.undo_stack],
+        "redo": [command.to_record() for command in helpdesk.undo_history.redo_stack],
+    }
+
+
+def restore_snapshot(helpdesk, snapshot):
+    by_id = {}
+    for record in snapshot["history"]:
+        ticket = Ticket.from_record(record)
+        by_id[ticket.ticket_id] = ticket
+        helpdesk.history.append(ticket)
+    # Oldest update first so the dashboard's recent activity comes back in order
+    live = sorted((by_id[ticket_id] for ticket_id in snapshot["tickets"]), key=lambda t: t.updated_ts)
+    for ticket in live:
+        helpdesk.tickets.add(ticket)
+    helpdesk.priority_queue.counter = count(snapshot.get("sequence", 0))
+    for item in snapshot["queue"]:
+        if isinstance(item, int):  # older snapshots kept the queued ids only
+            helpdesk.priority_queue.enqueue(by_id[item])
+            continue
+        ticket_id, level, sequence = item
+        helpdesk.dispatcher.restore([level, sequence, by_id[ticket_id]])
+    for ticket_id, level, sequence, worker in snapshot.get("leases", ()):
+        helpdesk.dispatcher.restore([level, sequence, by_id[ticket_id]], worker)
+    for record in snapshot["undo"]:
+        helpdesk.undo_history.undo_stack.append(command_from_record(record, by_id))
+    for record in snapshot.get("redo", ()):
+        helpdesk.undo_history.redo_stack.append(command_from_record(record, by_id))
+    helpdesk.ticket_counter = snapshot["ticket_counter"]
+
+
+def apply_record(helpdesk, record):
+    op = record["op"]
+    if op == "create":
+        data = record["ticket"]
+        helpdesk.ticket_counter = data["ticket_id"]
+        ticket = helpdesk.create_ticket(data["title"], data["description"], data["priority"], data["parent"],
+                                        record.get("hold", False))
+        ticket.created_ts = data["created_at"]
+        ticket.updated_ts = data["updated_at"]
+        # SLA timers were set from the replay time when the ticket was added; restart them from its creation
+        helpdesk.sla.unwatch(ticket)
+        helpdesk.sla.watch(ticket)
+    elif op == "process":
+        # The logged ticket, not the current head: SLA aging on the replay clock can change the order
+        helpdesk.dispatcher.claim_ticket(record["ticket_id"], record.get("worker", "operator"))
+    elif op == "close":
+        helpdesk.close_ticket(record["ticket_id"])
+        helpdesk.get_ticket(record["ticket_id"]).updated_ts = record["at"]
+    elif op == "assign":
+        ticket = helpdesk.assign_agent(record["ticket_id"], record["agent"])
+        ticket.updated_ts = record["at"]
+    elif op == "undo":
+        helpdesk.undo()
+    elif op == "redo":
+        helpdesk.redo()
+    else:
+        raise ValueError(f"Unknown log operation: {op}")
@@ -0,0 +1,152 @@
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from store import TicketStore
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset("a an and are as at be by for from has in is it of on or the to was with".split())
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_PREFIX_TERMS = 16  # expansions of one "prefix*" term, most frequent first
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+# Inverted index over ticket titles and descriptions with BM25 ranking
+class SearchIndex:
+    def __init__(self, tickets=()):
+        self.postings = {}  # term -> (array of ticket ids, array of term frequencies)
+        self.terms = []  # sorted vocabulary, for prefix search
+        self.new_terms = []  # terms added since the last prefix search, merged into `terms` lazily
+        self.tickets = {}  # ticket_id -> Ticket, including removed ones until compaction
+        self.lengths = {}  # ticket_id -> number of tokens
+        self.removed = set()  # ids still present in postings but no longer searchable
+        self.total_length = 0  # tokens across searchable tickets
+        for ticket in tickets:
+            self.add(ticket)
+        if isinstance(tickets, TicketStore):
+            tickets.subscribe(self.on_store_event)
+
+    def on_store_event(self, event, ticket, old_value):
+        # Titles and descriptions never change, so only creates and removals matter;
+        # status, priority and agent filters read the live ticket
+        if event == "create":
+            self.add(ticket)
+        elif event == "remove":
+            self.remove(ticket.ticket_id)
+
+    def add(self, ticket):
+        ticket_id = ticket.ticket_id
+        if ticket_id in self.removed:
+            # Undone create being redone: its postings are still in place
+            self.removed.discard(ticket_id)
+            self.total_length += self.lengths[ticket_id]
+            return
+        if ticket_id in self.tickets:
+            raise ValueError(f"Ticket {ticket_id} is already indexed")
+        tokens = tokenize(f"{ticket.title} {ticket.description}")
+        self.tickets[ticket_id] = ticket
+        self.lengths[ticket_id] = len(tokens)
+        self.total_length += len(tokens)
+        for term, frequency in Counter(tokens).items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = (array("q"), array("H"))
+                self.new_terms.append(term)
+            posting[0].append(ticket_id)
+            posting[1].append(min(frequency, 0xFFFF))
+
+    def remove(self, ticket_id):
+        # Tombstone now, drop the postings once enough removals pile up
+        if ticket_id not in self.tickets or ticket_id in self.removed:
+            return False
+        self.removed.add(ticket_id)
+        self.total_length -= self.lengths[ticket_id]
+        if len(self.removed) > 1024 and len(self.removed) * 4 > len(self.tickets):
+            self.compact()
+        return True
+
+    def compact(self):
+        for term in list(self.postings):
+            ids, frequencies = self.postings[term]
+            keep = [i for i, ticket_id in enumerate(ids) if ticket_id not in self.removed]
+            if not keep:
+                del self.postings[term]
+            elif len(keep) < len(ids):
+                self.postings[term] = (array("q", (ids[i] for i in keep)),
+                                       array("H", (frequencies[i] for i in keep)))
+        self.terms = [term for term in self.sorted_terms() if term in self.postings]
+        for ticket_id in self.removed:
+            del self.tickets[ticket_id]
+            del self.lengths[ticket_id]
+        self.removed.clear()
+
+    def sorted_terms(self):
+        # One sort merges every term added since the last call (Timsort merges the two sorted runs),
+        # instead of an O(V) list insert per new term while indexing
+        if self.new_terms:
+            self.new_terms.sort()
+            self.terms.extend(self.new_terms)
+            self.terms.sort()
+            self.new_terms = []
+        return self.terms
+
+    def expand(self, prefix, limit=MAX_PREFIX_TERMS):
+        # Vocabulary terms starting with `prefix`, those in the most tickets first
+        terms = self.sorted_terms()
+        start = bisect_left(terms, prefix)
+        end = bisect_left(terms, prefix + "\uffff", start)
+        return heapq.nlargest(limit, terms[start:end], key=lambda term: len(self.postings[term][0]))
+
+    def search(self, query, status=None, priority=None, agent=None, limit=10):
+        # Returns [(ticket, score)], best first; a trailing "*" makes a term a prefix
+        query_terms = []
+        for word in query.lower().split():
+            if word.endswith("*"):
+                query_terms.extend(self.expand("".join(tokenize(word[:-1]))))
+            else:
+                query_terms.extend(tokenize(word))
+
+        documents = len(self.tickets) - len(self.removed)
+        if not documents:
+            return []
+        average_length = self.total_length / documents or 1.0
+        scores = {}
+        for term in set(query_terms):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            ids, frequencies = posting
+            df = len(ids)
+            idf = math.log(1 + (documents - df + 0.5) / (df + 0.5))
+            # BM25 denominator tf + k1 * (1 - b + b * length / average), split into constant and slope
+            norm = BM25_K1 * (1 - BM25_B)
+            slope = BM25_K1 * BM25_B / average_length
+            lengths = self.lengths
+            for ticket_id, tf in zip(ids, frequencies):
+                scores[ticket_id] = scores.get(ticket_id, 0.0) + idf * tf * (BM25_K1 + 1) / (
+                    tf + norm + slope * lengths[ticket_id])
+
+        matches = ((ticket_id, score) for ticket_id, score in scores.items()
+                   if ticket_id not in self.removed)
+        if status or priority or agent:
+            tickets = self.tickets
+            matches = ((ticket_id, score) for ticket_id, score in matches
+                       if _matches(tickets[ticket_id], status, priority, agent))
+        best = heapq.nlargest(limit, matches, key=lambda match: match[1])
+        return [(self.tickets[ticket_id], score) for ticket_id, score in best]
+
+    def __len__(self):
+        return len(self.tickets) - len(self.removed)
+
+
+def _matches(ticket, status, priority, agent):
+    return ((status is None or ticket.status == status)
+            and (priority is None or ticket.priority == priority)
+            and (agent is None or ticket.assigned_agent == agent))
@@ -0,0 +1,247 @@
+import argparse
+import asyncio
+import json
+import re
+from urllib.parse import parse_qs, urlsplit
+
+from helpdesk import HelpDesk
+from metrics import METRICS, CONTENT_TYPE
+
+MAX_BODY_BYTES = 1 << 20
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request",
+           404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Asyncio HTTP/JSON front-end: many agents share one HelpDesk
+class HelpDeskService:
+    def __init__(self, helpdesk=None):
+        self.helpdesk = helpdesk or HelpDesk()
+        # Claims hold this lock, so two agents can never be handed the same ticket
+        self.queue_lock = asyncio.Lock()
+        self.routes = [
+            ("POST", re.compile(r"^/tickets$"), self.create_ticket),
+            ("POST", re.compile(r"^/tickets/next$"), self.process_next),
+            ("GET", re.compile(r"^/tickets/(\d+)$"), self.get_ticket),
+            ("POST", re.compile(r"^/tickets/(\d+)/close$"), self.close_ticket),
+            ("POST", re.compile(r"^/tickets/(\d+)/assign$"), self.assign_agent),
+            ("POST", re.compile(r"^/undo$"), self.undo),
+            ("POST", re.compile(r"^/redo$"), self.redo),
+            ("GET", re.compile(r"^/dashboard$"), self.dashboard),
+            ("GET", re.compile(r"^/history$"), self.history),
+            ("GET", re.compile(r"^/search$"), self.search),
+            ("GET", re.compile(r"^/duplicates$"), self.duplicates),
+            ("GET", re.compile(r"^/queue$"), self.queue_status),
+            ("GET", re.compile(r"^/metrics$"), self.metrics),
+        ]
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=8080):
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle_connection(self, reader, writer):
+        # HTTP/1.1 with keep-alive: serve requests until the client hangs up
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = await _read_headers(reader)
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    await _write_response(writer, 413, {"error": "Request body too large"})
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self.dispatch(method, target, body)
+                await _write_response(writer, status, payload)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        matched_path = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(url.path)
+            if not match:
+                continue
+            matched_path = True
+            if route_method != method:
+                continue
+            try:
+                data = json.loads(body) if body else {}
+                if not isinstance(data, dict):
+                    raise HTTPError(400, "Request body must be a JSON object")
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                return await handler(data, query, *(int(group) for group in match.groups()))
+            except HTTPError as error:
+                return error.status, {"error": str(error)}
+            except (ValueError, TypeError, KeyError) as error:
+                return 400, {"error": str(error)}
+        if matched_path:
+            return 405, {"error": f"{method} not allowed on {url.path}"}
+        return 404, {"error": f"No route for {url.path}"}
+
+    async def create_ticket(self, data, query):
+        title = data.get("title")
+        if not isinstance(title, str) or not title.strip():
+            raise ValueError("Title cannot be empty.")
+        ticket = self.helpdesk.create_ticket(title, data.get("description", ""),
+                                             data.get("priority", "normal"), data.get("parent"),
+                                             bool(data.get("hold", False)))
+        return 201, ticket.to_record()
+
+    async def process_next(self, data, query):
+        async with self.queue_lock:
+            ticket = self.helpdesk.process_next()
+        if ticket is None:
+            return 204, None
+        return 200, ticket.to_record()
+
+    async def get_ticket(self, data, query, ticket_id):
+        ticket = self.helpdesk.tickets.get(ticket_id)
+        if ticket is None:
+            raise HTTPError(404, f"Ticket {ticket_id} does not exist.")
+        return 200, ticket.to_record()
+
+    async def close_ticket(self, data, query, ticket_id):
+        self._require(ticket_id)
+        unblocked = self.helpdesk.close_ticket(ticket_id)
+        return 200, {"ticket": self.helpdesk.tickets.get(ticket_id).to_record(),
+                     "unblocked": [ticket.ticket_id for ticket in unblocked]}
+
+    async def assign_agent(self, data, query, ticket_id):
+        self._require(ticket_id)
+        ticket = self.helpdesk.assign_agent(ticket_id, data.get("agent", ""))
+        return 200, ticket.to_record()
+
+    async def undo(self, data, query):
+        async with self.queue_lock:
+            command = self.helpdesk.undo()
+        if command is None:
+            raise HTTPError(400, "Nothing to undo.")
+        return 200, {"undone": command.name, "ticket_id": command.ticket.ticket_id}
+
+    async def redo(self, data, query):
+        async with self.queue_lock:
+            command = self.helpdesk.redo()
+        if command is None:
+            raise HTTPError(400, "Nothing to redo.")
+        return 200, {"redone": command.name, "ticket_id": command.ticket.ticket_id}
+
+    async def dashboard(self, data, query):
+        snapshot = self.helpdesk.dashboard.snapshot()
+        snapshot["recent"] = [ticket.to_record() for ticket in snapshot["recent"]]
+        return 200, snapshot
+
+    async def history(self, data, query):
+        offset = int(query.get("offset", 0))
+        limit = int(query.get("limit", 20))
+        page = self.helpdesk.history.slice(offset, limit, reverse=query.get("order") == "latest")
+        return 200, {"total": len(self.helpdesk.history), "tickets": [t.to_record() for t in page]}
+
+    async def search(self, data, query):
+        if not query.get("q"):
+            raise HTTPError(400, "Missing search query 'q'.")
+        results = self.helpdesk.search(query["q"], query.get("status"), query.get("priority"),
+                                       query.get("agent"), int(query.get("limit", 10)))
+        return 200, {"results": [{"score": round(score, 4), **ticket.to_record()} for ticket, score in results]}
+
+    async def duplicates(self, data, query):
+        matches = self.helpdesk.find_duplicates(query.get("title", ""), query.get("description", ""))
+        return 200, {"matches": [{"similarity": round(score, 3), **ticket.to_record()} for ticket, score in matches]}
+
+    async def queue_status(self, data, query):
+        queue = self.helpdesk.priority_queue
+        return 200, {"size": queue.size(), "levels": queue.size_by_level()}
+
+    async def metrics(self, data, query):
+        # Prometheus text format; counters and histograms only fill up while METRICS.enabled
+        self.helpdesk.collect_metrics()
+        return 200, METRICS.render()
+
+    def _require(self, ticket_id):
+        if ticket_id not in self.helpdesk.tickets:
+            raise HTTPError(404, f"Ticket {ticket_id} does not exist.")
+
+
+async def _read_headers(reader):
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            return headers
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _write_response(writer, status, payload):
+    # Text payloads (the metrics page) go out as they are; everything else as JSON
+    if isinstance(payload, str):
+        body, content_type = payload.encode(), CONTENT_TYPE
+    else:
+        body, content_type = b"" if payload is None else json.dumps(payload).encode(), "application/json"
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+async def http_request(reader, writer, method, path, payload=None):
+    # Minimal keep-alive JSON client, shared by the tests and loadgen.py
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: helpdesk\r\n"
+                  f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = await _read_headers(reader)
+    length = int(headers.get("content-length", 0))
+    data = await reader.readexactly(length) if length else b""
+    if not headers.get("content-type", "").startswith("application/json"):
+        return status, data.decode()
+    return status, (json.loads(data) if data else None)
+
+
+async def serve(host, port, data_dir=None, metrics=False):
+    METRICS.enabled = metrics
+    persistence = None
+    if data_dir:
+        from persistence import Persistence
+        persistence = Persistence(data_dir)
+        service = HelpDeskService(persistence.load())
+    else:
+        service = HelpDeskService()
+    host, port = await service.start(host, port)
+    print(f" Help desk service listening on http://{host}:{port}")
+    try:
+        await service.server.serve_forever()
+    finally:
+        if persistence:
+            persistence.close(service.helpdesk)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Help Desk Ticket System JSON service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data-dir", help="directory for the snapshot and write-ahead log (in-memory if omitted)")
+    parser.add_argument("--metrics", action="store_true", help="record hot-path metrics for GET /metrics")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.data_dir, args.metrics))
+    except KeyboardInterrupt:
+        print("\n Service stopped.")
@@ -0,0 +1,291 @@
+import multiprocessing
+from bisect import bisect
+from hashlib import blake2b
+
+from ticket import Ticket, PRIORITY_LEVELS
+from helpdesk import HelpDesk
+from dashboard import RECENT_ACTIVITY_LIMIT
+
+VIRTUAL_NODES = 64  # ring points per shard; more points even out the share of each shard
+
+
+def _hash(data):
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), "big")
+
+
+# Consistent hash ring: adding a shard only takes over the ticket ids between its points
+# and their predecessors, so about 1/N of the tickets move and none move between old shards
+class HashRing:
+    def __init__(self, shards=(), replicas=VIRTUAL_NODES):
+        self.replicas = replicas
+        self.points = []  # sorted ring positions
+        self.owners = {}  # ring position -> shard name
+        for shard in shards:
+            self.add(shard)
+
+    def add(self, shard):
+        if shard in self.owners.values():
+            raise ValueError(f"Shard {shard} is already on the ring")
+        for replica in range(self.replicas):
+            point = _hash(f"{shard}#{replica}".encode())
+            self.owners[point] = shard
+        self.points = sorted(self.owners)
+
+    def remove(self, shard):
+        self.owners = {point: owner for point, owner in self.owners.items() if owner != shard}
+        self.points = sorted(self.owners)
+
+    def owner(self, ticket_id):
+        if not self.points:
+            raise ValueError("No shards on the ring")
+        position = bisect(self.points, _hash(ticket_id.to_bytes(8, "big", signed=True)))
+        return self.owners[self.points[position % len(self.points)]]
+
+    def shards(self):
+        return sorted(set(self.owners.values()))
+
+
+# One shard's state, living in its own worker process; the router talks to it through a pipe.
+# Tickets cross the pipe as records. Parents may live on other shards: the router checks
+# them, and locally a missing parent counts as resolved, as in DependencyGraph.
+class Shard:
+    def __init__(self):
+        # Undo is per help desk, not per shard, so shards keep no undo history
+        self.helpdesk = HelpDesk(undo_capacity=0)
+
+    def create(self, ticket_id, title, description, priority, parent):
+        ticket = Ticket(ticket_id, title, description, priority, parent)
+        self.helpdesk.import_batch([ticket])
+        return ticket.to_record()
+
+    def get(self, ticket_id):
+        ticket = self.helpdesk.tickets.get(ticket_id)
+        return ticket.to_record() if ticket else None
+
+    def close(self, ticket_id):
+        return [ticket.ticket_id for ticket in self.helpdesk.close_ticket(ticket_id)]
+
+    def assign(self, ticket_id, agent):
+        return self.helpdesk.assign_agent(ticket_id, agent).to_record()
+
+    def ancestry(self, ticket_id, include_self):
+        # Walks the local part of the parent chain: (all closed so far, foreign parent to check next)
+        ticket = self.helpdesk.tickets.get(ticket_id)
+        if ticket is None:
+            return True, None
+        if include_self and ticket.status != "closed":
+            return False, None
+        while ticket.parent is not None:
+            parent = self.helpdesk.tickets.get(ticket.parent)
+            if parent is None:
+                return True, ticket.parent
+            if parent.status != "closed":
+                return False, None
+            ticket = parent
+        return True, None
+
+    def unblocked_by(self, ticket_id):
+        # Local tickets unblocked by closing ticket_id, which may live on another shard
+        return [ticket.ticket_id for ticket in self.helpdesk.dependencies.unblocked_by(ticket_id)]
+
+    def peek(self):
+        # (level rank, created_ts, ticket_id) of the next ticket, for the router to compare shards
+        self.helpdesk.sla.poll()
+        ticket = self.helpdesk.priority_queue.peek()
+        if ticket is None:
+            return None
+        level = self.helpdesk.priority_queue.level_of(ticket.ticket_id)
+        return PRIORITY_LEVELS.index(level), ticket.created_ts, ticket.ticket_id
+
+    def process_next(self, worker):
+        ticket = self.helpdesk.process_next(worker)
+        return ticket.to_record() if ticket else None
+
+    def snapshot(self):
+        snapshot = self.helpdesk.dashboard.snapshot()
+        snapshot["recent"] = [ticket.to_record() for ticket in snapshot["recent"]]
+        return snapshot
+
+    def size(self):
+        return len(self.helpdesk.tickets)
+
+    def hand_over(self, shards, replicas, name):
+        # Give up the tickets that `name` owns on the new ring, oldest first so parents go first.
+        # Each goes as (record, queue level, worker): a leased ticket stays leased and a queued
+        # one keeps its level, aging included; both are None for a closed or held ticket.
+        ring = HashRing(shards, replicas)
+        moving = sorted(t.ticket_id for t in self.helpdesk.tickets if ring.owner(t.ticket_id) == name)
+        handed = []
+        for ticket_id in moving:
+            entry, worker = self.helpdesk.dispatcher.take(ticket_id) or (None, None)
+            handed.append((self.helpdesk.tickets.get(ticket_id).to_record(), entry and entry[0], worker))
+            self.helpdesk.tickets.remove(ticket_id)
+        return handed
+
+    def take_over(self, handed):
+        # Tickets from every old shard in one batch, in id (creation) order, so the sequence
+        # numbers given here keep them FIFO within a level. SLA timers restart from creation.
+        tickets = [Ticket.from_record(record) for record, _, _ in handed]
+        self.helpdesk.import_batch(tickets, queued=False)
+        counter = self.helpdesk.priority_queue.counter
+        for ticket, (_, level, worker) in zip(tickets, handed):
+            if level is not None:
+                self.helpdesk.dispatcher.restore([level, next(counter), ticket], worker)
+        return len(tickets)
+
+
+def _serve_shard(connection):
+    shard = Shard()
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        method, args = message
+        try:
+            connection.send((True, getattr(shard, method)(*args)))
+        except (ValueError, KeyError) as error:
+            connection.send((False, str(error)))
+    connection.close()
+
+
+# Help desk split across local worker processes by consistent hashing of ticket_id.
+# Ticket ids come from the router, so they stay unique and ascending across shards.
+class ShardedHelpDesk:
+    def __init__(self, shards=4, replicas=VIRTUAL_NODES):
+        self.ring = HashRing(replicas=replicas)
+        self.connections = {}  # shard name -> pipe to its worker
+        self.processes = {}
+        self.ticket_counter = 1
+        self.recent_limit = RECENT_ACTIVITY_LIMIT
+        for _ in range(shards):
+            self._start_shard()
+
+    def create_ticket(self, title, description="", priority="normal", parent=None):
+        if parent is not None and self._call(self.ring.owner(parent), "get", parent) is None:
+            raise ValueError(f"Parent ticket {parent} does not exist.")
+        ticket_id = self.ticket_counter
+        record = self._call(self.ring.owner(ticket_id), "create", ticket_id, title, description, priority, parent)
+        self.ticket_counter += 1
+        return Ticket.from_record(record)
+
+    def get_ticket(self, ticket_id):
+        record = self._call(self.ring.owner(ticket_id), "get", ticket_id)
+        if record is None:
+            raise ValueError(f"Ticket {ticket_id} does not exist.")
+        return Ticket.from_record(record)
+
+    def can_close(self, ticket_id):
+        # Follow the parent chain shard by shard; each hop walks as far as it can locally
+        resolved, foreign = self._call(self.ring.owner(ticket_id), "ancestry", ticket_id, False)
+        while resolved and foreign is not None:
+            resolved, foreign = self._call(self.ring.owner(foreign), "ancestry", foreign, True)
+        return resolved
+
+    def close_ticket(self, ticket_id):
+        # Returns the tickets this close unblocks, from every shard
+        ticket = self.get_ticket(ticket_id)
+        if ticket.status == "closed":
+            raise ValueError(f"Ticket {ticket_id} is already closed.")
+        if not self.can_close(ticket_id):
+            raise ValueError("Cannot close ticket until parent is resolved.")
+        owner = self.ring.owner(ticket_id)
+        unblocked = set(self._call(owner, "close", ticket_id))
+        for shard, ids in self._broadcast("unblocked_by", ticket_id).items():
+            if shard != owner:
+                unblocked.update(ids)
+        return [self.get_ticket(unblocked_id) for unblocked_id in sorted(unblocked)]
+
+    def assign_agent(self, ticket_id, agent):
+        return Ticket.from_record(self._call(self.ring.owner(ticket_id), "assign", ticket_id, agent))
+
+    def process_next(self, worker="operator"):
+        # The most urgent, then oldest, head among the shard queues
+        heads = [(head[0], -head[1], shard) for shard, head in self._broadcast("peek").items() if head]
+        if not heads:
+            return None
+        record = self._call(max(heads)[2], "process_next", worker)
+        return Ticket.from_record(record) if record else None
+
+    def snapshot(self):
+        # Dashboard aggregates summed over every shard, in DashboardAggregator.snapshot() form
+        merged = {"total": 0, "status": {}, "priority": {level: 0 for level in PRIORITY_LEVELS},
+                  "agents": {}, "recent": []}
+        for snapshot in self._broadcast("snapshot").values():
+            merged["total"] += snapshot["total"]
+            for field in ("status", "priority"):
+                for key, count in snapshot[field].items():
+                    merged[field][key] = merged[field].get(key, 0) + count
+            for agent, stats in snapshot["agents"].items():
+                totals = merged["agents"].setdefault(agent, {"open": 0, "closed": 0})
+                totals["open"] += stats["open"]
+                totals["closed"] += stats["closed"]
+            merged["recent"].extend(snapshot["recent"])
+            if "sla" in snapshot:
+                sla = merged.setdefault("sla", {"breached": 0, "open_breached": {}, "watching": 0, "escalations": 0})
+                for field in ("breached", "watching", "escalations"):
+                    sla[field] += snapshot["sla"][field]
+                for level, count in snapshot["sla"]["open_breached"].items():
+                    sla["open_breached"][level] = sla["open_breached"].get(level, 0) + count
+        merged["recent"].sort(key=lambda record: record["updated_at"], reverse=True)
+        merged["recent"] = [Ticket.from_record(record) for record in merged["recent"][:self.recent_limit]]
+        return merged
+
+    def sizes(self):
+        return self._broadcast("size")
+
+    def add_shard(self):
+        # Start a worker and move to it exactly the tickets the new ring assigns to it;
+        # returns how many moved
+        name = self._start_shard()
+        shards, replicas = self.ring.shards(), self.ring.replicas
+        handed = []
+        for shard, tickets in self._broadcast("hand_over", shards, replicas, name).items():
+            if shard != name:
+                handed.extend(tickets)
+        handed.sort(key=lambda item: item[0]["ticket_id"])
+        return self._call(name, "take_over", handed) if handed else 0
+
+    def close(self):
+        for connection in self.connections.values():
+            connection.send(None)
+        for process in self.processes.values():
+            process.join()
+        self.connections.clear()
+        self.processes.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _start_shard(self):
+        name = f"shard-{len(self.processes)}"
+        router_end, worker_end = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_serve_shard, args=(worker_end,), daemon=True)
+        process.start()
+        worker_end.close()
+        self.connections[name] = router_end
+        self.processes[name] = process
+        self.ring.add(name)
+        return name
+
+    def _call(self, shard, method, *args):
+        connection = self.connections[shard]
+        connection.send((method, args))
+        return _result(connection.recv())
+
+    def _broadcast(self, method, *args):
+        # Every shard works on the request at the same time: send all, then collect every
+        # reply before raising, so no pipe is left with an unread answer
+        for connection in self.connections.values():
+            connection.send((method, args))
+        replies = {shard: connection.recv() for shard, connection in self.connections.items()}
+        return {shard: _result(reply) for shard, reply in replies.items()}
+
+
+def _result(reply):
+    ok, value = reply
+    if not ok:
+        raise ValueError(value)
+    return value
@@ -0,0 +1,95 @@
+import time
+
+from ticket import PRIORITY_LEVELS
+from data_structures import TimerWheel
+from store import TicketStore
+
+HOUR = 60 * 60
+
+# Time to resolve a ticket, by priority
+SLA_TARGETS = {"low": 72 * HOUR, "normal": 24 * HOUR, "high": 4 * HOUR, "critical": 1 * HOUR}
+AGING_FRACTION = 0.5  # a ticket still queued after this share of its SLA moves up one level
+
+
+# SLA deadlines and queue aging, driven by a hierarchical timer wheel
+class SLAMonitor:
+    def __init__(self, tickets=(), dispatcher=None, targets=SLA_TARGETS, clock=time.time, tick=1.0):
+        self.dispatcher = dispatcher  # queued tickets are promoted through it, if given
+        self.targets = targets
+        self.clock = clock
+        self.wheel = TimerWheel(tick=tick, start=clock())
+        self.timers = {}  # ticket_id -> (aging timer, deadline timer)
+        self.breached = {}  # ticket_id -> Ticket, every ticket that missed its deadline
+        self.open_breaches = {level: 0 for level in PRIORITY_LEVELS}
+        self.escalations = 0  # promotions caused by aging or a missed deadline
+        for ticket in tickets:
+            self.watch(ticket)
+        if isinstance(tickets, TicketStore):
+            tickets.subscribe(self.on_store_event)
+
+    def deadline(self, ticket):
+        return ticket.created_ts + self.targets[ticket.priority]
+
+    def on_store_event(self, event, ticket, old_value):
+        if event == "create":
+            self.watch(ticket)
+        elif event == "remove":
+            self.unwatch(ticket)
+            if self.breached.pop(ticket.ticket_id, None) is not None and ticket.status == "open":
+                self.open_breaches[ticket.priority] -= 1
+        elif event == "status":
+            if ticket.ticket_id in self.breached:
+                self.open_breaches[ticket.priority] += 1 if ticket.status == "open" else -1
+            elif ticket.status == "open":
+                self.watch(ticket)
+            else:
+                self.unwatch(ticket)
+
+    def watch(self, ticket):
+        if ticket.status != "open" or ticket.ticket_id in self.timers or ticket.ticket_id in self.breached:
+            return
+        target = self.targets[ticket.priority]
+        self.timers[ticket.ticket_id] = (
+            self.wheel.schedule(ticket.created_ts + target * AGING_FRACTION, ("age", ticket)),
+            self.wheel.schedule(ticket.created_ts + target, ("deadline", ticket)),
+        )
+
+    def unwatch(self, ticket):
+        timers = self.timers.pop(ticket.ticket_id, None)
+        if timers:
+            for timer in timers:
+                timer.cancel()
+
+    def poll(self, now=None):
+        # Fire every timer that expired by `now`; returns the tickets that breached
+        breached = []
+        for kind, ticket in self.wheel.advance(self.clock() if now is None else now):
+            if kind == "age":
+                self._promote(ticket, 1)
+                continue
+            self.timers.pop(ticket.ticket_id, None)
+            self.breached[ticket.ticket_id] = ticket
+            self.open_breaches[ticket.priority] += 1
+            breached.append(ticket)
+            self._promote(ticket, len(PRIORITY_LEVELS))
+        return breached
+
+    def summary(self, now=None):
+        self.poll(now)
+        return {
+            "breached": len(self.breached),
+            "open_breached": {level: n for level, n in self.open_breaches.items() if n},
+            "watching": len(self.timers),
+            "escalations": self.escalations,
+        }
+
+    def _promote(self, ticket, steps):
+        if self.dispatcher is None:
+            return
+        if self.dispatcher.level_of(ticket.ticket_id) is None:
+            return
+        # Counted from the ticket's own priority, so a timer that fires again after a restart
+        # (the queue level was restored with the aging already applied) promotes nothing twice
+        target = PRIORITY_LEVELS[min(PRIORITY_LEVELS.index(ticket.priority) + steps, len(PRIORITY_LEVELS) - 1)]
+        if self.dispatcher.promote(ticket.ticket_id, target):
+            self.escalations += 1
@@ -0,0 +1,226 @@
+import sqlite3
+import time
+from itertools import islice
+
+from ticket import Ticket, PRIORITY_LEVELS, STATUS_NAMES
+
+IMPORT_BATCH_SIZE = 10_000
+
+TICKET_COLUMNS = ("ticket_id", "title", "description", "priority", "status",
+                  "parent", "assigned_agent", "created_at", "updated_at")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    ticket_id      INTEGER PRIMARY KEY,
+    title          TEXT NOT NULL,
+    description    TEXT NOT NULL DEFAULT '',
+    priority       TEXT NOT NULL DEFAULT 'normal',
+    status         TEXT NOT NULL DEFAULT 'open',
+    parent         INTEGER,
+    assigned_agent TEXT NOT NULL DEFAULT 'Unassigned',
+    created_at     REAL NOT NULL,
+    updated_at     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets (status);
+CREATE INDEX IF NOT EXISTS idx_tickets_priority ON tickets (priority);
+CREATE INDEX IF NOT EXISTS idx_tickets_agent_status ON tickets (assigned_agent, status);
+CREATE INDEX IF NOT EXISTS idx_tickets_parent ON tickets (parent);
+CREATE INDEX IF NOT EXISTS idx_tickets_updated ON tickets (updated_at);
+CREATE TABLE IF NOT EXISTS queue (
+    ticket_id INTEGER PRIMARY KEY,
+    level     INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_queue_order ON queue (level DESC, ticket_id);
+"""
+
+# Statements are kept as constants so sqlite3's per-connection cache
+# compiles each one once and reuses the prepared statement afterwards
+INSERT_TICKET = (f"INSERT INTO tickets ({', '.join(TICKET_COLUMNS)}) "
+                 f"VALUES ({', '.join('?' for _ in TICKET_COLUMNS)})")
+SELECT_TICKET = f"SELECT {', '.join(TICKET_COLUMNS)} FROM tickets WHERE ticket_id = ?"
+SELECT_BY_STATUS = f"SELECT {', '.join(TICKET_COLUMNS)} FROM tickets WHERE status = ? ORDER BY ticket_id"
+SELECT_BY_AGENT = f"SELECT {', '.join(TICKET_COLUMNS)} FROM tickets WHERE assigned_agent = ? ORDER BY ticket_id"
+SELECT_CHILDREN = f"SELECT {', '.join(TICKET_COLUMNS)} FROM tickets WHERE parent = ? ORDER BY ticket_id"
+SELECT_PARENT_STATUS = "SELECT parent, status FROM tickets WHERE ticket_id = ?"
+SELECT_RECENT = f"SELECT {', '.join(TICKET_COLUMNS)} FROM tickets ORDER BY updated_at DESC LIMIT ?"
+UPDATE_STATUS = "UPDATE tickets SET status = ?, updated_at = ? WHERE ticket_id = ?"
+UPDATE_AGENT = "UPDATE tickets SET assigned_agent = ?, updated_at = ? WHERE ticket_id = ?"
+DELETE_TICKET = "DELETE FROM tickets WHERE ticket_id = ?"
+SELECT_NEXT_ID = "SELECT COALESCE(MAX(ticket_id), 0) + 1 FROM tickets"
+SELECT_PAGE = f"SELECT {', '.join(TICKET_COLUMNS)} FROM tickets ORDER BY ticket_id LIMIT ? OFFSET ?"
+SELECT_PAGE_LATEST = f"SELECT {', '.join(TICKET_COLUMNS)} FROM tickets ORDER BY ticket_id DESC LIMIT ? OFFSET ?"
+ENQUEUE = "INSERT INTO queue (ticket_id, level) VALUES (?, ?)"
+SELECT_QUEUE_HEAD = "SELECT ticket_id FROM queue ORDER BY level DESC, ticket_id LIMIT 1"
+DEQUEUE = "DELETE FROM queue WHERE ticket_id = ?"
+COUNT_BY_STATUS = "SELECT status, COUNT(*) FROM tickets GROUP BY status"
+COUNT_BY_PRIORITY = "SELECT priority, COUNT(*) FROM tickets GROUP BY priority"
+COUNT_BY_AGENT = ("SELECT assigned_agent, SUM(status = 'open'), SUM(status != 'open') "
+                  "FROM tickets GROUP BY assigned_agent")
+
+
+# SQLite-backed ticket repository, an on-disk alternative to TicketStore.
+# The queue table is its scheduler: most urgent level first, then oldest ticket id,
+# as PriorityQueue orders them, so the next ticket is one index lookup.
+class SQLiteTicketRepository:
+    def __init__(self, path="helpdesk.db"):
+        self.connection = sqlite3.connect(path, cached_statements=256)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def create(self, ticket, queued=False):
+        with self.connection:
+            self.connection.execute(INSERT_TICKET, _row(ticket.to_record()))
+            if queued:
+                self.connection.execute(ENQUEUE, (ticket.ticket_id, _LEVELS[ticket.priority]))
+        return ticket
+
+    def next_ticket_id(self):
+        return self.connection.execute(SELECT_NEXT_ID).fetchone()[0]
+
+    def dequeue(self):
+        # The next ticket to work on, taken off the queue; None when the queue is empty
+        with self.connection:
+            row = self.connection.execute(SELECT_QUEUE_HEAD).fetchone()
+            if row is None:
+                return None
+            self.connection.execute(DEQUEUE, row)
+        return self.get(row[0])
+
+    def page(self, offset=0, limit=20, reverse=False):
+        # Tickets in creation order (newest first with reverse), like LinkedList.slice
+        query = SELECT_PAGE_LATEST if reverse else SELECT_PAGE
+        return [_ticket(row) for row in self.connection.execute(query, (limit, offset))]
+
+    def get(self, ticket_id):
+        row = self.connection.execute(SELECT_TICKET, (ticket_id,)).fetchone()
+        return _ticket(row) if row else None
+
+    def update_status(self, ticket_id, new_status):
+        # A closed ticket also leaves the queue
+        with self.connection:
+            cursor = self.connection.execute(UPDATE_STATUS, (new_status, time.time(), ticket_id))
+            if new_status == "closed":
+                self.connection.execute(DEQUEUE, (ticket_id,))
+        return cursor.rowcount == 1
+
+    def assign_agent(self, ticket_id, agent_name):
+        with self.connection:
+            cursor = self.connection.execute(UPDATE_AGENT, (agent_name, time.time(), ticket_id))
+        return cursor.rowcount == 1
+
+    def remove(self, ticket_id):
+        with self.connection:
+            cursor = self.connection.execute(DELETE_TICKET, (ticket_id,))
+            self.connection.execute(DEQUEUE, (ticket_id,))
+        return cursor.rowcount == 1
+
+    def by_status(self, status):
+        return [_ticket(row) for row in self.connection.execute(SELECT_BY_STATUS, (status,))]
+
+    def by_agent(self, agent_name):
+        return [_ticket(row) for row in self.connection.execute(SELECT_BY_AGENT, (agent_name,))]
+
+    def children(self, ticket_id):
+        return [_ticket(row) for row in self.connection.execute(SELECT_CHILDREN, (ticket_id,))]
+
+    def get_parent(self, ticket_id):
+        row = self.connection.execute(SELECT_PARENT_STATUS, (ticket_id,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return self.get(row[0])
+
+    def ancestors_closed(self, ticket_id):
+        # Same rule as DependencyGraph: every ticket up the parent chain is closed
+        seen = {ticket_id}
+        row = self.connection.execute(SELECT_PARENT_STATUS, (ticket_id,)).fetchone()
+        parent_id = row[0] if row else None
+        while parent_id is not None:
+            row = self.connection.execute(SELECT_PARENT_STATUS, (parent_id,)).fetchone()
+            if row is None:
+                return True
+            if row[1] != "closed" or parent_id in seen:
+                return False
+            seen.add(parent_id)
+            parent_id = row[0]
+        return True
+
+    def bulk_insert(self, records, batch_size=IMPORT_BATCH_SIZE):
+        # executemany in fixed-size batches, one transaction per batch; open tickets are queued,
+        # as HelpDesk.import_batch does
+        rows = (_row(record) for record in records)
+        inserted = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return inserted
+            with self.connection:
+                self.connection.executemany(INSERT_TICKET, batch)
+                self.connection.executemany(ENQUEUE, ((row[0], _LEVELS[row[3]])
+                                                      for row in batch if row[4] == "open"))
+            inserted += len(batch)
+
+    def import_file(self, path, batch_size=IMPORT_BATCH_SIZE):
+        # Ticket dumps as CSV (header row) or JSON lines, one ticket per line.
+        # csv and json are imported here, so a cli.py command does not pay for them.
+        import csv
+        import json
+        with open(path, newline="", encoding="utf-8") as dump:
+            if path.endswith(".csv"):
+                records = csv.DictReader(dump)
+            else:
+                records = (json.loads(line) for line in dump if line.strip())
+            return self.bulk_insert(records, batch_size)
+
+    def snapshot(self, recent_limit=5):
+        # Same shape as DashboardAggregator.snapshot(), computed with GROUP BY
+        status = dict(self.connection.execute(COUNT_BY_STATUS))
+        priority = {level: 0 for level in PRIORITY_LEVELS}
+        priority.update(self.connection.execute(COUNT_BY_PRIORITY))
+        agents = {agent: {"open": open_count, "closed": closed_count}
+                  for agent, open_count, closed_count in self.connection.execute(COUNT_BY_AGENT)}
+        recent = [_ticket(row) for row in self.connection.execute(SELECT_RECENT, (recent_limit,))]
+        return {
+            "total": sum(status.values()),
+            "status": status,
+            "priority": priority,
+            "agents": agents,
+            "recent": recent,
+        }
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+
+_LEVELS = {level: rank for rank, level in enumerate(PRIORITY_LEVELS)}
+
+
+def _row(record):
+    now = time.time()
+    parent = record.get("parent")
+    return (
+        int(record["ticket_id"]),
+        record["title"],
+        record.get("description") or "",
+        _name(record.get("priority") or "normal", PRIORITY_LEVELS, "priority"),
+        _name(record.get("status") or "open", STATUS_NAMES, "status"),
+        int(parent) if parent not in (None, "") else None,
+        record.get("assigned_agent") or "Unassigned",
+        float(record.get("created_at") or now),
+        float(record.get("updated_at") or now),
+    )
+
+
+def _name(value, names, kind):
+    # Dump cells may differ in case or padding; anything else Ticket would reject is rejected here
+    name = value.strip().lower() if isinstance(value, str) else value
+    if name not in names:
+        raise ValueError(f"Unknown {kind}: {value}")
+    return name
+
+
+def _ticket(row):
+    return Ticket.from_record(dict(zip(TICKET_COLUMNS, row)))
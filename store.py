@@ -0,0 +1,84 @@
+# Fields with a secondary index: value -> tickets having that value
+INDEXED_FIELDS = ("status", "priority", "assigned_agent")
+
+# Event name sent to listeners when an indexed field changes
+FIELD_EVENTS = {"status": "status", "priority": "priority", "assigned_agent": "assign"}
+
+
+# Ticket store with O(1) lookup by ID and secondary indexes
+class TicketStore:
+    def __init__(self, tickets=()):
+        self.tickets = {}  # ticket_id -> Ticket, in creation order
+        self.indexes = {field: {} for field in INDEXED_FIELDS}
+        self.listeners = []  # callables: listener(event, ticket, old_value)
+        for ticket in tickets:
+            self.add(ticket)
+
+    def add(self, ticket):
+        if ticket.ticket_id in self.tickets:
+            raise ValueError(f"Ticket {ticket.ticket_id} already exists")
+        self.tickets[ticket.ticket_id] = ticket
+        for field in INDEXED_FIELDS:
+            self._index(field, getattr(ticket, field), ticket)
+        # Ticket.update_status / assign_agent call back into reindex()
+        ticket.store = self
+        self._notify("create", ticket)
+
+    def remove(self, ticket_id):
+        ticket = self.tickets.pop(ticket_id, None)
+        if ticket is None:
+            return None
+        for field in INDEXED_FIELDS:
+            self._unindex(field, getattr(ticket, field), ticket)
+        ticket.store = None
+        self._notify("remove", ticket)
+        return ticket
+
+    def get(self, ticket_id):
+        return self.tickets.get(ticket_id)
+
+    def reindex(self, ticket, field, old_value):
+        self._unindex(field, old_value, ticket)
+        self._index(field, getattr(ticket, field), ticket)
+        self._notify(FIELD_EVENTS[field], ticket, old_value)
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def _notify(self, event, ticket, old_value=None):
+        for listener in self.listeners:
+            listener(event, ticket, old_value)
+
+    def find(self, field, value):
+        return list(self.indexes[field].get(value, {}).values())
+
+    def by_status(self, status):
+        return self.find("status", status)
+
+    def by_priority(self, priority):
+        return self.find("priority", priority)
+
+    def by_agent(self, agent_name):
+        return self.find("assigned_agent", agent_name)
+
+    def count_by(self, field):
+        return {value: len(bucket) for value, bucket in self.indexes[field].items()}
+
+    def _index(self, field, value, ticket):
+        self.indexes[field].setdefault(value, {})[ticket.ticket_id] = ticket
+
+    def _unindex(self, field, value, ticket):
+        bucket = self.indexes[field].get(value)
+        if bucket is not None:
+            bucket.pop(ticket.ticket_id, None)
+            if not bucket:
+                del self.indexes[field][value]
+
+    def __contains__(self, ticket_id):
+        return ticket_id in self.tickets
+
+    def __len__(self):
+        return len(self.tickets)
+
+    def __iter__(self):
+        return iter(self.tickets.values())
@@ -4,9 +4,29 @@ Test script for the Help Desk Ticket System
 This demonstrates all the weekly requirements
 """
 
-from ticket import Ticket
+from ticket import Ticket, Priority, Status, AGENTS, PRIORITY_LEVELS
 from data_structures import LinkedList, Stack, Queue, PriorityQueue
-from dashboard import generate_dashboard
+from dashboard import DashboardAggregator, generate_dashboard
+from store import TicketStore
+from dependencies import DependencyGraph
+from helpdesk import HelpDesk
+from persistence import Persistence
+from sqlite_repository import SQLiteTicketRepository
+from columnar import ColumnarTicketTable, np
+from service import HelpDeskService, http_request
+from dispatcher import Dispatcher, WorkerPool
+from assignment import AssignmentEngine
+from undo import UndoHistory
+from search import SearchIndex, tokenize
+from duplicates import DuplicateDetector, minhash, similarity
+from data_structures import TimerWheel
+from sla import SLAMonitor, SLA_TARGETS, HOUR
+from bulk import import_tickets, export_tickets, parse_tickets, read_records, ImportReport
+from benchmarks import SCALING_CASES, run_scaling, find_regressions
+from metrics import METRICS, MetricsRegistry, start_http_server
+from analytics import QuantileSketch, analyze, reference_report, live_history, RELATIVE_ACCURACY
+from sharding import HashRing, ShardedHelpDesk
+import cli
 
 def test_week1_lists_matrices():
     """Week 1: Lists & Matrices - Dashboard with 2D list"""
@@ -135,6 +155,1206 @@ def test_week5_stacks_queues():
     
     print()
 
+def test_priority_scheduler():
+    """Heap-backed scheduler: level order first, FIFO within a level"""
+    print(" Testing Priority Scheduler")
+    print("=" * 50)
+
+    scheduler = PriorityQueue()
+    scheduler.enqueue(Ticket(1, "Printer jam", "Office printer", "low"))
+    scheduler.enqueue(Ticket(2, "Login Issue", "Users cannot login", "normal"))
+    scheduler.enqueue(Ticket(3, "Server Down", "Production outage", "high"))
+    scheduler.enqueue(Ticket(4, "Data Breach", "Suspicious access", "critical"))
+    scheduler.enqueue(Ticket(5, "API Error", "REST API returning 500", "high"))
+    scheduler.enqueue(Ticket(6, "UI Bug", "Button not working", "normal"))
+
+    print(f"Waiting per level: {scheduler.size_by_level()}")
+    assert scheduler.peek().ticket_id == 4
+
+    order = []
+    while not scheduler.is_empty():
+        ticket = scheduler.dequeue()
+        print(f"  Processing: {ticket}")
+        order.append(ticket.ticket_id)
+
+    assert order == [4, 3, 5, 2, 6, 1]
+    assert scheduler.dequeue() is None
+    print()
+
+def test_queue_batches_and_removal():
+    """Deque-backed Queue: batch operations and lazy removal by ticket ID"""
+    print(" Testing Queue batches and removal")
+    print("=" * 50)
+
+    queue = Queue()
+    queue.enqueue_many(Ticket(i, f"Ticket {i}") for i in range(1, 7))
+    print(f"Queue size after enqueue_many: {queue.size()}")
+    assert queue.size() == 6
+
+    assert queue.remove(1)
+    assert queue.remove(4)
+    assert not queue.remove(4)
+    print(f"Queue size after removing 1 and 4: {queue.size()}")
+    assert queue.size() == 4
+    assert queue.peek().ticket_id == 2
+
+    batch = queue.dequeue_batch(3)
+    print(f"First batch: {batch}")
+    assert [t.ticket_id for t in batch] == [2, 3, 5]
+    assert [t.ticket_id for t in queue.dequeue_batch(3)] == [6]
+    assert queue.is_empty() and queue.dequeue() is None
+
+    scheduler = PriorityQueue()
+    scheduler.enqueue(Ticket(1, "Server Down", "", "high"))
+    scheduler.enqueue(Ticket(2, "UI Bug", "", "normal"))
+    assert scheduler.remove(1)
+    assert scheduler.size() == 1
+    assert scheduler.dequeue().ticket_id == 2
+    print()
+
+def test_ticket_store_indexes():
+    """TicketStore: O(1) lookup by ID and indexes kept in sync with ticket updates"""
+    print(" Testing Ticket Store")
+    print("=" * 50)
+
+    store = TicketStore([
+        Ticket(1, "Server Down", "Production outage", "high"),
+        Ticket(2, "Login Issue", "Users cannot login", "normal"),
+        Ticket(3, "UI Bug", "Button not working", "normal"),
+    ])
+    assert 2 in store and 9 not in store
+    assert store.get(3).title == "UI Bug"
+
+    store.get(1).assign_agent("Alice")
+    store.get(2).assign_agent("Alice")
+    store.get(2).update_status("closed")
+
+    print(f"Status counts: {store.count_by('status')}")
+    print(f"Alice's tickets: {store.by_agent('Alice')}")
+    assert store.count_by("status") == {"open": 2, "closed": 1}
+    assert [t.ticket_id for t in store.by_agent("Alice")] == [1, 2]
+    assert [t.ticket_id for t in store.by_priority("normal")] == [2, 3]
+    assert store.by_agent("Unassigned")[0].ticket_id == 3
+
+    removed = store.remove(3)
+    assert removed.store is None and len(store) == 2
+    assert store.by_agent("Unassigned") == []
+    print()
+
+def test_history_views():
+    """LinkedList history: O(1) append, length, reverse iteration and paging"""
+    print(" Testing History views")
+    print("=" * 50)
+
+    history = LinkedList()
+    for i in range(1, 11):
+        history.append(Ticket(i, f"Issue {i}"))
+
+    assert len(history) == 10
+    assert history.tail.ticket.ticket_id == 10
+    assert [t.ticket_id for t in history] == list(range(1, 11))
+    assert [n.ticket.ticket_id for n in history.reverse_nodes()][:3] == [10, 9, 8]
+
+    print("Page 2 (size 3), oldest first:")
+    assert history.display(offset=3, limit=3) == 3
+    assert [t.ticket_id for t in history.slice(3, 3)] == [4, 5, 6]
+    assert [t.ticket_id for t in history.slice(0, 2, reverse=True)] == [10, 9]
+    assert [t.ticket_id for t in history.slice(8, 5)] == [9, 10]
+    assert history.get_ticket_by_id(7).title == "Issue 7"
+    print()
+
+def test_dependency_graph():
+    """DependencyGraph: iterative checks, cache invalidation, cycles and unblocking"""
+    print(" Testing Dependency Graph")
+    print("=" * 50)
+
+    store = TicketStore()
+    graph = DependencyGraph(store)
+
+    # A chain far deeper than the recursion limit
+    depth = 5000
+    store.add(Ticket(1, "Root"))
+    for i in range(2, depth + 1):
+        store.add(Ticket(i, f"Level {i}", parent=i - 1))
+    assert graph.can_close(store.get(1))
+    assert not graph.can_close(store.get(depth))
+
+    for i in range(1, depth):
+        store.get(i).update_status("closed")
+    print(f"Leaf of {depth}-deep chain closeable: {graph.can_close(store.get(depth))}")
+    assert graph.can_close(store.get(depth))
+
+    # Reopening an ancestor invalidates the cached answer for its descendants
+    store.get(10).update_status("open")
+    assert not graph.can_close(store.get(depth))
+    assert [t.ticket_id for t in graph.unblocked_by(10)] == [depth]
+    store.get(11).update_status("open")
+    assert [t.ticket_id for t in graph.unblocked_by(10)] == [11]
+
+    # Siblings: closing the parent unblocks only its open descendants
+    store.add(Ticket(9001, "Outage"))
+    store.add(Ticket(9002, "Fix DB", parent=9001))
+    store.add(Ticket(9003, "Fix API", parent=9001))
+    store.add(Ticket(9004, "Verify API", parent=9003))
+    store.get(9003).update_status("closed")
+    unblocked = graph.unblocked_by(9001)
+    print(f"Closing 9001 unblocks: {unblocked}")
+    assert [t.ticket_id for t in unblocked] == [9002, 9004]
+
+    assert graph.would_cycle(9001, 9004)
+    try:
+        graph.check_parent(9001, 9004)
+        assert False, "cycle was not rejected"
+    except ValueError as error:
+        print(f"Rejected: {error}")
+    print()
+
+def test_dashboard_aggregator():
+    """DashboardAggregator: running counters match a full recount after updates"""
+    print(" Testing Dashboard Aggregator")
+    print("=" * 50)
+
+    store = TicketStore()
+    aggregator = DashboardAggregator(store, recent_limit=3)
+    for i, priority in enumerate(["high", "normal", "low", "critical", "normal"], start=1):
+        store.add(Ticket(i, f"Issue {i}", "", priority))
+    store.get(1).assign_agent("Alice")
+    store.get(2).assign_agent("Bob")
+    store.get(2).update_status("closed")
+    store.get(3).assign_agent("Alice")
+    store.get(3).assign_agent("Bob")
+    store.remove(5)
+
+    snapshot = aggregator.snapshot()
+    recount = DashboardAggregator(list(store), recent_limit=3).snapshot()
+    print(f"Status: {snapshot['status']}  Agents: {snapshot['agents']}")
+    print(f"Recent: {snapshot['recent']}")
+
+    assert snapshot["total"] == recount["total"] == 4
+    assert snapshot["status"] == recount["status"] == {"open": 3, "closed": 1}
+    assert snapshot["priority"] == recount["priority"]
+    assert snapshot["agents"] == recount["agents"] == {
+        "Alice": {"open": 1, "closed": 0},
+        "Bob": {"open": 1, "closed": 1},
+        "Unassigned": {"open": 1, "closed": 0},
+    }
+    assert [t.ticket_id for t in snapshot["recent"]] == [3, 2, 1]
+
+    generate_dashboard(aggregator)
+    print()
+
+def test_persistence_recovery():
+    """Persistence: snapshot + write-ahead log replay restores the help desk"""
+    import tempfile
+
+    print(" Testing Persistence")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        persistence = Persistence(data_dir, sync_every=4, snapshot_every=5)
+        helpdesk = persistence.load()
+        helpdesk.create_ticket("Server Down", "Production outage", "high")
+        helpdesk.create_ticket("Fix DB", "Restart primary", "normal", parent=1)
+        helpdesk.create_ticket("UI Bug", "Button not working", "low")
+        helpdesk.assign_agent(2, "Alice")
+        helpdesk.process_next()
+        # Snapshot taken here; the operations below only exist in the log
+        helpdesk.close_ticket(1)
+        helpdesk.create_ticket("Typo", "Footer typo", "low")
+        helpdesk.undo()
+        helpdesk.assign_agent(3, "Bob")
+        persistence.wal.close()  # simulate a crash: no final snapshot
+
+        restored = Persistence(data_dir).load()
+        print(f"Restored tickets: {list(restored.tickets)}")
+        assert sorted(t.ticket_id for t in restored.tickets) == [1, 2, 3]
+        assert [t.ticket_id for t in restored.history] == [1, 2, 3, 4]
+        assert restored.tickets.get(1).status == "closed"
+        assert restored.tickets.get(2).assigned_agent == "Alice"
+        assert restored.tickets.get(3).assigned_agent == "Bob"
+        assert [t.ticket_id for t in restored.priority_queue.tickets()] == [2, 3]
+        assert restored.ticket_counter == 5
+        assert restored.dashboard.snapshot()["status"] == {"open": 2, "closed": 1}
+
+        # Undo history survives the restart too
+        assert restored.undo().name == "assign_agent"
+        assert restored.tickets.get(3).assigned_agent == "Unassigned"
+
+    # Leases and queue positions are in the snapshot: a restart hands out nothing twice
+    with tempfile.TemporaryDirectory() as data_dir:
+        persistence = Persistence(data_dir)
+        helpdesk = persistence.load()
+        for i in range(1, 4):
+            helpdesk.create_ticket(f"Issue {i}", "", "high")
+        assert helpdesk.process_next("alice").ticket_id == 1
+        persistence.close(helpdesk)  # final snapshot; the log is empty
+
+        restored = Persistence(data_dir).load()
+        assert restored.dispatcher.leases[1].worker == "alice"
+        assert [t.ticket_id for t in restored.dispatcher.tickets()] == [1, 2, 3]
+        restored.create_ticket("Issue 4", "", "high")
+        assert [restored.process_next().ticket_id for _ in range(3)] == [2, 3, 4]
+        assert restored.process_next() is None
+    print()
+
+def test_sqlite_repository():
+    """SQLiteTicketRepository: same operations as the store, GROUP BY dashboard"""
+    import json
+    import os
+    import tempfile
+
+    print(" Testing SQLite Repository")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "tickets.csv")
+        with open(csv_path, "w") as dump:
+            dump.write("ticket_id,title,description,priority,parent,assigned_agent\n")
+            dump.write("1,Server Down,Production outage,high,,Alice\n")
+            dump.write("2,Fix DB,Restart primary,normal,1,Bob\n")
+        jsonl_path = os.path.join(directory, "tickets.jsonl")
+        with open(jsonl_path, "w") as dump:
+            dump.write(json.dumps({"ticket_id": 3, "title": "Fix API", "parent": 2}) + "\n")
+            dump.write(json.dumps({"ticket_id": 4, "title": "UI Bug", "priority": "low"}) + "\n")
+
+        repository = SQLiteTicketRepository(os.path.join(directory, "helpdesk.db"))
+        assert repository.import_file(csv_path, batch_size=1) == 2
+        assert repository.import_file(jsonl_path) == 2
+        repository.create(Ticket(5, "Printer", "Out of toner", "low"))
+
+        assert len(repository) == 5
+        assert repository.get(2).assigned_agent == "Bob"
+        assert repository.get_parent(3).ticket_id == 2
+        assert [t.ticket_id for t in repository.children(1)] == [2]
+        assert not repository.ancestors_closed(3)
+
+        repository.update_status(1, "closed")
+        repository.update_status(2, "closed")
+        repository.assign_agent(4, "Alice")
+        assert repository.ancestors_closed(3)
+        assert [t.ticket_id for t in repository.by_status("closed")] == [1, 2]
+        assert [t.ticket_id for t in repository.by_agent("Alice")] == [1, 4]
+
+        snapshot = repository.snapshot()
+        print(f"Status: {snapshot['status']}  Agents: {snapshot['agents']}")
+        assert snapshot["status"] == {"open": 3, "closed": 2}
+        assert snapshot["priority"] == {"low": 2, "normal": 2, "high": 1, "critical": 0}
+        assert snapshot["agents"]["Alice"] == {"open": 1, "closed": 1}
+        assert snapshot["recent"][0].ticket_id == 4
+        generate_dashboard(repository)
+
+        # Imported open tickets are queued; closed ones left the queue, created ones join it if asked
+        repository.create(Ticket(6, "Outage", "Site down", "critical"), queued=True)
+        assert repository.next_ticket_id() == 7
+        assert [repository.dequeue().ticket_id for _ in range(3)] == [6, 3, 4]
+        assert repository.dequeue() is None
+        assert [t.ticket_id for t in repository.page(1, 2, reverse=True)] == [5, 4]
+
+        # Imported priority and status are checked like Ticket's: normalized, or the batch is rejected
+        repository.bulk_insert([{"ticket_id": 7, "title": "VPN", "priority": " High ", "status": "OPEN"}])
+        assert repository.get(7).priority == "high" and repository.dequeue().ticket_id == 7
+        for bad in ({"priority": "urgent"}, {"status": "pending"}):
+            try:
+                repository.bulk_insert([{"ticket_id": 8, "title": "Bad", **bad}])
+                assert False, f"accepted {bad}"
+            except ValueError as error:
+                print(f"Rejected import: {error}")
+        assert repository.get(8) is None
+        repository.close()
+    print()
+
+def test_compact_ticket():
+    """Ticket: slotted, int-coded status/priority, interned agents, epoch timestamps"""
+    print(" Testing Compact Ticket")
+    print("=" * 50)
+
+    # Equal agent names built at runtime are separate str objects, as two users' input would be
+    typed = [f"Al{suffix}" for suffix in ("ice", "ice")]
+    assert typed[0] == typed[1] and typed[0] is not typed[1]
+    first = Ticket(1, "Server Down", "Production outage", "high", assigned_agent=typed[0])
+    second = Ticket(2, "Login Issue", "Users cannot login", "critical", assigned_agent=typed[1])
+    print(f"Tickets: {first}, {second}")
+    assert not hasattr(first, "__dict__")
+    assert first.priority == "high" and first.priority_code == Priority.HIGH
+    assert first.status == "open" and first.status_code == Status.OPEN
+    assert first.agent_id == second.agent_id == AGENTS.intern("Alice")
+    assert first.assigned_agent is second.assigned_agent
+    assert isinstance(first.created_ts, float)
+    assert abs(first.created_at.timestamp() - first.created_ts) < 1e-6
+
+    before = first.updated_ts
+    first.update_status("closed")
+    first.assign_agent("Bob")
+    assert repr(first) == "[1] Server Down (high) - closed - Bob"
+    assert first.status_code == Status.CLOSED and first.updated_ts >= before
+
+    for bad in (lambda: first.update_status("pending"), lambda: Ticket(3, "Bad", priority="urgent")):
+        try:
+            bad()
+            assert False, "invalid value was accepted"
+        except ValueError as error:
+            print(f"Rejected: {error}")
+    assert Ticket.from_record(first.to_record()).to_record() == first.to_record()
+    print()
+
+def test_columnar_table():
+    """ColumnarTicketTable: NumPy statistics match the running aggregator"""
+    print(" Testing Columnar Ticket Table")
+    print("=" * 50)
+    if np is None:
+        print("NumPy not installed, skipping")
+        print()
+        return
+
+    store = TicketStore()
+    aggregator = DashboardAggregator(store)
+    table = ColumnarTicketTable(store, capacity=2)
+    for i, priority in enumerate(["high", "normal", "low", "critical", "normal", "high"], start=1):
+        store.add(Ticket(i, f"Issue {i}", "", priority))
+    store.get(1).assign_agent("Alice")
+    store.get(2).assign_agent("Bob")
+    store.get(2).update_status("closed")
+    store.get(4).update_status("closed")
+    store.remove(6)
+
+    expected = aggregator.snapshot()
+    snapshot = table.snapshot()
+    print(f"Columnar: {snapshot['status']} {snapshot['agents']}")
+    assert len(table) == 5
+    for key in ("total", "status", "priority", "agents"):
+        assert snapshot[key] == expected[key], key
+    assert {t.ticket_id for t in snapshot["recent"]} == {t.ticket_id for t in expected["recent"]}
+    generate_dashboard(table)
+    print()
+
+def test_async_service():
+    """HelpDeskService: concurrent agents over HTTP never claim the same ticket"""
+    import asyncio
+
+    print(" Testing Async Service")
+    print("=" * 50)
+
+    async def scenario():
+        service = HelpDeskService()
+        host, port = await service.start("127.0.0.1", 0)
+
+        async def agent(number):
+            reader, writer = await asyncio.open_connection(host, port)
+            claimed = []
+            for i in range(20):
+                status, _ = await http_request(reader, writer, "POST", "/tickets",
+                                               {"title": f"Agent {number} issue {i}", "priority": "high"})
+                assert status == 201
+                status, ticket = await http_request(reader, writer, "POST", "/tickets/next")
+                if status == 200:
+                    claimed.append(ticket["ticket_id"])
+            writer.close()
+            return claimed
+
+        claims = await asyncio.gather(*(agent(n) for n in range(10)))
+        reader, writer = await asyncio.open_connection(host, port)
+        while True:
+            status, ticket = await http_request(reader, writer, "POST", "/tickets/next")
+            if status == 204:
+                break
+            claims.append([ticket["ticket_id"]])
+
+        status, result = await http_request(reader, writer, "POST", "/tickets/3/close")
+        assert status == 200 and result["ticket"]["status"] == "closed"
+        status, result = await http_request(reader, writer, "POST", "/tickets/3/close")
+        assert status == 400 and "already closed" in result["error"]
+        status, _ = await http_request(reader, writer, "GET", "/tickets/9999")
+        assert status == 404
+        status, result = await http_request(reader, writer, "POST", "/tickets", {"title": "Bad", "priority": "urgent"})
+        assert status == 400
+        # Valid JSON that is not an object, or a blank title, is a 400 and the connection stays usable
+        for body in ([], "x", 1, {"title": "  "}, {"priority": "high"}):
+            status, result = await http_request(reader, writer, "POST", "/tickets", body)
+            assert status == 400, body
+        print(f"Rejected body: {result['error']}")
+        status, dashboard = await http_request(reader, writer, "GET", "/dashboard")
+        writer.close()
+        await service.stop()
+        return [ticket_id for batch in claims for ticket_id in batch], dashboard
+
+    claimed, dashboard = asyncio.run(scenario())
+    print(f"Claimed {len(claimed)} tickets, {len(set(claimed))} distinct")
+    print(f"Dashboard status: {dashboard['status']}")
+    assert sorted(claimed) == list(range(1, 201))
+    assert dashboard["status"] == {"open": 199, "closed": 1}
+    print()
+
+def test_dispatcher_leases():
+    """Dispatcher: worker threads never share a ticket; abandoned leases return to their place"""
+    import threading
+    import time
+
+    print(" Testing Dispatcher Leases")
+    print("=" * 50)
+
+    # Expired leases go back ahead of later arrivals at the same level
+    clock = [0.0]
+    dispatcher = Dispatcher(lease_timeout=10, clock=lambda: clock[0])
+    for i in range(1, 4):
+        dispatcher.submit(Ticket(i, f"Issue {i}", "", "high"))
+    lease = dispatcher.claim("alice", timeout=0)
+    assert lease.ticket.ticket_id == 1 and dispatcher.in_progress() == 1
+    clock[0] = 11
+    assert not dispatcher.complete(lease)
+    assert [t.ticket_id for t in dispatcher.tickets()] == [1, 2, 3]
+    assert dispatcher.claim("bob", timeout=0).ticket.ticket_id == 1
+
+    # Stress: many workers, some abandon their lease, every ticket completes exactly once
+    dispatcher = Dispatcher(lease_timeout=0.05)
+    holders = {}
+    completed = []
+    abandoned = set()
+    lock = threading.Lock()
+
+    def handler(ticket):
+        with lock:
+            assert ticket.ticket_id not in holders, "ticket leased twice at once"
+            holders[ticket.ticket_id] = threading.current_thread().name
+        time.sleep(0.0001)
+        with lock:
+            del holders[ticket.ticket_id]
+            if ticket.ticket_id % 7 == 0 and ticket.ticket_id not in abandoned:
+                abandoned.add(ticket.ticket_id)  # walk away; the lease has to time out
+                return False
+            completed.append(ticket.ticket_id)
+        return True
+
+    pool = WorkerPool(dispatcher, handler, workers=16)
+    pool.start()
+    for i in range(1, 2001):
+        dispatcher.submit(Ticket(i, f"Load {i}", "", PRIORITY_LEVELS[i % 4]))
+    dispatcher.close()
+    pool.join()
+
+    print(f"Completed {pool.completed} tickets, {len(abandoned)} leases abandoned and retried")
+    assert pool.completed == 2000
+    assert sorted(completed) == list(range(1, 2001))
+    assert dispatcher.in_progress() == 0 and dispatcher.queue.is_empty()
+
+    # Closing takes a ticket out of the dispatcher whether it was still queued or leased
+    helpdesk = HelpDesk()
+    for i in range(1, 4):
+        helpdesk.create_ticket(f"Issue {i}", "", "high")
+    helpdesk.close_ticket(1)
+    assert helpdesk.process_next().ticket_id == 2
+    helpdesk.close_ticket(2)
+    assert 1 not in helpdesk.dispatcher and 2 not in helpdesk.dispatcher
+    assert helpdesk.process_next().ticket_id == 3 and helpdesk.process_next() is None
+
+    # Undoing a close puts the ticket back where it was: 1 in the queue, 2 leased to its worker
+    helpdesk.undo()
+    helpdesk.undo()
+    assert [t.ticket_id for t in helpdesk.dispatcher.iter_tickets()] == [1, 2, 3]
+    assert helpdesk.dispatcher.leases[2].worker == "operator"
+    assert helpdesk.process_next().ticket_id == 1 and helpdesk.process_next() is None
+    helpdesk.redo()
+    assert 1 not in helpdesk.dispatcher and 2 in helpdesk.dispatcher
+    print()
+
+def test_assignment_engine():
+    """AssignmentEngine: least-loaded eligible agent, loads follow closes and reassignments"""
+    print(" Testing Assignment Engine")
+    print("=" * 50)
+
+    helpdesk = HelpDesk()
+    helpdesk.assigner.add_agent("Alice", skills=["network"], capacity=2)
+    helpdesk.assigner.add_agent("Bob", skills=["database"])
+    helpdesk.assigner.add_agent("Carol", skills=["network", "database"])
+    helpdesk.auto_assign = True
+
+    for i in range(6):
+        helpdesk.create_ticket(f"Issue {i}", "", "normal")
+    loads = helpdesk.assigner.loads()
+    print(f"Loads after 6 tickets: {loads}")
+    assert loads == {"Alice": 2, "Bob": 2, "Carol": 2}
+    assert sum(loads.values()) == len(helpdesk.tickets.by_status("open"))
+
+    # Alice is at capacity, so network work goes to Carol until Alice closes one
+    assert helpdesk.assigner.pick("network") == "Carol"
+    alice_ticket = helpdesk.tickets.by_agent("Alice")[0]
+    helpdesk.close_ticket(alice_ticket.ticket_id)
+    assert helpdesk.assigner.pick("network") == "Alice"
+    assert helpdesk.assigner.pick("hardware") is None
+
+    # Reassigning moves load; undo moves it back
+    bob_ticket = helpdesk.tickets.by_agent("Bob")[0]
+    helpdesk.assign_agent(bob_ticket.ticket_id, "Carol")
+    assert helpdesk.assigner.loads() == {"Alice": 1, "Bob": 1, "Carol": 3}
+    helpdesk.undo()
+    assert helpdesk.assigner.loads() == {"Alice": 1, "Bob": 2, "Carol": 2}
+
+    # Loads match the store's agent index after a burst
+    engine = AssignmentEngine(helpdesk.tickets)
+    for n in range(50):
+        engine.add_agent(f"Agent {n}", capacity=100)
+    helpdesk.assigner = engine
+    for i in range(2000):
+        helpdesk.create_ticket(f"Burst {i}")
+    loads = engine.loads()
+    print(f"Burst of 2000 over 50 agents: min {min(loads.values())}, max {max(loads.values())}")
+    assert max(loads.values()) - min(loads.values()) <= 1
+    for name, load in loads.items():
+        assert load == len(helpdesk.tickets.by_agent(name))
+    print()
+
+def test_undo_redo():
+    """UndoHistory: bounded ring buffer, typed commands with inverses, redo, coalescing"""
+    print(" Testing Undo/Redo")
+    print("=" * 50)
+
+    helpdesk = HelpDesk(undo_capacity=3)
+    for i in range(1, 6):
+        helpdesk.create_ticket(f"Issue {i}", "", "high")
+    assert len(helpdesk.undo_history) == 3  # oldest two creates fell off
+
+    # Repeated assignments on one ticket coalesce into a single undo step
+    helpdesk.assign_agent(5, "Alice")
+    helpdesk.assign_agent(5, "Bob")
+    helpdesk.assign_agent(5, "Carol")
+    print(f"Top of undo stack: {helpdesk.undo_history.peek()}")
+    assert helpdesk.undo().name == "assign_agent"
+    assert helpdesk.tickets.get(5).assigned_agent == "Unassigned"
+    assert helpdesk.redo().name == "assign_agent"
+    assert helpdesk.tickets.get(5).assigned_agent == "Carol"
+
+    # Undo and redo a create: the ticket leaves and rejoins the store and queue
+    helpdesk.close_ticket(4)
+    helpdesk.undo()
+    assert helpdesk.tickets.get(4).status == "open"
+    helpdesk.undo()
+    helpdesk.undo()
+    assert 5 not in helpdesk.tickets and helpdesk.priority_queue.size() == 4
+    assert helpdesk.undo() is None
+    helpdesk.redo()
+    assert 5 in helpdesk.tickets and helpdesk.priority_queue.size() == 5
+    assert helpdesk.dashboard.snapshot()["total"] == 5
+
+    # A new operation clears the redo stack
+    helpdesk.close_ticket(1)
+    assert helpdesk.redo() is None
+
+    # Long sessions stay bounded
+    history = UndoHistory(capacity=100)
+    for i in range(10000):
+        helpdesk.create_ticket(f"Bulk {i}")
+        history.push(helpdesk.undo_history.peek())
+    assert len(history) == 100 and len(helpdesk.undo_history) == 3
+    print()
+
+def test_search_index():
+    """SearchIndex: BM25 ranking, prefix terms, filters, incremental updates with undo"""
+    print(" Testing Search Index")
+    print("=" * 50)
+
+    assert tokenize("The Printer is OFFLINE, again!") == ["printer", "offline", "again"]
+
+    helpdesk = HelpDesk()
+    helpdesk.create_ticket("Printer offline", "Printer on floor 3 is offline", "normal")
+    helpdesk.create_ticket("Email outage", "Nobody can send email", "critical")
+    helpdesk.create_ticket("Printing slow", "Print jobs take minutes", "low")
+    helpdesk.create_ticket("VPN drops", "VPN disconnects during email sync", "high")
+    helpdesk.assign_agent(4, "Alice")
+
+    results = helpdesk.search("printer offline")
+    print(f"'printer offline': {[(t.ticket_id, round(score, 2)) for t, score in results]}")
+    assert [t.ticket_id for t, _ in results] == [1]
+
+    # Term frequency and document length decide the order
+    assert [t.ticket_id for t, _ in helpdesk.search("email")] == [2, 4]
+    assert {t.ticket_id for t, _ in helpdesk.search("print*")} == {1, 3}
+
+    # Filters read the live ticket
+    assert [t.ticket_id for t, _ in helpdesk.search("email", agent="Alice")] == [4]
+    assert [t.ticket_id for t, _ in helpdesk.search("email", priority="critical")] == [2]
+    helpdesk.close_ticket(2)
+    assert [t.ticket_id for t, _ in helpdesk.search("email", status="open")] == [4]
+    assert helpdesk.search("nonexistent") == []
+
+    # Undoing and redoing a create drops and restores its postings
+    helpdesk.create_ticket("Keyboard broken", "Keys stick", "low")
+    assert len(helpdesk.search("keyboard")) == 1
+    helpdesk.undo()
+    assert helpdesk.search("keyboard") == []
+    helpdesk.redo()
+    assert [t.ticket_id for t, _ in helpdesk.search("keyboard")] == [5]
+
+    # Terms indexed after a prefix search are merged into the vocabulary on the next one
+    helpdesk.create_ticket("Printserver down", "", "high")
+    assert {t.ticket_id for t, _ in helpdesk.search("print*")} == {1, 3, 6}
+
+    # Compaction drops tombstoned postings and empty vocabulary terms
+    index = SearchIndex()
+    tickets = [Ticket(i, f"Ticket {i} unique{i}") for i in range(3000)]
+    for ticket in tickets:
+        index.add(ticket)
+    for ticket in tickets[:2000]:
+        index.remove(ticket.ticket_id)
+    assert len(index) == 1000 and len(index.removed) < 1024
+    assert "unique5" not in index.postings and "unique5" not in index.terms
+    assert index.search("unique5") == [] and len(index.search("unique2500")) == 1
+    assert index.terms == sorted(index.postings) and not index.new_terms
+    print()
+
+def test_duplicate_detection():
+    """DuplicateDetector: near-identical tickets are found via LSH and held under the original"""
+    print(" Testing Duplicate Detection")
+    print("=" * 50)
+
+    assert similarity(minhash("Server Down"), minhash("server down!")) == 1.0
+    assert similarity(minhash("Server Down"), minhash("Printer offline")) < 0.2
+
+    helpdesk = HelpDesk()
+    helpdesk.create_ticket("Printer offline", "Printer on floor 3 is offline", "low")
+    helpdesk.create_ticket("Server Down", "Production server is not responding", "critical")
+    matches = helpdesk.find_duplicates("Server down", "Production server not responding")
+    print(f"Suggestions: {[(t.ticket_id, round(score, 2)) for t, score in matches]}")
+    assert [t.ticket_id for t, _ in matches] == [2]
+
+    # Automatic linking: duplicates become held children of the original
+    helpdesk.link_duplicates = True
+    for _ in range(5):
+        duplicate = helpdesk.create_ticket("Server down", "production server is not responding", "critical")
+        assert duplicate.parent == 2
+    other = helpdesk.create_ticket("VPN drops", "VPN disconnects every hour", "high")
+    assert other.parent is None
+    assert helpdesk.priority_queue.size() == 3  # printer, server, VPN
+
+    # Closing the original queues its duplicates; undo takes them out again
+    released = helpdesk.close_ticket(2)
+    assert sorted(t.ticket_id for t in released) == [3, 4, 5, 6, 7]
+    assert helpdesk.priority_queue.size() == 7  # the closed original left it
+    helpdesk.undo()
+    assert helpdesk.priority_queue.size() == 3 and helpdesk.tickets.get(2).status == "open"
+    helpdesk.redo()
+    assert helpdesk.priority_queue.size() == 7
+
+    # Closed tickets are no longer duplicate targets
+    assert helpdesk.find_duplicates("Server Down", "Production server is not responding")[0][0].ticket_id == 3
+    detector = DuplicateDetector(helpdesk.tickets)
+    assert len(detector) == len(helpdesk.tickets.by_status("open"))
+    print()
+
+def test_sla_timers():
+    """SLAMonitor: timer wheel deadlines, aging through the scheduler, breach counts"""
+    print(" Testing SLA Timers")
+    print("=" * 50)
+
+    # Timer wheel: fires each timer once, on its tick, across wheel levels
+    wheel = TimerWheel(tick=1.0, slots=8, levels=3, start=0)
+    for when in (0, 5, 9, 70, 700, 5000):
+        wheel.schedule(when, when)
+    cancelled = wheel.schedule(30, "cancelled")
+    cancelled.cancel()
+    assert wheel.advance(8) == [0, 5]
+    assert wheel.advance(600) == [9, 70]
+    assert wheel.advance(10_000) == [700, 5000] and len(wheel) == 0
+
+    # A normal ticket starving behind a stream of high tickets gets aged forward
+    clock = [1_000_000.0]
+    helpdesk = HelpDesk()
+    helpdesk.sla = SLAMonitor(helpdesk.tickets, helpdesk.dispatcher, clock=lambda: clock[0])
+    helpdesk.dashboard.sla = helpdesk.sla
+
+    def create(title, priority):
+        ticket = helpdesk.create_ticket(title, "", priority)
+        ticket.created_ts = clock[0]
+        helpdesk.sla.unwatch(ticket)
+        helpdesk.sla.watch(ticket)
+        return ticket
+
+    create("Starving normal", "normal")
+    processed = []
+    for hour in range(16):
+        clock[0] += HOUR
+        create(f"High {hour}", "high")
+        processed.append(helpdesk.process_next().ticket_id)
+    # Half its 24h SLA in, the normal ticket moves up to high, ahead of the newer high tickets
+    print(f"Processed order: {processed}")
+    assert processed.index(1) == 11
+
+    # Missed deadlines are counted, and tickets still waiting are escalated to the top level
+    clock[0] += SLA_TARGETS["normal"]
+    sla = helpdesk.dashboard.snapshot()["sla"]
+    print(f"SLA summary: {sla}")
+    assert sla["breached"] == 17
+    assert sla["open_breached"] == {"normal": 1, "high": 16}
+    waiting = helpdesk.priority_queue.tickets()
+    assert len(waiting) == 1 and helpdesk.priority_queue.level_of(waiting[0].ticket_id) == "critical"
+    helpdesk.close_ticket(1)
+    assert helpdesk.sla.summary()["open_breached"].get("normal", 0) == 0
+    helpdesk.undo()
+    assert helpdesk.sla.summary()["open_breached"]["normal"] == 1
+
+    # Closing before the deadline cancels the timers
+    ticket = create("Quick fix", "critical")
+    helpdesk.close_ticket(ticket.ticket_id)
+    clock[0] += 2 * HOUR
+    assert ticket.ticket_id not in helpdesk.sla.breached
+
+    # A ticket recovered from the log keeps its deadline from when it was created
+    import os
+    import tempfile
+    from persistence import WriteAheadLog, WAL_FILE, apply_record
+    with tempfile.TemporaryDirectory() as directory:
+        logged = Ticket(1, "Old outage", "", "normal")
+        logged.created_ts = logged.updated_ts = 1_000_000.0
+        wal = WriteAheadLog(os.path.join(directory, WAL_FILE))
+        wal.append({"lsn": 1, "op": "create", "ticket": logged.to_record()})
+        wal.close()
+        later = [1_000_000.0 + SLA_TARGETS["normal"] + HOUR]
+        recovered = HelpDesk()
+        recovered.sla = SLAMonitor(recovered.tickets, recovered.dispatcher, clock=lambda: later[0])
+        persistence = Persistence(directory)
+        persistence.load(recovered)
+        persistence.close()
+        deadline = recovered.sla.timers[1][1].when
+        print(f"Recovered deadline: {deadline:,.0f}")
+        assert deadline == 1_000_000.0 + SLA_TARGETS["normal"]
+        assert recovered.sla.summary()["breached"] == 1
+
+    # Replay claims the logged ticket, even once aging on the replay clock has changed the queue head
+    with tempfile.TemporaryDirectory() as directory:
+        wal = WriteAheadLog(os.path.join(directory, WAL_FILE))
+        for ticket_id, priority in ((1, "normal"), (2, "high")):
+            logged = Ticket(ticket_id, f"Issue {ticket_id}", "", priority)
+            logged.created_ts = logged.updated_ts = 1_000_000.0
+            wal.append({"lsn": ticket_id, "op": "create", "ticket": logged.to_record()})
+        wal.append({"lsn": 3, "op": "process", "ticket_id": 2, "worker": "alice"})
+        wal.close()
+        later = [1_000_000.0 + 13 * HOUR]  # past the normal ticket's aging point
+        recovered = HelpDesk()
+        recovered.sla = SLAMonitor(recovered.tickets, recovered.dispatcher, clock=lambda: later[0])
+        persistence = Persistence(directory)
+        persistence.load(recovered)
+        assert list(recovered.dispatcher.leases) == [2] and recovered.dispatcher.leases[2].worker == "alice"
+        assert recovered.process_next().ticket_id == 1
+        recovered.close_ticket(2)
+        persistence.close()
+        try:
+            apply_record(recovered, {"lsn": 6, "op": "process", "ticket_id": 2})
+            assert False, "replayed a claim of a ticket that is not queued"
+        except ValueError as error:
+            print(f"Rejected replay: {error}")
+    print()
+
+def test_bulk_import_export():
+    """Bulk pipeline: streamed CSV/JSON-lines import with validation, streamed export"""
+    import os
+    import tempfile
+
+    print(" Testing Bulk Import/Export")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "tickets.csv")
+        with open(csv_path, "w", encoding="utf-8") as dump:
+            dump.write("ticket_id,title,description,priority,status,parent\n"
+                       "10,Server Down,Outage,High,open,\n"
+                       "11,Fix DB,Restart primary,normal,open,10\n"
+                       "12,Bad priority,,urgent,open,\n"
+                       "13,Orphan,,low,open,99\n"
+                       "14,,No title,low,open,\n"
+                       "10,Duplicate id,,low,open,\n"
+                       "15,Old issue,,low,closed,\n"
+                       ",No id given,,critical,open,11\n")
+
+        helpdesk = HelpDesk()
+        helpdesk.create_ticket("Existing", "", "normal")
+        report = import_tickets(helpdesk, csv_path, batch_size=2)
+        print(f"Import: {report}")
+        for error in report.errors:
+            print(f"   {error}")
+        assert (report.imported, report.rejected) == (4, 4)
+        assert sorted(t.ticket_id for t in helpdesk.tickets) == [1, 10, 11, 15, 16]
+        assert helpdesk.tickets.get(16).parent == 11
+        assert helpdesk.tickets.get(10).priority == "high"
+        # Open tickets were routed into the scheduler, most urgent first
+        assert [t.ticket_id for t in helpdesk.priority_queue.tickets()] == [16, 10, 1, 11]
+        assert helpdesk.ticket_counter == 17
+        assert helpdesk.create_ticket("After import").ticket_id == 17
+        assert not helpdesk.dependencies.can_close(helpdesk.tickets.get(11))
+
+        # Export streams; a re-import of the history gives the same tickets
+        history_path = os.path.join(directory, "history.jsonl")
+        assert export_tickets(helpdesk.history, history_path) == 6
+        queue_path = os.path.join(directory, "queue.csv")
+        assert export_tickets(helpdesk.dispatcher.iter_tickets(), queue_path) == 5
+        assert [int(r["ticket_id"]) for r in read_records(queue_path)] == [16, 10, 1, 11, 17]
+        copy = HelpDesk()
+        assert import_tickets(copy, history_path).imported == 6
+        assert [t.to_record() for t in copy.history] == [t.to_record() for t in helpdesk.history]
+
+        # The parser is a generator: it reads no further than it is asked to
+        with open(history_path, "a", encoding="utf-8") as dump:
+            dump.write("{not json\n")
+        report = ImportReport()
+        tickets = parse_tickets(read_records(history_path), report=report)
+        assert next(tickets).ticket_id == 1 and report.imported == 1
+        assert len(list(tickets)) == 5 and report.errors == ["row 7: malformed line"]
+
+        # Huge ids (epoch milliseconds) only cost a page of the id bitmap each
+        huge = 1_700_000_000_000
+        records = [{"ticket_id": huge, "title": "Imported"}, {"ticket_id": huge + 1, "title": "Child", "parent": huge},
+                   {"ticket_id": 5, "title": "Orphan", "parent": huge + 2}]
+        report = ImportReport()
+        assert [t.ticket_id for t in parse_tickets(records, report=report)] == [huge, huge + 1]
+        assert report.errors == [f"row 3: parent {huge + 2} does not exist"]
+    print()
+
+def test_scaling_harness():
+    """Scaling harness: every case measured per size, regressions flagged against a baseline"""
+    import json
+
+    print(" Testing Scaling Harness")
+    print("=" * 50)
+
+    current = run_scaling(sizes=(50, 200))
+    assert len(current["results"]) == 2 * len(SCALING_CASES)
+    for key, result in current["results"].items():
+        print(f"{key}: {result['ns_per_op']:.0f} ns/op, {result['peak_bytes']:,} bytes peak")
+        assert result["seconds"] > 0 and result["peak_bytes"] >= 0
+    assert json.loads(json.dumps(current))["results"].keys() == current["results"].keys()
+
+    baseline = {"results": {
+        "queue@1000": {"ns_per_op": 200, "peak_bytes": 100_000},
+        "dashboard@1000": {"ns_per_op": 1_000, "peak_bytes": 10_000},
+        "removed@1000": {"ns_per_op": 1, "peak_bytes": 1},
+    }}
+    measured = {"results": {
+        "queue@1000": {"ns_per_op": 240, "peak_bytes": 100_000},  # within tolerance
+        "dashboard@1000": {"ns_per_op": 2_000, "peak_bytes": 500_000},  # slower and bigger
+        "new@1000": {"ns_per_op": 9_999, "peak_bytes": 9_999},  # no baseline to compare with
+    }}
+    regressions = find_regressions(measured, baseline)
+    print(f"Regressions: {regressions}")
+    assert [(key, metric) for key, metric, _, _ in regressions] == [
+        ("dashboard@1000", "ns_per_op"), ("dashboard@1000", "peak_bytes")]
+    assert find_regressions(measured, baseline, tolerance=2.0) == [
+        ("dashboard@1000", "peak_bytes", 10_000, 500_000)]
+    print()
+
+def test_metrics_export():
+    """Instrumentation: hot-path counters and timers, Prometheus export to a file and over HTTP"""
+    import asyncio
+    import os
+    import tempfile
+    import urllib.request
+    from main import check_dependency
+
+    print(" Testing Metrics Export")
+    print("=" * 50)
+
+    def sample(text, line_start):
+        values = [float(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(line_start)]
+        return values[0] if values else None
+
+    METRICS.reset()
+    METRICS.enabled = False
+    try:
+        # Disabled: nothing is recorded
+        helpdesk = HelpDesk()
+        helpdesk.create_ticket("Quiet", "", "low")
+        assert all(not metric.values for metric in METRICS.metrics.values())
+
+        METRICS.enabled = True
+        root = helpdesk.create_ticket("Server Down", "", "critical")
+        child = helpdesk.create_ticket("Fix DB", "", "high", parent=root.ticket_id)
+        root.created_ts -= 120  # waited two minutes before it was picked up
+        assert helpdesk.process_next() is root
+        helpdesk.assign_agent(root.ticket_id, "Alice")
+        helpdesk.close_ticket(root.ticket_id)
+        helpdesk.undo()
+        helpdesk.redo()
+        assert check_dependency(child, helpdesk.tickets)
+        helpdesk.dashboard.snapshot()
+
+        METRICS.add_collector(helpdesk.collect_metrics)
+        text = METRICS.render()
+        print(text[:400] + "...")
+        assert sample(text, 'helpdesk_tickets_created_total{priority="critical"}') == 1
+        assert sample(text, 'helpdesk_tickets_created_total{priority="low"}') is None
+        assert sample(text, 'helpdesk_tickets_closed_total{agent="Alice"}') == 1
+        assert sample(text, 'helpdesk_undo_operations_total{operation="undo",command="assign_agent"}') is None
+        assert sample(text, 'helpdesk_undo_operations_total{operation="undo",command="close"}') == 1
+        assert sample(text, 'helpdesk_queue_enqueued_total{priority="high"}') == 1
+        assert sample(text, 'helpdesk_queue_dequeued_total{priority="critical"}') == 1
+        assert sample(text, 'helpdesk_queue_wait_seconds_bucket{priority="critical",le="60.0"}') == 0
+        assert sample(text, 'helpdesk_queue_wait_seconds_bucket{priority="critical",le="300.0"}') == 1
+        assert sample(text, 'helpdesk_queue_wait_seconds_sum{priority="critical"}') >= 120
+        assert sample(text, 'helpdesk_queue_depth{priority="high"}') == 1
+        assert sample(text, 'helpdesk_queue_depth{priority="low"}') == 1
+        assert sample(text, "helpdesk_tickets_in_progress") == 0
+        for operation in ("create", "process_next", "undo", "redo", "check_dependency", "dashboard"):
+            assert sample(text, f'helpdesk_operation_seconds_count{{operation="{operation}"}}') >= 1
+        assert sample(text, 'helpdesk_operation_seconds_count{operation="create"}') == 2
+        assert "# TYPE helpdesk_operation_seconds histogram" in text
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "helpdesk.prom")
+            METRICS.write(path)
+            with open(path) as metrics_file:
+                assert "helpdesk_queue_depth" in metrics_file.read()
+
+        server = start_http_server(0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url) as response:
+                assert response.headers["Content-Type"].startswith("text/plain")
+                assert 'helpdesk_tickets_closed_total{agent="Alice"} 1' in response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        status, page = asyncio.run(HelpDeskService(helpdesk).dispatch("GET", "/metrics", b""))
+        assert status == 200 and "helpdesk_open_tickets" in page
+
+        # Scrapes from another thread while operations add agents and label sets must never fail
+        import sys
+        import threading
+        errors, done = [], threading.Event()
+
+        def scrape():
+            while not done.is_set():
+                try:
+                    METRICS.render()
+                except RuntimeError as error:
+                    errors.append(error)
+                    return
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        scraper = threading.Thread(target=scrape)
+        scraper.start()
+        try:
+            for i in range(3000):
+                ticket = helpdesk.create_ticket(f"Concurrent {i}")
+                helpdesk.assign_agent(ticket.ticket_id, f"Agent {i}")
+                if i % 2:
+                    helpdesk.close_ticket(ticket.ticket_id)
+        finally:
+            done.set()
+            scraper.join()
+            sys.setswitchinterval(interval)
+        assert not errors, errors
+
+        registry = MetricsRegistry()
+        registry.counter("jobs_total", "Jobs", ("kind",))
+        try:
+            registry.gauge("jobs_total", "Jobs")
+            assert False, "re-registering a name as another type must fail"
+        except ValueError as error:
+            print(f"Expected error: {error}")
+    finally:
+        METRICS.reset()
+        METRICS.enabled = False
+    print()
+
+def test_parallel_analytics():
+    """Analytics: chunked process-pool aggregates merge to the single-process reference"""
+    import random
+    from datetime import datetime
+
+    print(" Testing Parallel Analytics")
+    print("=" * 50)
+
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1).timestamp()
+    tickets = []
+    for i in range(1, 3001):
+        ticket = Ticket(i, f"Issue {i}", priority=PRIORITY_LEVELS[i % 4],
+                        assigned_agent=["Alice", "Bob", "Unassigned"][i % 3])
+        ticket.created_ts = start + i * 900  # one every 15 minutes, about a month in all
+        ticket.updated_ts = ticket.created_ts
+        if i % 5:
+            ticket.status = "closed"
+            ticket.updated_ts += 0 if i % 50 == 1 else rng.expovariate(1 / (6 * 3600))
+        tickets.append(ticket)
+
+    serial = analyze(tickets, workers=1, chunk_size=1000)
+    parallel = analyze(tickets, workers=2, chunk_size=250)
+    reference = reference_report(tickets)
+    assert parallel == serial  # merging is exact, whatever the chunking
+    assert serial["tickets"] == reference["tickets"] == 3000
+    assert serial["backlog"] == reference["backlog"]
+    print(f"Backlog: {serial['backlog'][0]} ... {serial['backlog'][-1]}")
+    assert serial["backlog"][-1][3] == sum(1 for t in tickets if t.status == "open")
+
+    assert list(serial["resolution"]["priority"]) == PRIORITY_LEVELS
+    assert set(serial["resolution"]["agent"]) == {"Alice", "Bob", "Unassigned"}
+    for dimension, groups in reference["resolution"].items():
+        for key, exact in groups.items():
+            sketched = serial["resolution"][dimension][key]
+            print(f"{dimension}={key}: exact p90 {exact['p90'] / 3600:.2f}h, sketch {sketched['p90'] / 3600:.2f}h")
+            assert sketched["count"] == exact["count"]
+            for name in ("p50", "p90", "p95", "p99"):
+                assert abs(sketched[name] - exact[name]) <= RELATIVE_ACCURACY * exact[name] + 1e-9
+
+    sketch = QuantileSketch()
+    sketch.add_many([0, 0, 5, 10])
+    assert sketch.quantile(0.5) == 0 and sketch.quantile(1.0) == 10 and len(sketch) == 4
+    assert QuantileSketch().quantile(0.5) is None
+
+    # A ticket whose create was undone stays in the history, but is not part of the backlog
+    helpdesk = HelpDesk()
+    helpdesk.create_ticket("Kept")
+    helpdesk.create_ticket("Undone")
+    helpdesk.undo()
+    report = analyze(live_history(helpdesk), workers=1)
+    assert len(helpdesk.history) == 2 and report["tickets"] == 1
+    assert report["backlog"][-1][3] == 1
+    print()
+
+def test_sharded_store():
+    """Sharding: consistent-hash routing, cross-shard parents, merged dashboards, minimal moves"""
+    print(" Testing Sharded Store")
+    print("=" * 50)
+
+    ring = HashRing(["shard-0", "shard-1", "shard-2"])
+    before = {i: ring.owner(i) for i in range(1, 10_001)}
+    ring.add("shard-3")
+    moved = [i for i in before if ring.owner(i) != before[i]]
+    print(f"Ring: {len(moved)} of 10000 ids move to a fourth shard")
+    assert all(ring.owner(i) == "shard-3" for i in moved)  # nothing moves between old shards
+    assert 1500 < len(moved) < 3500
+
+    with ShardedHelpDesk(shards=3) as desk:
+        tickets = [desk.create_ticket(f"Issue {i}", "", PRIORITY_LEVELS[i % 4]) for i in range(1, 31)]
+        parent = tickets[0]
+        # A child that lands on a different shard than its parent
+        child = next(c for c in (desk.create_ticket("Follow-up", "", "low", parent=parent.ticket_id)
+                                 for _ in range(10))
+                     if desk.ring.owner(c.ticket_id) != desk.ring.owner(parent.ticket_id))
+        print(f"Parent {parent.ticket_id} on {desk.ring.owner(parent.ticket_id)}, "
+              f"child {child.ticket_id} on {desk.ring.owner(child.ticket_id)}")
+        assert sum(desk.sizes().values()) == desk.ticket_counter - 1
+        try:
+            desk.create_ticket("Orphan", parent=999)
+            assert False, "unknown parent must be rejected"
+        except ValueError as error:
+            print(f"Expected error: {error}")
+        try:
+            desk.close_ticket(child.ticket_id)
+            assert False, "a child cannot close before its parent on another shard"
+        except ValueError as error:
+            print(f"Expected error: {error}")
+
+        unblocked = desk.close_ticket(parent.ticket_id)
+        assert child.ticket_id in [t.ticket_id for t in unblocked]
+        desk.close_ticket(child.ticket_id)
+        assert desk.assign_agent(tickets[5].ticket_id, "Alice").assigned_agent == "Alice"
+        assert desk.get_ticket(tickets[5].ticket_id).assigned_agent == "Alice"
+
+        # The globally most urgent queued ticket comes first, whichever shard holds it
+        next_ticket = desk.process_next()
+        assert next_ticket.priority == "critical" and next_ticket.ticket_id == tickets[2].ticket_id
+
+        snapshot = desk.snapshot()
+        assert snapshot["total"] == desk.ticket_counter - 1
+        assert snapshot["status"]["closed"] == 2
+        assert snapshot["agents"]["Alice"] == {"open": 1, "closed": 0}
+        assert snapshot["recent"][0].ticket_id == tickets[5].ticket_id
+        assert sum(snapshot["priority"].values()) == snapshot["total"]
+
+        # A new shard takes over only the tickets the new ring gives it, leases included
+        handed_out = [next_ticket.ticket_id] + [desk.process_next().ticket_id for _ in range(8)]
+        owners = {i: desk.ring.owner(i) for i in range(1, desk.ticket_counter)}
+        moved = desk.add_shard()
+        expected = [i for i, owner in owners.items() if desk.ring.owner(i) != owner]
+        print(f"Added shard: {moved} tickets moved, sizes {desk.sizes()}")
+        assert moved == len(expected) and all(desk.ring.owner(i) == "shard-3" for i in expected)
+        assert desk.snapshot()["total"] == snapshot["total"]
+        assert all(desk.get_ticket(i).ticket_id == i for i in owners)
+
+        # Leased tickets that moved are not handed out again; the rest still come out most urgent first
+        assert set(handed_out) & set(expected)
+        rest = list(iter(desk.process_next, None))
+        print(f"Processed {len(handed_out)} before the move, {len(rest)} after")
+        assert not {t.ticket_id for t in rest} & set(handed_out)
+        assert len(handed_out) + len({t.ticket_id for t in rest}) == snapshot["status"]["open"]
+        ranks = [PRIORITY_LEVELS.index(t.priority) for t in rest]
+        assert ranks == sorted(ranks, reverse=True)
+
+        blocked_parent = desk.create_ticket("Database slow", "", "high")
+        late_child = desk.create_ticket("Check indexes", "", "normal", parent=blocked_parent.ticket_id)
+        assert not desk.can_close(late_child.ticket_id)
+        desk.close_ticket(blocked_parent.ticket_id)
+        assert desk.can_close(late_child.ticket_id)
+    print()
+
+def test_cli_batch():
+    """CLI: single commands and batch scripts on the data directory the other front-ends use"""
+    import contextlib
+    import io
+    import sys
+    import tempfile
+    print(" Testing CLI and Batch Mode")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        def run(*argv, script=None):
+            output, errors = io.StringIO(), io.StringIO()
+            stdin = sys.stdin
+            sys.stdin = io.StringIO(script or "")
+            try:
+                with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+                    code = cli.main(["--data-dir", data_dir, *argv])
+            finally:
+                sys.stdin = stdin
+            return code, output.getvalue(), errors.getvalue()
+
+        assert run("create", "Server down", "--priority", "critical") == (0, "created 1\n", "")
+        code, _, errors = run("close", "42")
+        print(f"Expected error: {errors.strip()}")
+        assert code == 1 and "does not exist" in errors
+
+        script = "\n".join([
+            "# comments and blank lines are skipped",
+            "",
+            'create "Printer jammed" --priority high',
+            'create "Toner low" --parent 2 --hold',
+            "assign 2 Alice",
+            "close 3",
+            "bogus-command",
+            "close 2",
+            "process-next --worker night-shift",
+            "batch",
+        ])
+        code, output, errors = run("batch", script=script)
+        print(output + errors)
+        assert code == 1
+        assert "created 2" in output and "assigned 2 Alice" in output
+        assert "closed 2 unblocked 3" in output
+        assert output.splitlines()[-1].startswith("[1] Server down (critical)")  # most urgent first
+        assert "line 6: Cannot close ticket until parent is resolved." in errors
+        assert "line 7:" in errors and "line 10: batch cannot be nested" in errors
+        assert "batch: 5 commands, 3 failed" in errors
+
+        # Every command above went through the log; a fresh process sees all of it. Ticket 1 is
+        # still leased to night-shift and the held ticket was queued when its parent closed.
+        code, output, _ = run("history")
+        assert code == 0 and len(output.splitlines()) == 3
+        assert "[1] Server down (critical) - open" in output
+        assert "[2] Printer jammed (high) - closed - Alice" in output
+        assert run("process-next")[1].startswith("[3] Toner low")
+        assert run("process-next")[1] == "queue empty\n"
+
+        # The same help desk main.py and service.py load, in both directions
+        persistence = Persistence(data_dir)
+        helpdesk = persistence.load()
+        assert helpdesk.dispatcher.leases[1].worker == "night-shift"
+        helpdesk.close_ticket(1)
+        persistence.close()
+        assert run("close", "1")[2] == "error: Ticket 1 is already closed.\n"
+
+        helpdesk = HelpDesk()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            assert cli.run_batch(helpdesk, [f"create Ticket{i}" for i in range(100)]) == (100, 0)
+        assert len(helpdesk.tickets) == 100
+    print()
+
 def run_all_tests():
     """Run all weekly tests"""
     print(" HELP DESK TICKET SYSTEM - WEEKLY REQUIREMENTS TEST")
@@ -145,6 +1365,29 @@ def run_all_tests():
     test_week3_functions_loops()
     test_week4_linked_lists()
     test_week5_stacks_queues()
+    test_priority_scheduler()
+    test_queue_batches_and_removal()
+    test_ticket_store_indexes()
+    test_history_views()
+    test_dependency_graph()
+    test_dashboard_aggregator()
+    test_persistence_recovery()
+    test_sqlite_repository()
+    test_compact_ticket()
+    test_columnar_table()
+    test_async_service()
+    test_dispatcher_leases()
+    test_assignment_engine()
+    test_undo_redo()
+    test_search_index()
+    test_duplicate_detection()
+    test_sla_timers()
+    test_bulk_import_export()
+    test_scaling_harness()
+    test_metrics_export()
+    test_parallel_analytics()
+    test_sharded_store()
+    test_cli_batch()
     
     print(" All weekly requirements tests completed!")
     print("\nTo run the interactive system, use: python main.py")
@@ -1,24 +1,167 @@
+import sys
+import time
 from datetime import datetime
+from enum import IntEnum
+
+# Priority levels ordered from lowest to highest urgency
+PRIORITY_LEVELS = ["low", "normal", "high", "critical"]
+
+class Priority(IntEnum):
+    LOW = 0
+    NORMAL = 1
+    HIGH = 2
+    CRITICAL = 3
+
+class Status(IntEnum):
+    OPEN = 0
+    CLOSED = 1
+
+STATUS_NAMES = [status.name.lower() for status in Status]
+_STATUS_CODES = {name: Status(code) for code, name in enumerate(STATUS_NAMES)}
+_PRIORITY_CODES = {name: Priority(code) for code, name in enumerate(PRIORITY_LEVELS)}
+
+
+# Agent names interned to small integer IDs shared by every ticket
+class AgentTable:
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+
+    def intern(self, name):
+        agent_id = self.ids.get(name)
+        if agent_id is None:
+            agent_id = len(self.names)
+            self.names.append(sys.intern(name))
+            self.ids[name] = agent_id
+        return agent_id
+
+    def name(self, agent_id):
+        return self.names[agent_id]
+
+    def __len__(self):
+        return len(self.names)
+
+AGENTS = AgentTable()
+UNASSIGNED = AGENTS.intern("Unassigned")
+
+
+def _code(codes, value, kind):
+    if isinstance(value, IntEnum):
+        return value
+    try:
+        return codes[value]
+    except KeyError:
+        raise ValueError(f"Unknown {kind}: {value}") from None
+
 
 class Ticket:
+    # Slots plus small codes keep per-ticket memory low with millions of tickets
+    __slots__ = ("ticket_id", "title", "description", "parent", "store",
+                 "_status", "_priority", "_agent", "created_ts", "updated_ts")
+
     def __init__(self, ticket_id, title, description="", priority="normal", parent=None, assigned_agent="Unassigned"):
         self.ticket_id = ticket_id
         self.title = title
         self.description = description
-        self.priority = priority  # "normal" or "high"
-        self.status = "open"
+        self.priority = priority  # one of PRIORITY_LEVELS
+        self._status = Status.OPEN
         self.parent = parent  # for recursion check
         self.assigned_agent = assigned_agent
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        self.created_ts = self.updated_ts = time.time()  # epoch seconds
+        self.store = None  # TicketStore that indexes this ticket, if any
+
+    # Public fields keep their string/datetime form; codes are stored underneath
+    @property
+    def status(self):
+        return STATUS_NAMES[self._status]
+
+    @status.setter
+    def status(self, value):
+        self._status = _code(_STATUS_CODES, value, "status")
+
+    @property
+    def status_code(self):
+        return self._status
+
+    @property
+    def priority(self):
+        return PRIORITY_LEVELS[self._priority]
+
+    @priority.setter
+    def priority(self, value):
+        self._priority = _code(_PRIORITY_CODES, value, "priority level")
+
+    @property
+    def priority_code(self):
+        return self._priority
+
+    @property
+    def assigned_agent(self):
+        return AGENTS.names[self._agent]
+
+    @assigned_agent.setter
+    def assigned_agent(self, name):
+        self._agent = AGENTS.intern(name)
+
+    @property
+    def agent_id(self):
+        return self._agent
+
+    @property
+    def created_at(self):
+        return datetime.fromtimestamp(self.created_ts)
+
+    @created_at.setter
+    def created_at(self, value):
+        self.created_ts = value.timestamp()
+
+    @property
+    def updated_at(self):
+        return datetime.fromtimestamp(self.updated_ts)
+
+    @updated_at.setter
+    def updated_at(self, value):
+        self.updated_ts = value.timestamp()
+
+    def to_record(self):
+        # Plain JSON-friendly form used for persistence and import/export
+        return {
+            "ticket_id": self.ticket_id,
+            "title": self.title,
+            "description": self.description,
+            "priority": self.priority,
+            "status": self.status,
+            "parent": self.parent,
+            "assigned_agent": self.assigned_agent,
+            "created_at": self.created_ts,
+            "updated_at": self.updated_ts,
+        }
+
+    @classmethod
+    def from_record(cls, record):
+        ticket = cls(record["ticket_id"], record["title"], record.get("description", ""),
+                     record.get("priority", "normal"), record.get("parent"),
+                     record.get("assigned_agent", "Unassigned"))
+        ticket.status = record.get("status", "open")
+        if "created_at" in record:
+            ticket.created_ts = float(record["created_at"])
+        if "updated_at" in record:
+            ticket.updated_ts = float(record["updated_at"])
+        return ticket
 
     def __repr__(self):
         return f"[{self.ticket_id}] {self.title} ({self.priority}) - {self.status} - {self.assigned_agent}"
-    
+
     def update_status(self, new_status):
+        old_status = self.status
         self.status = new_status
-        self.updated_at = datetime.now()
-    
+        self.updated_ts = time.time()
+        if self.store is not None:
+            self.store.reindex(self, "status", old_status)
+
     def assign_agent(self, agent_name):
+        old_agent = self.assigned_agent
         self.assigned_agent = agent_name
-        self.updated_at = datetime.now()
\ No newline at end of file
+        self.updated_ts = time.time()
+        if self.store is not None:
+            self.store.reindex(self, "assigned_agent", old_agent)
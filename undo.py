@@ -0,0 +1,158 @@
+from collections import deque
+
+UNDO_CAPACITY = 1000  # commands kept for undo; the oldest fall off the end
+
+
+# Base class for undoable help desk operations; each command stores what its inverse needs
+class Command:
+    __slots__ = ("ticket",)
+    name = None
+
+    def __init__(self, ticket):
+        self.ticket = ticket
+
+    def undo(self, helpdesk):
+        raise NotImplementedError
+
+    def redo(self, helpdesk):
+        raise NotImplementedError
+
+    def merge(self, newer):
+        # Absorb a newer command on the same ticket; False keeps them separate
+        return False
+
+    def to_record(self):
+        return [self.name, self.ticket.ticket_id]
+
+    def __repr__(self):
+        return f"{self.name} ticket {self.ticket.ticket_id}"
+
+
+class CreateCommand(Command):
+    __slots__ = ("queued",)
+    name = "create"
+
+    def __init__(self, ticket, queued=True):
+        super().__init__(ticket)
+        self.queued = queued  # False for duplicates held back until their parent closes
+
+    def undo(self, helpdesk):
+        helpdesk.tickets.remove(self.ticket.ticket_id)
+        helpdesk.dispatcher.remove(self.ticket.ticket_id)
+
+    def redo(self, helpdesk):
+        # The ticket ID was never reused, so the same ticket goes back in
+        helpdesk.tickets.add(self.ticket)
+        if self.queued:
+            helpdesk.dispatcher.submit(self.ticket)
+
+    def to_record(self):
+        return [self.name, self.ticket.ticket_id, self.queued]
+
+
+class CloseCommand(Command):
+    __slots__ = ("released", "position", "worker")
+    name = "close"
+
+    def __init__(self, ticket, released=(), position=None, worker=None):
+        super().__init__(ticket)
+        self.released = list(released)  # ids of held duplicates the close sent to the queue
+        self.position = position  # [level, sequence] it had in the dispatcher; None for a held duplicate
+        self.worker = worker  # who had it leased when it was closed; None if it was still queued
+
+    def undo(self, helpdesk):
+        self.ticket.update_status("open")
+        if self.position is not None:
+            helpdesk.dispatcher.restore([*self.position, self.ticket], self.worker)
+        for ticket_id in self.released:
+            helpdesk.dispatcher.remove(ticket_id)
+
+    def redo(self, helpdesk):
+        self.ticket.update_status("closed")
+        helpdesk.dispatcher.remove(self.ticket.ticket_id)
+        for ticket_id in self.released:
+            helpdesk.dispatcher.submit(helpdesk.tickets.get(ticket_id))
+
+    def to_record(self):
+        return [self.name, self.ticket.ticket_id, self.released, self.position, self.worker]
+
+
+class AssignCommand(Command):
+    __slots__ = ("previous_agent", "agent")
+    name = "assign_agent"
+
+    def __init__(self, ticket, previous_agent, agent=None):
+        super().__init__(ticket)
+        self.previous_agent = previous_agent
+        self.agent = agent if agent is not None else ticket.assigned_agent
+
+    def undo(self, helpdesk):
+        self.ticket.assign_agent(self.previous_agent)
+
+    def redo(self, helpdesk):
+        self.ticket.assign_agent(self.agent)
+
+    def merge(self, newer):
+        # Reassigning the same ticket again: one undo goes straight back to the first agent
+        if type(newer) is not AssignCommand or newer.ticket is not self.ticket:
+            return False
+        self.agent = newer.agent
+        return True
+
+    def to_record(self):
+        return [self.name, self.ticket.ticket_id, self.previous_agent, self.agent]
+
+    def __repr__(self):
+        return f"assign ticket {self.ticket.ticket_id} to {self.agent} (was {self.previous_agent})"
+
+
+COMMANDS = {command.name: command for command in (CreateCommand, CloseCommand, AssignCommand)}
+
+
+def command_from_record(record, tickets_by_id):
+    name, ticket_id, *fields = record
+    if name not in COMMANDS:
+        raise ValueError(f"Unknown undo command: {name}")
+    return COMMANDS[name](tickets_by_id[ticket_id], *fields)
+
+
+# Bounded undo/redo history: ring buffers, so the oldest commands are dropped in O(1)
+class UndoHistory:
+    def __init__(self, capacity=UNDO_CAPACITY):
+        self.undo_stack = deque(maxlen=capacity)
+        self.redo_stack = deque(maxlen=capacity)
+
+    def push(self, command):
+        # A new operation invalidates anything that was undone before it
+        self.redo_stack.clear()
+        if self.undo_stack and self.undo_stack[-1].merge(command):
+            return
+        self.undo_stack.append(command)
+
+    def undo(self, helpdesk):
+        if not self.undo_stack:
+            return None
+        command = self.undo_stack.pop()
+        command.undo(helpdesk)
+        self.redo_stack.append(command)
+        return command
+
+    def redo(self, helpdesk):
+        if not self.redo_stack:
+            return None
+        command = self.redo_stack.pop()
+        command.redo(helpdesk)
+        self.undo_stack.append(command)
+        return command
+
+    def peek(self):
+        return self.undo_stack[-1] if self.undo_stack else None
+
+    def peek_redo(self):
+        return self.redo_stack[-1] if self.redo_stack else None
+
+    def is_empty(self):
+        return not self.undo_stack
+
+    def __len__(self):
+        return len(self.undo_stack)